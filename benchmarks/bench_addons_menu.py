@@ -0,0 +1,54 @@
+# file: benchmarks/bench_addons_menu.py
+# Запуск из корня проекта: python -m benchmarks.bench_addons_menu
+from data.addons_data import CatalogSnapshot
+from menus.addons_menu import (
+    _build_categories_menu, _build_addons_menu, _build_addon_details_menu, _cached_keyboard
+)
+
+
+def benchmark(categories=1000, addons_per_category=10, clicks=2000):
+    """Сборка клавиатур каталога на каждый клик против кэша по версии каталога"""
+    import random
+    import time
+
+    snapshot = CatalogSnapshot(
+        -1,
+        [(c, f"Категория {c}") for c in range(categories)],
+        [
+            (c * addons_per_category + i + 1, c, f"Addon {c}-{i}", "Описание аддона",
+             "https://github.com/example/addon", "https://www.youtube.com/watch?v=example")
+            for c in range(categories) for i in range(addons_per_category)
+        ]
+    )
+    rnd = random.Random(1)
+    clicked = [rnd.randrange(categories * addons_per_category) + 1 for _ in range(clicks)]
+    screens = {
+        "категории": lambda addon_id: (("cats",), _build_categories_menu, ()),
+        "аддоны категории": lambda addon_id: (
+            ("cat", snapshot.by_id[addon_id]["category"]), _build_addons_menu, (snapshot.by_id[addon_id]["category"],)
+        ),
+        "карточка аддона": lambda addon_id: (("addon", addon_id), _build_addon_details_menu, (addon_id,)),
+    }
+
+    print(f"📈 Каталог: {categories} категорий, {categories * addons_per_category} аддонов, {clicks} кликов")
+    for name, screen in screens.items():
+        started = time.perf_counter()
+        for addon_id in clicked:
+            key, build, args = screen(addon_id)
+            build(snapshot, *args)
+        uncached = (time.perf_counter() - started) / clicks * 1e6
+
+        # Первый проход заполняет кэш, второй - установившийся режим
+        cached = []
+        for _ in range(2):
+            started = time.perf_counter()
+            for addon_id in clicked:
+                key, build, args = screen(addon_id)
+                _cached_keyboard(snapshot, key, build, *args)
+            cached.append((time.perf_counter() - started) / clicks * 1e6)
+        print(f"📈 {name}: сборка {uncached:.1f} мкс, кэш {cached[0]:.1f} мкс (холодный) / "
+              f"{cached[1]:.1f} мкс (прогретый) на клик")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,92 @@
+# file: benchmarks/bench_database.py
+# Запуск из корня проекта: python -m benchmarks.bench_database
+import asyncio
+
+from database import Database, AsyncDatabase
+
+
+async def _benchmark_users(database, use_async, users=500, updates_per_user=5):
+    """Симуляция одновременных пользователей: задержка обработки обновления
+
+    Задержка считается от запланированного момента прихода обновления до
+    окончания его обработки, поэтому учитывает и время, пока цикл событий
+    был занят чужими запросами.
+    """
+    import random
+    import time
+
+    async_db = AsyncDatabase(database) if use_async else None
+    latencies = []
+    light_latencies = []
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    async def call(name, *args):
+        if use_async:
+            return await getattr(async_db, name)(*args)
+        return getattr(database, name)(*args)
+
+    async def user(user_id):
+        rnd = random.Random(user_id)
+        planned = start
+        for _ in range(updates_per_user):
+            planned += rnd.uniform(0.0, 4.0)
+            await asyncio.sleep(max(0.0, planned - loop.time()))
+            kind = rnd.random()
+            if kind < 0.15:
+                # Навигация без обращения к базе (например, "cats")
+                await asyncio.sleep(0)
+                light_latencies.append(loop.time() - planned)
+            elif kind < 0.98:
+                # Клик "открыть аддон"
+                await call('increment_addon_views', user_id % 10)
+                await call('get_videos', user_id % 10)
+            else:
+                # Тяжёлый экран статистики администратора
+                await call('get_overall_stats')
+            latencies.append(loop.time() - planned)
+
+    began = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(users)))
+    elapsed = time.perf_counter() - began
+    if async_db:
+        async_db.shutdown()
+
+    def percentile(values, q):
+        values = sorted(values)
+        return values[min(len(values) - 1, int(len(values) * q))] * 1000
+
+    mode = "async (пул потоков)" if use_async else "sync (в цикле событий)"
+    return (
+        f"📈 {mode}: {len(latencies)} обновлений за {elapsed:.2f} с, "
+        f"p50={percentile(latencies, 0.5):.1f} мс, p99={percentile(latencies, 0.99):.1f} мс, "
+        f"p99 без обращения к базе={percentile(light_latencies, 0.99):.1f} мс"
+    )
+
+
+def benchmark(users=500):
+    """Сравнение задержки обновлений: синхронные вызовы против AsyncDatabase"""
+    import contextlib
+    import io
+    import os
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        database = Database(os.path.join(tmp, "bench.db"))
+        conn = database.pool.writer()
+        conn.executemany(
+            'INSERT INTO addon_videos (addon_id, user_id, youtube_url, title) VALUES (?, ?, ?, ?)',
+            [(i % 10, i, f'https://youtu.be/{i:011d}', f'Blender video {i}') for i in range(5000)]
+        )
+        conn.commit()
+        conn.close()
+
+        results = [asyncio.run(_benchmark_users(database, use_async, users=users)) for use_async in (False, True)]
+        database.close()
+
+    for line in results:
+        print(line)
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,44 @@
+# file: benchmarks/bench_db_pool.py
+# Запуск из корня проекта: python -m benchmarks.bench_db_pool
+import sqlite3
+
+from db_pool import ConnectionManager
+
+
+def benchmark(calls=2000):
+    """Сравнение накладных расходов: новое соединение на вызов против пула"""
+    import os
+    import tempfile
+    import time
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "bench.db")
+        manager = ConnectionManager(db_file)
+        conn = manager.writer()
+        conn.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, value TEXT)')
+        conn.executemany('INSERT INTO items (value) VALUES (?)', [(str(i),) for i in range(1000)])
+        conn.commit()
+        conn.close()
+
+        started = time.perf_counter()
+        for i in range(calls):
+            conn = sqlite3.connect(db_file)
+            conn.execute('SELECT value FROM items WHERE id = ?', (i % 1000 + 1,)).fetchone()
+            conn.close()
+        per_connect = (time.perf_counter() - started) / calls * 1e6
+
+        started = time.perf_counter()
+        for i in range(calls):
+            conn = manager.reader()
+            conn.execute('SELECT value FROM items WHERE id = ?', (i % 1000 + 1,)).fetchone()
+            conn.close()
+        per_pooled = (time.perf_counter() - started) / calls * 1e6
+
+        manager.close()
+
+    print(f"📈 Новое соединение на вызов: {per_connect:.1f} мкс")
+    print(f"📈 Пул соединений: {per_pooled:.1f} мкс")
+
+
+if __name__ == "__main__":
+    benchmark()
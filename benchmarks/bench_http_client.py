@@ -0,0 +1,58 @@
+# file: benchmarks/bench_http_client.py
+# Запуск из корня проекта: python -m benchmarks.bench_http_client
+import asyncio
+import aiohttp
+
+from utils.http_client import DEFAULT_HEADERS, HttpClient
+
+
+async def benchmark(lookups=300, delay_ms=0):
+    """Новая сессия на каждый запрос против общего пула на локальном сервере-заглушке"""
+    import time
+    from aiohttp import web
+
+    async def video(request):
+        await asyncio.sleep(delay_ms / 1000)
+        return web.json_response({"title": f"Blender tutorial {request.match_info['video_id']}"})
+
+    app = web.Application()
+    app.router.add_get('/api/v1/videos/{video_id}', video)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    url = f"http://127.0.0.1:{port}/api/v1/videos/"
+
+    async def per_request(video_id):
+        # Как было раньше: своя сессия и коннектор на каждый запрос
+        async with aiohttp.ClientSession(headers=DEFAULT_HEADERS, timeout=aiohttp.ClientTimeout(total=10)) as session:
+            async with session.get(url + video_id) as response:
+                return (await response.json())['title']
+
+    client = HttpClient()
+
+    async def pooled(video_id):
+        async with client.session.get(url + video_id) as response:
+            return (await response.json())['title']
+
+    print(f"📈 {lookups} последовательных запросов к заглушке (задержка ответа {delay_ms} мс)")
+    try:
+        for name, lookup in (("новая сессия", per_request), ("общий пул", pooled)):
+            timings = []
+            for i in range(lookups):
+                started = time.perf_counter()
+                await lookup(f"{i:011d}")
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            print(
+                f"   {name}: ср. {sum(timings) / lookups:.2f} мс, "
+                f"p50 {timings[lookups // 2]:.2f} мс, p95 {timings[int(lookups * 0.95)]:.2f} мс"
+            )
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark())
@@ -0,0 +1,170 @@
+# file: benchmarks/bench_webhook.py
+# Запуск из корня проекта: python -m benchmarks.bench_webhook
+import asyncio
+import secrets
+
+from aiohttp import web
+from telegram import Update
+from telegram.ext import Application
+
+from config import WEBHOOK_MAX_CONNECTIONS
+from webhook_server import SECRET_HEADER, create_webhook_app
+
+
+def _recorded_updates(count, first_id=1):
+    """Обновления в формате Bot API, как их присылает Telegram"""
+    return [
+        {
+            "update_id": first_id + i,
+            "message": {
+                "message_id": i + 1,
+                "date": 1700000000,
+                "chat": {"id": 1000 + i % 50, "type": "private"},
+                "from": {"id": 1000 + i % 50, "is_bot": False, "first_name": "Test"},
+                "text": f"сообщение {i}",
+            },
+        }
+        for i in range(count)
+    ]
+
+
+async def _start_fake_bot_api(pending, delay_s):
+    """Заглушка Bot API: getMe, setWebhook/deleteWebhook и getUpdates с долгим опросом"""
+    arrived = asyncio.Event()
+
+    async def method(request):
+        name = request.match_info['method']
+        try:
+            params = dict(await request.post()) if request.can_read_body else {}
+        except ConnectionError:
+            # Бот остановился посреди долгого опроса
+            return web.Response(status=499)
+        if name == 'getMe':
+            result = {"id": 1, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+        elif name == 'getUpdates':
+            offset = int(params.get('offset', 0) or 0)
+            limit = int(params.get('limit', 100) or 100)
+            while pending and pending[0]["update_id"] < offset:
+                pending.pop(0)
+            if not pending:
+                arrived.clear()
+                try:
+                    await asyncio.wait_for(arrived.wait(), float(params.get('timeout', 0) or 0))
+                except asyncio.TimeoutError:
+                    pass
+            result = pending[:limit]
+        else:
+            result = True
+        await asyncio.sleep(delay_s)
+        return web.json_response({"ok": True, "result": result})
+
+    app = web.Application()
+    app.router.add_post('/bot{token}/{method}', method)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', 0).start()
+    return runner, runner.addresses[0][1], arrived
+
+
+async def benchmark(updates=2000, network_delay_ms=20, concurrency=WEBHOOK_MAX_CONNECTIONS):
+    """Пропускная способность polling и webhook на записанных обновлениях.
+
+    Оба режима получают одинаковую пачку обновлений через локальные заглушки:
+    polling - через getUpdates заглушки Bot API, webhook - от отправителя,
+    который, как Telegram, шлёт POST-запросы в concurrency соединений.
+    network_delay_ms имитирует сетевую задержку каждого HTTP-обмена.
+    """
+    import time
+    import aiohttp
+    from telegram.ext import TypeHandler
+
+    delay_s = network_delay_ms / 1000
+    recorded = _recorded_updates(updates)
+    token = "123456:BENCH"
+
+    def build(base_url):
+        handled = {"count": 0, "done": asyncio.Event(), "latency": 0.0}
+        sent_at = {}
+
+        async def count(update, context):
+            handled["count"] += 1
+            handled["latency"] += time.perf_counter() - sent_at.get(update.update_id, time.perf_counter())
+            if handled["count"] >= updates:
+                handled["done"].set()
+
+        application = Application.builder().token(token).base_url(base_url).build()
+        application.add_handler(TypeHandler(Update, count))
+        return application, handled, sent_at
+
+    def report(name, elapsed, handled):
+        print(
+            f"   {name}: {updates / elapsed:,.0f} обновлений/с, "
+            f"от отправки до обработчика ср. {handled['latency'] / updates * 1000:.1f} мс"
+        )
+
+    print(f"📈 {updates} обновлений, задержка сети {network_delay_ms} мс на HTTP-обмен")
+
+    # Polling: обновления появляются в заглушке, бот забирает их getUpdates
+    pending = []
+    api_runner, api_port, arrived = await _start_fake_bot_api(pending, delay_s)
+    application, handled, sent_at = build(f"http://127.0.0.1:{api_port}/bot")
+    try:
+        await application.initialize()
+        await application.start()
+        await application.updater.start_polling(poll_interval=0, timeout=10)
+        started = time.perf_counter()
+        for update in recorded:
+            sent_at[update["update_id"]] = time.perf_counter()
+        pending.extend(recorded)
+        arrived.set()
+        await asyncio.wait_for(handled["done"].wait(), 120)
+        report("polling", time.perf_counter() - started, handled)
+    finally:
+        await application.updater.stop()
+        await application.stop()
+        await application.shutdown()
+        await api_runner.cleanup()
+
+    # Webhook: отправитель POST-ит обновления во встроенный сервер
+    pending = []
+    api_runner, api_port, arrived = await _start_fake_bot_api(pending, delay_s)
+    application, handled, sent_at = build(f"http://127.0.0.1:{api_port}/bot")
+    secret = secrets.token_urlsafe(16)
+    runner = web.AppRunner(create_webhook_app(application, secret, "/hook"))
+    try:
+        await application.initialize()
+        await application.start()
+        await runner.setup()
+        await web.TCPSite(runner, '127.0.0.1', 0).start()
+        hook_url = f"http://127.0.0.1:{runner.addresses[0][1]}/hook"
+
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        async with aiohttp.ClientSession(connector=connector, headers={SECRET_HEADER: secret}) as session:
+            queue = asyncio.Queue()
+            for update in recorded:
+                queue.put_nowait(update)
+
+            async def sender():
+                while not queue.empty():
+                    update = queue.get_nowait()
+                    sent_at[update["update_id"]] = time.perf_counter()
+                    await asyncio.sleep(delay_s)
+                    async with session.post(hook_url, json=update) as response:
+                        assert response.status == 200, response.status
+
+            started = time.perf_counter()
+            await asyncio.gather(*(sender() for _ in range(concurrency)))
+            await asyncio.wait_for(handled["done"].wait(), 120)
+            report("webhook", time.perf_counter() - started, handled)
+
+            async with session.post(hook_url, json=recorded[0], headers={SECRET_HEADER: "wrong"}) as response:
+                print(f"   запрос с неверным токеном: HTTP {response.status}")
+    finally:
+        await runner.cleanup()
+        await application.stop()
+        await application.shutdown()
+        await api_runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark())
@@ -1,36 +1,108 @@
-# file: bot.py
-import logging
-from telegram.ext import Application, CommandHandler, MessageHandler, filters, CallbackQueryHandler
-
-from config import BOT_TOKEN
-from handlers import start, admin_command, handle_message, handle_callback
-
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
-
-def main():
-    """Главная функция запуска бота"""
-    app = Application.builder().token(BOT_TOKEN).build()
-
-    # Регистрация обработчиков
-    app.add_handler(CommandHandler("start", start))
-    app.add_handler(CommandHandler("admin", admin_command))
-    app.add_handler(CallbackQueryHandler(handle_callback))
-    app.add_handler(MessageHandler(filters.ALL, handle_message))
-
-    print("\n" + "=" * 50)
-    print("🤖 Blender Addon Bot запущен!")
-    print("=" * 50)
-    print("👑 Админская панель доступна по команде /admin")
-    print("🎬 Название видео автоматически получается с YouTube")
-    print("📋 В списке видео показываются оригинальные названия")
-    print("=" * 50 + "\n")
-
-    app.run_polling()
-
-if __name__ == '__main__':
+# file: bot.py
+import asyncio
+import logging
+from telegram.ext import Application, CommandHandler, MessageHandler, filters, CallbackQueryHandler
+
+from config import (
+    BOT_TOKEN, BOT_MODE, STATS_COMPACTION_INTERVAL_S, VIDEO_QUEUE_DRAIN_TIMEOUT_S, USER_STATE_GC_INTERVAL_S
+)
+from database import db, adb
+from data.addons_data import init_catalog, close_data, watch_catalog_file
+from handlers import start, admin_command, handle_message, handle_callback, video_queue
+from utils.http_client import http_client
+from update_processor import update_processor
+from outbound_scheduler import outbound_scheduler
+from user_state import persistence
+
+# Настройка логирования
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Фоновые задачи, запущенные при старте бота
+background_tasks = []
+
+
+async def stats_compaction_loop():
+    """Периодическая свёртка старых событий статистики"""
+    while True:
+        await adb.compact_stats()
+        await asyncio.sleep(STATS_COMPACTION_INTERVAL_S)
+
+
+async def user_state_gc_loop(application: Application):
+    """Периодическое удаление брошенных сценариев пользователей"""
+    while True:
+        await asyncio.sleep(USER_STATE_GC_INTERVAL_S)
+        await persistence.collect_garbage(application)
+
+
+async def on_startup(application: Application):
+    """Загрузка каталога и запуск фоновых задач"""
+    init_catalog()
+    await http_client.start()
+    video_queue.start()
+    background_tasks.append(asyncio.create_task(stats_compaction_loop()))
+    background_tasks.append(asyncio.create_task(watch_catalog_file()))
+    background_tasks.append(asyncio.create_task(user_state_gc_loop(application)))
+
+
+async def on_stop(application: Application):
+    """Дообработка принятых видео, пока бот ещё может отправлять сообщения"""
+    await video_queue.drain(VIDEO_QUEUE_DRAIN_TIMEOUT_S)
+
+
+async def on_shutdown(application: Application):
+    """Освобождение ресурсов при остановке бота"""
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
+
+    await http_client.close()
+    close_data()
+    adb.shutdown()
+    db.close()
+
+
+def main():
+    """Главная функция запуска бота"""
+    app = (
+        Application.builder()
+        .token(BOT_TOKEN)
+        # Разные пользователи обрабатываются параллельно, обновления одного - по порядку
+        .concurrent_updates(update_processor)
+        # Лимиты Telegram на исходящие, повторы после RetryAfter, схлопывание правок
+        .rate_limiter(outbound_scheduler)
+        # context.user_data переживает перезапуск, брошенные сценарии удаляются по сроку
+        .persistence(persistence)
+        .post_init(on_startup)
+        .post_stop(on_stop)
+        .post_shutdown(on_shutdown)
+        .build()
+    )
+
+    # Регистрация обработчиков
+    app.add_handler(CommandHandler("start", start))
+    app.add_handler(CommandHandler("admin", admin_command))
+    app.add_handler(CallbackQueryHandler(handle_callback))
+    app.add_handler(MessageHandler(filters.ALL, handle_message))
+
+    print("\n" + "=" * 50)
+    print("🤖 Blender Addon Bot запущен!")
+    print("=" * 50)
+    print("👑 Админская панель доступна по команде /admin")
+    print("🎬 Название видео автоматически получается с YouTube")
+    print("📋 В списке видео показываются оригинальные названия")
+    print("=" * 50 + "\n")
+
+    if BOT_MODE == "webhook":
+        from webhook_server import serve_webhook
+        asyncio.run(serve_webhook(app))
+    else:
+        app.run_polling()
+
+if __name__ == '__main__':
     main()
\ No newline at end of file
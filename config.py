@@ -4,7 +4,153 @@ from dotenv import load_dotenv
 load_dotenv()
 
 BOT_TOKEN = os.getenv("BOT_TOKEN", "")
-DB_FILE = "blender_addon_bot.db"
+DB_FILE = os.getenv("DB_FILE", "blender_addon_bot.db")
 ADMIN_IDS = []  
 
 
+# Асинхронный доступ к базе данных: размер пула потоков и лимит ожидающих запросов
+DB_EXECUTOR_WORKERS = 4
+DB_MAX_PENDING = 64
+
+# Соединения SQLite: число читателей и PRAGMA (база работает в режиме WAL)
+DB_READERS = 4
+DB_BUSY_TIMEOUT_MS = 5000
+DB_SYNCHRONOUS = "NORMAL"
+DB_CACHE_SIZE_KB = 16384
+DB_MMAP_SIZE = 256 * 1024 * 1024
+
+# Буфер отложенной записи просмотров и событий статистики.
+# При аварийной остановке теряется не больше одного окна (0 - писать сразу).
+WRITE_BUFFER_FLUSH_MS = 1000
+WRITE_BUFFER_MAX_EVENTS = 500
+
+# Свёртка событий статистики: сырые события старше STATS_RAW_RETENTION_DAYS
+# переносятся в почасовые/посуточные таблицы, почасовые хранятся STATS_HOURLY_RETENTION_DAYS.
+# Посуточные счётчики хранятся всегда, а пользователи по суткам (для уникальных) -
+# STATS_DAILY_RETENTION_DAYS: это самое длинное окно с точным числом уникальных
+STATS_RAW_RETENTION_DAYS = 2
+STATS_HOURLY_RETENTION_DAYS = 90
+STATS_DAILY_RETENTION_DAYS = 365
+STATS_COMPACTION_INTERVAL_S = 3600
+
+# Сохранение каталога аддонов в addons_data.json: запись откладывается, пока правки
+# не затихнут на CATALOG_SAVE_DELAY_MS, но не дольше CATALOG_SAVE_MAX_DELAY_MS (0 - писать сразу)
+CATALOG_SAVE_DELAY_MS = 500
+CATALOG_SAVE_MAX_DELAY_MS = 5000
+# Проверка addons_data.json на ручные правки (подхватываются без перезапуска бота)
+CATALOG_WATCH_INTERVAL_S = 5
+
+# Размер LRU-кэша клавиатур просмотра и добавления видео
+VIDEO_MENU_CACHE_SIZE = 1024
+
+# Реестр данных кнопок, которые не помещаются в 64 байта callback_data
+CALLBACK_REGISTRY_TTL_S = 24 * 3600
+CALLBACK_REGISTRY_MAX_ITEMS = 10000
+
+# Границы корзин гистограммы времени обработки кнопок (мс), по маршрутам
+CALLBACK_LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Общая HTTP-сессия (запросы названий видео): пул соединений с keep-alive и кэшем DNS
+HTTP_POOL_LIMIT = 100
+HTTP_POOL_LIMIT_PER_HOST = 10
+HTTP_DNS_CACHE_TTL_S = 300
+HTTP_KEEPALIVE_TIMEOUT_S = 30
+HTTP_CONNECT_TIMEOUT_S = 5
+HTTP_TOTAL_TIMEOUT_S = 15
+# Таймауты запросов к отдельным сервисам
+NOEMBED_TIMEOUT_S = 15
+INVIDIOUS_TIMEOUT_S = 10
+
+# Кэш названий видео YouTube (таблица video_metadata + LRU в памяти).
+# Неудачные запросы (приватное или удалённое видео) запоминаются на меньший срок
+VIDEO_METADATA_CACHE_SIZE = 2048
+VIDEO_METADATA_TTL_S = 7 * 24 * 3600
+VIDEO_METADATA_NEGATIVE_TTL_S = 15 * 60
+
+# Параллельный запрос названия видео: следующий источник стартует, если предыдущие
+# не ответили за TITLE_HEDGE_DELAY_S; весь поиск ограничен TITLE_LOOKUP_DEADLINE_S
+TITLE_LOOKUP_DEADLINE_S = 12
+TITLE_HEDGE_DELAY_S = 1.0
+# Сколько инстансов Invidious участвует в гонке вместе с Noembed
+TITLE_HEDGE_INVIDIOUS = 3
+
+# Публичные инстансы Invidious. Если есть файл INVIDIOUS_INSTANCES_FILE (по адресу в строке,
+# строки с # пропускаются), список берётся из него и перечитывается из админ-панели
+INVIDIOUS_INSTANCES = [
+    "https://inv.riverside.rocks",
+    "https://invidious.snopyta.org",
+    "https://yewtu.be",
+    "https://invidious.xyz",
+    "https://invidiou.site"
+]
+INVIDIOUS_INSTANCES_FILE = "invidious_instances.txt"
+
+# Здоровье источников: вес нового замера в скользящих средних, задержка для ещё
+# не опрошенных, число ошибок подряд до отключения и пауза до пробного запроса
+BACKEND_EWMA_ALPHA = 0.3
+BACKEND_DEFAULT_LATENCY_S = 1.0
+BACKEND_BREAKER_FAILURES = 3
+BACKEND_BREAKER_COOLDOWN_S = 300
+
+# Очередь проверки присланных видео: число обработчиков, размер очереди,
+# сколько видео одного пользователя может ждать проверки, ожидание дообработки при остановке
+VIDEO_QUEUE_WORKERS = 4
+VIDEO_QUEUE_MAX_SIZE = 100
+VIDEO_QUEUE_PER_USER = 2
+VIDEO_QUEUE_DRAIN_TIMEOUT_S = 30
+
+# Режим получения обновлений: "polling" (по умолчанию) или "webhook".
+# Для webhook Telegram шлёт обновления на WEBHOOK_URL, встроенный сервер слушает
+# WEBHOOK_LISTEN:WEBHOOK_PORT по пути WEBHOOK_PATH и проверяет WEBHOOK_SECRET_TOKEN.
+# Несколько экземпляров за балансировщиком: общий токен, WEBHOOK_SET_ON_START только у одного
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram")
+WEBHOOK_SECRET_TOKEN = os.getenv("WEBHOOK_SECRET_TOKEN", "")
+WEBHOOK_MAX_CONNECTIONS = 40
+WEBHOOK_SET_ON_START = os.getenv("WEBHOOK_SET_ON_START", "1") == "1"
+
+# Параллельная обработка обновлений: сколько обработчиков работает одновременно
+# (обновления одного пользователя всё равно идут по очереди) и сколько обновлений
+# может ждать обработки
+UPDATE_CONCURRENCY = 16
+UPDATE_MAX_PENDING = 1024
+
+# Исходящие запросы к Telegram: общий лимит (сообщений в секунду и запас),
+# лимит на личный чат и на группу/канал, число повторов после RetryAfter
+# и сколько чатов помнить
+OUTBOUND_GLOBAL_RATE = 30
+OUTBOUND_GLOBAL_BURST = 30
+OUTBOUND_CHAT_RATE = 1.0
+OUTBOUND_CHAT_BURST = 3
+OUTBOUND_GROUP_RATE = 20 / 60
+OUTBOUND_GROUP_BURST = 3
+OUTBOUND_MAX_RETRIES = 3
+OUTBOUND_CHAT_BUCKETS_MAX = 10000
+# Медленная полоса уступает интерактивным запросам не дольше этого, потом идёт наравне
+OUTBOUND_BULK_MAX_WAIT_S = 5.0
+
+# Сколько сообщений с кнопками помнить для пропуска одинаковых правок
+VIEW_CACHE_MAX_ITEMS = 5000
+
+# Состояние пошаговых сценариев (context.user_data) хранится в SQLite.
+# Изменения пишутся пачкой раз в USER_STATE_FLUSH_INTERVAL_S; ключ, который не менялся
+# дольше своего срока, считается брошенным и удаляется (срок по ключу или по умолчанию).
+# Пустое состояние пользователя, не заходившего USER_STATE_IDLE_DROP_S, выгружается из памяти
+USER_STATE_FLUSH_INTERVAL_S = 5
+USER_STATE_DEFAULT_TTL_S = 24 * 60 * 60
+USER_STATE_KEY_TTL_S = {
+    'searching_notes': 10 * 60,
+    'creating_note': 60 * 60,
+    'note_title': 60 * 60,
+    'adding_note_content': 60 * 60,
+    'adding_video_url': 60 * 60,
+    'add_video': 60 * 60,
+    'admin_adding_category': 6 * 60 * 60,
+    'admin_adding_addon': 6 * 60 * 60,
+    'admin_addon_data': 6 * 60 * 60,
+}
+USER_STATE_GC_INTERVAL_S = 5 * 60
+USER_STATE_IDLE_DROP_S = 30 * 60
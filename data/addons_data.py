@@ -1,120 +1,350 @@
-import json
-import os
-
-# Путь к файлу с данными аддонов
-ADDONS_FILE = "../addons_data.json"
-
-# Загружаем данные из файла
-if os.path.exists(ADDONS_FILE):
-    with open(ADDONS_FILE, 'r', encoding='utf-8') as f:
-        ADDONS_DATA = json.load(f)
-else:
-    # Новая структура без разделов
-    ADDONS_DATA = {
-        "обучающие": [
-            {
-                "name": "Game Tools Pro",
-                "description": "Инструменты для создания игр",
-                "github": "https://github.com/example/game-tools",
-                "youtube": "https://www.youtube.com/watch?v=example"
-            }
-        ],
-        "визуализация": [
-            {
-                "name": "Render Optimizer",
-                "description": "Оптимизация рендеринга",
-                "github": "https://github.com/example/render-opt",
-                "youtube": "https://www.youtube.com/watch?v=example3"
-            }
-        ]
-    }
-    # Сохраняем начальные данные
-    with open(ADDONS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(ADDONS_DATA, f, ensure_ascii=False, indent=2)
-
-
-def save_data():
-    """Сохраняет данные в файл"""
-    with open(ADDONS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(ADDONS_DATA, f, ensure_ascii=False, indent=2)
-
-
-def get_categories():
-    return list(ADDONS_DATA.keys())
-
-
-def get_addons(category):
-    return ADDONS_DATA.get(category, [])
-
-
-def get_addon(category, index):
-    addons = get_addons(category)
-    return addons[index] if 0 <= index < len(addons) else None
-
-
-def add_addon(category, name, description, github, youtube):
-    """Добавление нового аддона (для админов)"""
-    if category not in ADDONS_DATA:
-        ADDONS_DATA[category] = []
-
-    new_addon = {
-        "name": name,
-        "description": description,
-        "github": github,
-        "youtube": youtube
-    }
-
-    ADDONS_DATA[category].append(new_addon)
-    save_data()
-    print(f"✅ Добавлен новый аддон: {name} в {category}")
-    return True
-
-
-def update_addon(category, index, name=None, description=None, github=None, youtube=None):
-    """Обновление аддона (для админов)"""
-    addons = get_addons(category)
-    if index < 0 or index >= len(addons):
-        return False
-
-    addon = addons[index]
-    if name:
-        addon["name"] = name
-    if description:
-        addon["description"] = description
-    if github:
-        addon["github"] = github
-    if youtube:
-        addon["youtube"] = youtube
-
-    save_data()
-    print(f"✅ Обновлен аддон: {addon['name']} в {category}")
-    return True
-
-
-def delete_addon(category, index):
-    """Удаление аддона (для админов)"""
-    addons = get_addons(category)
-    if index < 0 or index >= len(addons):
-        return False
-
-    deleted_name = addons[index]["name"]
-    ADDONS_DATA[category].pop(index)
-
-    # Если в категории больше нет аддонов, удаляем категорию
-    if not ADDONS_DATA[category]:
-        del ADDONS_DATA[category]
-
-    save_data()
-    print(f"🗑️ Удален аддон: {deleted_name} из {category}")
-    return True
-
-
-def add_category(category):
-    """Добавление новой категории (для админов)"""
-    if category not in ADDONS_DATA:
-        ADDONS_DATA[category] = []
-        save_data()
-        print(f"✅ Добавлена новая категория: {category}")
-        return True
-    print(f"⚠️ Категория уже существует: {category}")
-    return False
\ No newline at end of file
+import asyncio
+import json
+import os
+import shutil
+import sys
+import threading
+from types import MappingProxyType
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CATALOG_WATCH_INTERVAL_S
+from database import db
+from data.catalog_writer import CatalogWriter
+
+# Путь к файлу с данными аддонов (при первом запуске каталог загружается из него в базу)
+ADDONS_FILE = "../addons_data.json"
+# Ключ файла с ревизией каталога в базе, на которой основан файл
+REVISION_KEY = "_revision"
+
+# Начальные данные, если файла нет
+DEFAULT_ADDONS_DATA = {
+    "обучающие": [
+        {
+            "name": "Game Tools Pro",
+            "description": "Инструменты для создания игр",
+            "github": "https://github.com/example/game-tools",
+            "youtube": "https://www.youtube.com/watch?v=example"
+        }
+    ],
+    "визуализация": [
+        {
+            "name": "Render Optimizer",
+            "description": "Оптимизация рендеринга",
+            "github": "https://github.com/example/render-opt",
+            "youtube": "https://www.youtube.com/watch?v=example3"
+        }
+    ]
+}
+
+class CatalogSnapshot:
+    """Неизменяемый снимок каталога.
+
+    Изменения каталога собирают новый снимок и подменяют им старый одним
+    присваиванием, поэтому обработчики никогда не видят каталог
+    в промежуточном состоянии. Версия растёт с каждым снимком,
+    по ней сбрасываются кэши. revision - ревизия каталога в базе.
+    """
+
+    __slots__ = ('version', 'revision', 'categories', 'category_ids', 'category_names', 'addons', 'by_id')
+
+    def __init__(self, version, categories, addons, revision=0):
+        names = {category_id: name for category_id, name in categories}
+        by_category = {name: [] for category_id, name in categories}
+        by_id = {}
+        for addon_id, category_id, name, description, github, youtube in addons:
+            addon = MappingProxyType({
+                "id": addon_id,
+                "category": names[category_id],
+                "name": name,
+                "description": description,
+                "github": github,
+                "youtube": youtube
+            })
+            by_category[addon["category"]].append(addon)
+            by_id[addon_id] = addon
+
+        self.version = version
+        self.revision = revision
+        self.categories = tuple(by_category)
+        self.category_ids = MappingProxyType({name: category_id for category_id, name in categories})
+        self.category_names = MappingProxyType(names)
+        self.addons = MappingProxyType({name: tuple(items) for name, items in by_category.items()})
+        self.by_id = MappingProxyType(by_id)
+
+
+# Текущий снимок каталога. Источник данных - таблицы categories/addons, id аддонов постоянные.
+# До вызова init_catalog() снимок пустой.
+_snapshot = CatalogSnapshot(0, [], [])
+_reload_lock = threading.Lock()
+
+
+def get_snapshot():
+    return _snapshot
+
+
+def get_catalog_version():
+    return _snapshot.version
+
+
+def reload_catalog():
+    """Перечитывает каталог из базы и подменяет снимок"""
+    global _snapshot
+    with _reload_lock:
+        categories, addons, revision = db.get_catalog()
+        _snapshot = CatalogSnapshot(_snapshot.version + 1, categories, addons, revision)
+
+
+def export_data():
+    """Каталог (вместе с id аддонов и ревизией) в формате addons_data.json"""
+    snapshot = _snapshot
+    data = {REVISION_KEY: snapshot.revision}
+    for category, addons in snapshot.addons.items():
+        data[category] = [{key: value for key, value in addon.items() if key != "category"} for addon in addons]
+    return data
+
+
+# Файл пишется в фоновом потоке, серия правок сохраняется одной записью
+catalog_writer = CatalogWriter(ADDONS_FILE, export_data)
+
+
+def save_data():
+    """Планирует сохранение каталога в файл"""
+    catalog_writer.schedule()
+
+
+def close_data():
+    """Запись несохранённых изменений каталога при остановке бота"""
+    catalog_writer.close()
+
+
+def _read_catalog_file():
+    """Содержимое ADDONS_FILE: (ревизия или None, {категория: [аддоны]}, файл целиком)"""
+    with open(ADDONS_FILE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("каталог должен быть объектом {категория: [аддоны]}")
+    catalog = {key: value for key, value in data.items() if key != REVISION_KEY}
+    return data.get(REVISION_KEY), catalog, data
+
+
+def get_categories():
+    return list(_snapshot.categories)
+
+
+def get_addons(category):
+    return _snapshot.addons.get(category, ())
+
+
+def get_addon(addon_id):
+    return _snapshot.by_id.get(addon_id)
+
+
+def get_category(category_id):
+    """Название категории по id (None, если категории нет)"""
+    return _snapshot.category_names.get(category_id)
+
+
+def get_category_id(category):
+    return _snapshot.category_ids.get(category)
+
+
+# Изменения каталога пишут в базу синхронно и ждут блокировку писателя:
+# из обработчиков их нужно вызывать через adb.run(...), вне цикла событий
+def add_addon(category, name, description, github, youtube):
+    """Добавление нового аддона (для админов)"""
+    addon_id = db.add_addon(category, name, description, github, youtube)
+    if addon_id is None:
+        return False
+
+    reload_catalog()
+    save_data()
+    print(f"✅ Добавлен новый аддон: {name} в {category}")
+    return True
+
+
+def update_addon(addon_id, name=None, description=None, github=None, youtube=None):
+    """Обновление аддона (для админов)"""
+    if not db.update_addon(addon_id, name, description, github, youtube):
+        return False
+
+    reload_catalog()
+    save_data()
+    addon = get_addon(addon_id)
+    print(f"✅ Обновлен аддон: {addon['name']} в {addon['category']}")
+    return True
+
+
+def delete_addon(addon_id):
+    """Удаление аддона (для админов)"""
+    addon = get_addon(addon_id)
+    if not addon or not db.delete_addon(addon_id):
+        return False
+
+    # Если в категории больше нет аддонов, база удаляет и категорию
+    reload_catalog()
+    save_data()
+    print(f"🗑️ Удален аддон: {addon['name']} из {addon['category']}")
+    return True
+
+
+def add_category(category):
+    """Добавление новой категории (для админов)"""
+    if db.add_category(category) is not None:
+        reload_catalog()
+        save_data()
+        print(f"✅ Добавлена новая категория: {category}")
+        return True
+    print(f"⚠️ Категория уже существует: {category}")
+    return False
+
+
+# ==================== ГОРЯЧАЯ ПЕРЕЗАГРУЗКА ====================
+
+def validate_catalog(data):
+    """Проверка каталога из файла, при ошибке - ValueError с описанием"""
+    if not isinstance(data, dict):
+        raise ValueError("каталог должен быть объектом {категория: [аддоны]}")
+
+    seen_ids = set()
+    for category, addons in data.items():
+        if not category.strip():
+            raise ValueError("пустое название категории")
+        if not isinstance(addons, list):
+            raise ValueError(f"аддоны категории '{category}' должны быть списком")
+        for addon in addons:
+            if not isinstance(addon, dict) or not isinstance(addon.get("name"), str) or not addon["name"].strip():
+                raise ValueError(f"у аддона в категории '{category}' нет названия")
+            for key in ("description", "github", "youtube"):
+                if not isinstance(addon.get(key, ""), str):
+                    raise ValueError(f"поле '{key}' аддона '{addon['name']}' должно быть строкой")
+            addon_id = addon.get("id")
+            if addon_id is not None:
+                if not isinstance(addon_id, int) or isinstance(addon_id, bool) or addon_id in seen_ids:
+                    raise ValueError(f"неверный или повторяющийся id аддона '{addon['name']}': {addon_id}")
+                seen_ids.add(addon_id)
+
+
+def _file_signature():
+    try:
+        stat = os.stat(ADDONS_FILE)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+# Подпись файла при последней проверке (None - файл ещё не проверялся)
+_checked_signature = None
+
+
+def _replace_stale_file(reason):
+    """Файл не совпадает с базой: он сохраняется рядом, а на его место пишется каталог из базы"""
+    global _checked_signature
+    stale_path = ADDONS_FILE + ".stale"
+    try:
+        shutil.copyfile(ADDONS_FILE, stale_path)
+    except OSError as e:
+        print(f"⚠️ Не удалось сохранить копию {ADDONS_FILE}: {e}")
+        stale_path = None
+    print(f"⚠️ {ADDONS_FILE} не применён ({reason}), файл перезаписан из базы"
+          + (f", прежняя версия сохранена в {stale_path}" if stale_path else ""))
+    save_data()
+    catalog_writer.flush()
+    _checked_signature = catalog_writer.last_written
+
+
+def check_file_on_startup():
+    """Сверка ADDONS_FILE с базой при запуске.
+
+    Файл мог остаться старее базы (бот остановился до отложенной записи):
+    такой файл сразу перезаписывается из базы, иначе наблюдатель применил бы
+    его и удалил аддоны, добавленные после его записи. Файл с ревизией базы,
+    но другим содержимым - ручная правка при остановленном боте, её применит
+    наблюдатель.
+    """
+    global _checked_signature
+    signature = _file_signature()
+    if signature is None:
+        save_data()
+        return
+    try:
+        revision, _, data = _read_catalog_file()
+    except (OSError, ValueError):
+        # Ошибку в файле покажет наблюдатель, база не меняется
+        return
+    if revision != _snapshot.revision:
+        _replace_stale_file(f"ревизия файла {revision}, в базе {_snapshot.revision}")
+    elif data == export_data():
+        _checked_signature = signature
+
+
+def reload_from_file():
+    """Применяет правки, внесённые в ADDONS_FILE вручную.
+
+    Вызывается вне цикла событий. Источник истины - база: файл применяется,
+    только если он основан на текущей ревизии каталога (ключ _revision),
+    иначе он сохраняется в ADDONS_FILE.stale и перезаписывается из базы.
+    Файл с ошибками не применяется: бот продолжает работать с прежним
+    снимком каталога. Возвращает True, если каталог изменился.
+    """
+    global _checked_signature
+    signature = _file_signature()
+    if signature is None or signature == _checked_signature:
+        return False
+    _checked_signature = signature
+    if signature == catalog_writer.last_written:
+        # Файл записан самим ботом
+        return False
+
+    try:
+        revision, catalog, data = _read_catalog_file()
+        validate_catalog(catalog)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Каталог из {ADDONS_FILE} не загружен, остаётся прежняя версия: {e}")
+        return False
+
+    if data == export_data():
+        return False
+    if revision != _snapshot.revision:
+        _replace_stale_file(f"файл основан на ревизии {revision}, в базе {_snapshot.revision}")
+        return False
+    if db.sync_catalog(catalog, revision) is None:
+        # Каталог изменили в админ-панели после чтения файла
+        reload_catalog()
+        _replace_stale_file("каталог изменён в админ-панели")
+        return False
+
+    reload_catalog()
+    # Новые аддоны получили id - записываем их обратно в файл
+    save_data()
+    print(f"🔄 Каталог перезагружен из {ADDONS_FILE}, версия {get_catalog_version()}")
+    return True
+
+
+def init_catalog():
+    """Загрузка каталога при запуске бота.
+
+    Вызывается явно (из post_init бота), а не при импорте модуля: импорт
+    не читает базу и не трогает ADDONS_FILE. При первом запуске каталог
+    переносится из файла в базу, затем файл сверяется с базой.
+    """
+    if not db.get_catalog()[0]:
+        if os.path.exists(ADDONS_FILE):
+            db.import_catalog(_read_catalog_file()[1])
+        else:
+            db.import_catalog(DEFAULT_ADDONS_DATA)
+        reload_catalog()
+        # Файл сразу получает id аддонов и ревизию
+        save_data()
+        catalog_writer.flush()
+    else:
+        reload_catalog()
+    check_file_on_startup()
+
+
+async def watch_catalog_file(interval=CATALOG_WATCH_INTERVAL_S):
+    """Периодическая проверка ADDONS_FILE на ручные правки"""
+    loop = asyncio.get_running_loop()
+    while True:
+        await loop.run_in_executor(None, reload_from_file)
+        await asyncio.sleep(interval)
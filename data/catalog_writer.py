@@ -0,0 +1,142 @@
+# file: data/catalog_writer.py
+import json
+import os
+import tempfile
+import threading
+import time
+from config import CATALOG_SAVE_DELAY_MS, CATALOG_SAVE_MAX_DELAY_MS
+
+
+def write_json_atomic(path, data, before_replace=None):
+    """Атомарная запись JSON: временный файл рядом, fsync и переименование.
+
+    Читатель файла всегда видит либо старую, либо новую версию целиком.
+    before_replace(подпись) вызывается до переименования, чтобы наблюдатель
+    за файлом не принял только что записанную версию за чужую правку.
+    Возвращает (mtime_ns, размер) записанного файла.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".addons_data.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+            stat = os.fstat(f.fileno())
+        if before_replace is not None:
+            before_replace((stat.st_mtime_ns, stat.st_size))
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # Переименование тоже должно пережить сбой питания (на Windows каталог не открыть)
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+    return stat.st_mtime_ns, stat.st_size
+
+
+class CatalogWriter:
+    """Отложенная запись каталога в файл в фоновом потоке.
+
+    Изменения каталога только помечают файл устаревшим. Запись происходит,
+    когда изменения затихли на delay_ms, но не позже max_delay_ms после
+    первого несохранённого изменения, поэтому серия правок администратора
+    превращается в одну запись. Данные для записи берутся через get_data
+    в момент записи, то есть всегда самые свежие.
+
+    delay_ms = 0 отключает фоновый поток: файл пишется сразу.
+    """
+
+    def __init__(self, path, get_data, delay_ms=CATALOG_SAVE_DELAY_MS, max_delay_ms=CATALOG_SAVE_MAX_DELAY_MS):
+        self.path = path
+        self._get_data = get_data
+        self.delay = delay_ms / 1000
+        self.max_delay = max(delay_ms, max_delay_ms) / 1000
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._first_change = None
+        self._last_change = None
+        self.requests = 0
+        self.writes = 0
+        # (mtime_ns, размер) последнего записанного файла - чтобы отличать свои записи от чужих
+        self.last_written = None
+
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        if self.delay > 0:
+            self._thread = threading.Thread(target=self._run, name="catalog-writer", daemon=True)
+            self._thread.start()
+
+    def schedule(self):
+        """Отметка об изменении каталога"""
+        with self._lock:
+            now = time.monotonic()
+            if self._first_change is None:
+                self._first_change = now
+            self._last_change = now
+            self.requests += 1
+
+        if self._thread is None:
+            self.flush()
+        else:
+            self._wakeup.set()
+
+    def _deadline(self):
+        with self._lock:
+            if self._first_change is None:
+                return None
+            return min(self._last_change + self.delay, self._first_change + self.max_delay)
+
+    def flush(self):
+        """Запись файла, если есть несохранённые изменения"""
+        with self._flush_lock:
+            with self._lock:
+                if self._first_change is None:
+                    return False
+                self._first_change = self._last_change = None
+
+            try:
+                write_json_atomic(self.path, self._get_data(), before_replace=self._set_last_written)
+                self.writes += 1
+                return True
+            except Exception as e:
+                print(f"❌ Ошибка при сохранении каталога в {self.path}: {e}")
+                with self._lock:
+                    # Повторим попытку при следующем изменении или остановке
+                    if self._first_change is None:
+                        self._first_change = self._last_change = time.monotonic()
+                return False
+
+    def _set_last_written(self, signature):
+        self.last_written = signature
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait()
+            self._wakeup.clear()
+            while not self._stopped.is_set():
+                deadline = self._deadline()
+                if deadline is None:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.flush()
+                    break
+                self._stopped.wait(remaining)
+
+    def close(self):
+        """Остановка фонового потока и запись оставшихся изменений"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
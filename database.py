@@ -1,755 +1,1757 @@
-# file: database.py
-import sqlite3
-import hashlib
-from datetime import datetime
-from config import DB_FILE
-
-
-class Database:
-    def __init__(self):
-        self.init_db()
-
-    # В методе init_db удалите создание таблицы link_clicks:
-    def init_db(self):
-        """Инициализация базы данных"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-
-        print("🔄 Инициализация базы данных...")
-
-        # Таблица заметок
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS notes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                title TEXT,
-                hashtag TEXT UNIQUE,
-                message_id INTEGER,
-                chat_id INTEGER,
-                views INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Таблица пользовательских видео для аддонов
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS addon_videos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                addon_category TEXT,
-                addon_index INTEGER,
-                user_id INTEGER,
-                youtube_url TEXT,
-                title TEXT,
-                description TEXT DEFAULT '',
-                likes INTEGER DEFAULT 0,
-                dislikes INTEGER DEFAULT 0,
-                views INTEGER DEFAULT 0,
-                verified BOOLEAN DEFAULT TRUE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Таблица лайков видео
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS video_likes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                video_id INTEGER,
-                user_id INTEGER,
-                is_like BOOLEAN,  -- TRUE = like, FALSE = dislike
-                UNIQUE(video_id, user_id)
-            )
-        ''')
-
-        # Таблица для статистики заметок
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS note_stats (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                note_id INTEGER,
-                user_id INTEGER,
-                action TEXT,  -- 'view', 'search', 'open'
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (note_id) REFERENCES notes(id) ON DELETE CASCADE
-            )
-        ''')
-
-        # УДАЛЕНО: Таблица для статистики ссылок (GitHub, YouTube)
-
-        # Таблица для статистики видео
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS video_stats (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                video_id INTEGER,
-                user_id INTEGER,
-                action TEXT,  -- 'view', 'like', 'dislike', 'add'
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (video_id) REFERENCES addon_videos(id) ON DELETE CASCADE
-            )
-        ''')
-        # В методе init_db() добавьте после создания таблицы video_stats:
-
-        # Таблица для статистики просмотров аддонов
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS addon_stats (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                category TEXT NOT NULL,
-                addon_index INTEGER NOT NULL,
-                views INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(category, addon_index)
-            )
-        ''')
-
-        # Индекс для быстрого поиска
-
-
-        # Индексы для быстрого поиска
-        try:
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_videos_addon ON addon_videos(addon_category, addon_index)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_videos_user ON addon_videos(user_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_note_stats_note ON note_stats(note_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_video_stats_video ON video_stats(video_id)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_addon_stats_cat ON addon_stats(category, addon_index)')
-        except Exception as e:
-            print(f"⚠️ Ошибка при создании индексов: {e}")
-
-        conn.commit()
-        conn.close()
-        print("✅ База данных инициализирована")
-
-    # ========== ЗАМЕТКИ ==========
-
-    def save_note(self, user_id, title, message_id, chat_id):
-        """Сохраняем только метаданные заметки"""
-        hashtag = self._generate_hashtag(title, user_id)
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                INSERT INTO notes (user_id, title, hashtag, message_id, chat_id)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (user_id, title, hashtag, message_id, chat_id))
-            conn.commit()
-            note_id = cursor.lastrowid
-            print(f"✅ Сохранена заметка: user_id={user_id}, title='{title}', note_id={note_id}")
-        except Exception as e:
-            print(f"❌ Ошибка при сохранении заметки: {e}")
-            raise
-        finally:
-            conn.close()
-        return note_id, hashtag
-
-    def get_user_notes(self, user_id, limit=20):
-        """Получаем только метаданные заметок пользователя"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                SELECT id, title, hashtag, views, created_at 
-                FROM notes 
-                WHERE user_id = ? 
-                ORDER BY created_at DESC 
-                LIMIT ?
-            ''', (user_id, limit))
-            notes = cursor.fetchall()
-            print(f"📊 Получено {len(notes)} заметок пользователя {user_id}")
-            return notes
-        except Exception as e:
-            print(f"❌ Ошибка при получении заметок пользователя {user_id}: {e}")
-            return []
-        finally:
-            conn.close()
-
-    def get_note(self, note_id):
-        """Получаем метаданные заметки"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        try:
-            cursor.execute('SELECT * FROM notes WHERE id = ?', (note_id,))
-            note = cursor.fetchone()
-            print(f"📄 Получена заметка {note_id}")
-            return note
-        except Exception as e:
-            print(f"❌ Ошибка при получении заметки {note_id}: {e}")
-            return None
-        finally:
-            conn.close()
-
-    def search_notes(self, user_id, query):
-        """Поиск заметок по названию или хэштегу"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                SELECT id, title, hashtag, views, created_at 
-                FROM notes 
-                WHERE user_id = ? AND (title LIKE ? OR hashtag LIKE ?)
-                ORDER BY created_at DESC
-            ''', (user_id, f'%{query}%', f'%{query}%'))
-            notes = cursor.fetchall()
-            print(f"🔍 Найдено {len(notes)} заметок по запросу '{query}' для пользователя {user_id}")
-            return notes
-        except Exception as e:
-            print(f"❌ Ошибка при поиске заметок: {e}")
-            return []
-        finally:
-            conn.close()
-
-    def _generate_hashtag(self, title, user_id):
-        """Генерируем уникальный хэштег"""
-        base = f"{title}_{user_id}_{datetime.now().timestamp()}"
-        hashtag = f"tag{hashlib.md5(base.encode()).hexdigest()[:8]}"
-        print(f"🏷️ Сгенерирован хэштег: {hashtag}")
-        return hashtag
-
-    def increment_note_views(self, note_id):
-        """Увеличение счетчика просмотров заметки"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        try:
-            cursor.execute('UPDATE notes SET views = views + 1 WHERE id = ?', (note_id,))
-            conn.commit()
-            return True
-        except Exception as e:
-            print(f"❌ Ошибка при увеличении просмотров заметки: {e}")
-            return False
-        finally:
-            conn.close()
-
-    def get_note_views(self, note_id):
-        """Получение количества просмотров заметки"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        try:
-            cursor.execute('SELECT views FROM notes WHERE id = ?', (note_id,))
-            result = cursor.fetchone()
-            return result[0] if result else 0
-        except Exception as e:
-            print(f"❌ Ошибка при получении просмотров заметки: {e}")
-            return 0
-        finally:
-            conn.close()
-
-    # ========== ВИДЕО ==========
-
-    def add_video(self, category, index, user_id, youtube_url, title):
-        """Добавление пользовательского видео"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                INSERT INTO addon_videos 
-                (addon_category, addon_index, user_id, youtube_url, title)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (category, index, user_id, youtube_url, title))
-            conn.commit()
-            video_id = cursor.lastrowid
-            print(f"✅ Добавлено видео: user_id={user_id}, video_id={video_id}, аддон={category}/{index}")
-            return True, video_id
-        except Exception as e:
-            print(f"❌ Ошибка при добавлении видео: {e}")
-            return False, f"Ошибка базы данных: {str(e)}"
-        finally:
-            conn.close()
-
-    def get_videos(self, category, index, limit=20):
-        """Получение видео для аддона"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                SELECT id, user_id, youtube_url, title, description, likes, dislikes, views, verified, created_at
-                FROM addon_videos
-                WHERE addon_category = ? AND addon_index = ?
-                ORDER BY likes DESC, created_at DESC
-                LIMIT ?
-            ''', (category, index, limit))
-            videos = cursor.fetchall()
-            print(f"📊 Получено {len(videos)} видео для аддона {category}/{index}")
-            return videos
-        except Exception as e:
-            print(f"❌ Ошибка при получении видео: {e}")
-            return []
-        finally:
-            conn.close()
-
-    def get_video_by_id(self, video_id):
-        """Получение видео по ID"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                SELECT id, addon_category, addon_index, user_id, youtube_url, title, 
-                       description, likes, dislikes, views, verified, created_at
-                FROM addon_videos
-                WHERE id = ?
-            ''', (video_id,))
-            video = cursor.fetchone()
-            print(f"📊 Получено видео {video_id}")
-            return video
-        except Exception as e:
-            print(f"❌ Ошибка при получении видео {video_id}: {e}")
-            return None
-        finally:
-            conn.close()
-
-    def rate_video(self, video_id, user_id, is_like):
-        """Лайк или дизлайк видео"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        try:
-            # Проверяем, не оценивал ли уже
-            cursor.execute('SELECT COUNT(*) FROM video_likes WHERE video_id = ? AND user_id = ?',
-                           (video_id, user_id))
-
-            if cursor.fetchone()[0] > 0:
-                # Обновляем существующую оценку
-                cursor.execute('UPDATE video_likes SET is_like = ? WHERE video_id = ? AND user_id = ?',
-                               (is_like, video_id, user_id))
-
-                # Получаем старую оценку
-                cursor.execute('SELECT is_like FROM video_likes WHERE video_id = ? AND user_id = ?',
-                               (video_id, user_id))
-                old_is_like = cursor.fetchone()[0]
-
-                # Обновляем счетчики
-                if old_is_like and not is_like:  # был лайк, стал дизлайк
-                    cursor.execute('UPDATE addon_videos SET likes = likes - 1, dislikes = dislikes + 1 WHERE id = ?',
-                                   (video_id,))
-                elif not old_is_like and is_like:  # был дизлайк, стал лайк
-                    cursor.execute('UPDATE addon_videos SET likes = likes + 1, dislikes = dislikes - 1 WHERE id = ?',
-                                   (video_id,))
-            else:
-                # Добавляем новую оценку
-                cursor.execute('INSERT INTO video_likes (video_id, user_id, is_like) VALUES (?, ?, ?)',
-                               (video_id, user_id, is_like))
-
-                # Обновляем счетчики
-                if is_like:
-                    cursor.execute('UPDATE addon_videos SET likes = likes + 1 WHERE id = ?', (video_id,))
-                else:
-                    cursor.execute('UPDATE addon_videos SET dislikes = dislikes + 1 WHERE id = ?', (video_id,))
-
-            conn.commit()
-            action = "лайк" if is_like else "дизлайк"
-            print(f"{'👍' if is_like else '👎'} Пользователь {user_id} поставил {action} видео {video_id}")
-            return True, f"{'Лайк' if is_like else 'Дизлайк'} учтен"
-        except Exception as e:
-            print(f"❌ Ошибка при оценке видео {video_id} пользователем {user_id}: {e}")
-            return False, f"Ошибка: {str(e)}"
-        finally:
-            conn.close()
-
-    def get_user_rating(self, video_id, user_id):
-        """Получение оценки пользователя для видео"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        try:
-            cursor.execute('SELECT is_like FROM video_likes WHERE video_id = ? AND user_id = ?',
-                           (video_id, user_id))
-            result = cursor.fetchone()
-            if result:
-                return result[0]  # True = like, False = dislike
-            return None
-        except Exception as e:
-            print(f"❌ Ошибка при получении оценки пользователя: {e}")
-            return None
-        finally:
-            conn.close()
-
-    def delete_video(self, video_id, user_id):
-        """Удаление видео пользователем"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        try:
-            # Пользователь может удалить только свое видео
-            cursor.execute('DELETE FROM addon_videos WHERE id = ? AND user_id = ?',
-                           (video_id, user_id))
-            # Удаляем связанные оценки
-            cursor.execute('DELETE FROM video_likes WHERE video_id = ?', (video_id,))
-            conn.commit()
-            deleted = cursor.rowcount > 0
-            if deleted:
-                print(f"🗑️ Удалено видео {video_id} пользователем {user_id}")
-            return deleted
-        except Exception as e:
-            print(f"❌ Ошибка при удалении видео {video_id}: {e}")
-            return False
-        finally:
-            conn.close()
-
-    def delete_addon(category, index):
-        """Удаление аддона (для админов)"""
-        addons = get_addons(category)
-        if index < 0 or index >= len(addons):
-            return False
-
-        deleted_name = addons[index]["name"]
-        ADDONS_DATA[category].pop(index)
-
-        # Если в категории больше нет аддонов, удаляем категорию
-        if not ADDONS_DATA[category]:
-            del ADDONS_DATA[category]
-
-        save_data()
-        print(f"🗑️ Удален аддон: {deleted_name} из {category}")
-        return True
-
-    def get_total_videos(self):
-        """Получение общего количества видео"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        try:
-            cursor.execute('SELECT COUNT(*) FROM addon_videos')
-            count = cursor.fetchone()[0]
-            return count
-        except Exception as e:
-            print(f"❌ Ошибка при получении количества видео: {e}")
-            return 0
-        finally:
-            conn.close()
-
-    # ========== СТАТИСТИКА ==========
-
-    def log_note_action(self, note_id, user_id, action):
-        """Логирование действий с заметками"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                INSERT INTO note_stats (note_id, user_id, action)
-                VALUES (?, ?, ?)
-            ''', (note_id, user_id, action))
-            conn.commit()
-            return True
-        except Exception as e:
-            print(f"❌ Ошибка при логировании действия с заметкой: {e}")
-            return False
-        finally:
-            conn.close()
-
-    def log_video_action(self, video_id, user_id, action):
-        """Логирование действий с видео"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                INSERT INTO video_stats (video_id, user_id, action)
-                VALUES (?, ?, ?)
-            ''', (video_id, user_id, action))
-            conn.commit()
-            return True
-        except Exception as e:
-            print(f"❌ Ошибка при логировании действия с видео: {e}")
-            return False
-        finally:
-            conn.close()
-    # В класс Database добавьте после методов для видео:
-
-    def increment_addon_views(self, category, addon_index):
-        """Увеличение счетчика просмотров аддона"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        try:
-            # Пытаемся обновить существующую запись
-            cursor.execute('''
-                UPDATE addon_stats 
-                SET views = views + 1 
-                WHERE category = ? AND addon_index = ?
-            ''', (category, addon_index))
-
-            # Если записи не было, создаем новую
-            if cursor.rowcount == 0:
-                cursor.execute('''
-                    INSERT INTO addon_stats (category, addon_index, views)
-                    VALUES (?, ?, 1)
-                ''', (category, addon_index))
-
-            conn.commit()
-            return True
-        except Exception as e:
-            print(f"❌ Ошибка при увеличении просмотров аддона {category}/{addon_index}: {e}")
-            return False
-        finally:
-            conn.close()
-
-    def get_addon_views(self, category, addon_index):
-        """Получение количества просмотров аддона"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                SELECT views FROM addon_stats 
-                WHERE category = ? AND addon_index = ?
-            ''', (category, addon_index))
-            result = cursor.fetchone()
-            return result[0] if result else 0
-        except Exception as e:
-            print(f"❌ Ошибка при получении просмотров аддона: {e}")
-            return 0
-        finally:
-            conn.close()
-
-    def get_top_addons_by_views(self, limit=10, days=30):
-        """Получение топ аддонов по просмотрам"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        try:
-            query = '''
-                SELECT 
-                    category,
-                    addon_index,
-                    views,
-                    created_at
-                FROM addon_stats
-                WHERE created_at >= datetime('now', ?)
-                ORDER BY views DESC
-                LIMIT ?
-            '''
-            params = [f'-{days} days', limit]
-
-            cursor.execute(query, params)
-            addons = cursor.fetchall()
-            return addons
-        except Exception as e:
-            print(f"❌ Ошибка при получении топ аддонов: {e}")
-            return []
-        finally:
-            conn.close()
-
-    def get_overall_stats(self):
-        """Общая статистика бота"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        try:
-            stats = {}
-
-            # Статистика заметок
-            cursor.execute('SELECT COUNT(*), SUM(views) FROM notes')
-            notes_result = cursor.fetchone()
-            stats['notes'] = {
-                'total': notes_result[0] or 0,
-                'total_views': notes_result[1] or 0
-            }
-
-            # Статистика видео
-            cursor.execute('SELECT COUNT(*), SUM(views), SUM(likes), SUM(dislikes) FROM addon_videos')
-            videos_result = cursor.fetchone()
-            stats['videos'] = {
-                'total': videos_result[0] or 0,
-                'total_views': videos_result[1] or 0,
-                'total_likes': videos_result[2] or 0,
-                'total_dislikes': videos_result[3] or 0
-            }
-
-            # Статистика аддонов (НОВОЕ)
-            cursor.execute('SELECT COUNT(*), SUM(views) FROM addon_stats')
-            addons_result = cursor.fetchone()
-            stats['addons'] = {
-                'total': addons_result[0] or 0,
-                'total_views': addons_result[1] or 0
-            }
-
-            # Статистика пользователей
-            cursor.execute('SELECT COUNT(DISTINCT user_id) FROM notes')
-            notes_users = cursor.fetchone()[0] or 0
-            cursor.execute('SELECT COUNT(DISTINCT user_id) FROM addon_videos')
-            videos_users = cursor.fetchone()[0] or 0
-            cursor.execute('SELECT COUNT(DISTINCT user_id) FROM video_likes')
-            likes_users = cursor.fetchone()[0] or 0
-
-            stats['users'] = {
-                'notes': notes_users,
-                'videos': videos_users,
-                'likes': likes_users
-            }
-
-            return stats
-        except Exception as e:
-            print(f"❌ Ошибка при получении общей статистики: {e}")
-            return {}
-        finally:
-            conn.close()
-
-    def get_video_stats(self, video_id=None, days=7):
-        """Получение статистики по видео"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        try:
-            query = '''
-                SELECT 
-                    video_id,
-                    action,
-                    COUNT(*) as count,
-                    COUNT(DISTINCT user_id) as unique_users
-                FROM video_stats
-                WHERE created_at >= datetime('now', ?)
-            '''
-            params = [f'-{days} days']
-
-            if video_id:
-                query += ' AND video_id = ?'
-                params.append(video_id)
-
-            query += ' GROUP BY video_id, action ORDER BY video_id, action'
-
-            cursor.execute(query, params)
-            stats = cursor.fetchall()
-
-            result = {}
-            for stat in stats:
-                vid = stat[0]
-                if vid not in result:
-                    result[vid] = {}
-                result[vid][stat[1]] = {
-                    'count': stat[2],
-                    'unique_users': stat[3]
-                }
-
-            return result
-        except Exception as e:
-            print(f"❌ Ошибка при получении статистики видео: {e}")
-            return {}
-        finally:
-            conn.close()
-
-    # В функции get_top_videos в database.py ИСПРАВЬТЕ запрос:
-    def get_top_videos(self, category=None, index=None, limit=10, days=30):
-        """Получение топ видео по просмотрам"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        try:
-            query = '''
-                SELECT 
-                    v.id,
-                    v.title,
-                    v.youtube_url,
-                    v.views,
-                    v.likes,
-                    v.dislikes,
-                    v.addon_category,   # <- ДОБАВЬТЕ это поле
-                    v.addon_index       # <- ДОБАВЬТЕ это поле
-                FROM addon_videos v
-                WHERE v.created_at >= datetime('now', ?)
-            '''
-            # ... остальной код функции без изменений
-
-            params = [f'-{days} days']
-
-            if category and index is not None:
-                query += ' AND v.addon_category = ? AND v.addon_index = ?'
-                params.extend([category, index])
-
-            query += '''
-                GROUP BY v.id
-                ORDER BY v.views DESC, v.likes DESC
-                LIMIT ?
-            '''
-            params.append(limit)
-
-            cursor.execute(query, params)
-            videos = cursor.fetchall()
-
-            return videos
-        except Exception as e:
-            print(f"❌ Ошибка при получении топ видео: {e}")
-            return []
-        finally:
-            conn.close()
-
-
-# В database.py добавьте в класс Database новые методы:
-
-# Добавьте после метода get_link_stats в классе Database:
-
-    def get_addon_link_stats(self, category, index, days=30):
-        """Получение статистики кликов по ссылкам для конкретного аддона"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        try:
-            query = '''
-                SELECT 
-                    link_type,
-                    COUNT(*) as total_clicks,
-                    COUNT(DISTINCT user_id) as unique_users,
-                    COUNT(CASE WHEN created_at >= datetime('now', ?) THEN 1 END) as recent_clicks
-                FROM link_clicks
-                WHERE addon_category = ? AND addon_index = ?
-                GROUP BY link_type
-                ORDER BY link_type
-            '''
-            params = [f'-{days} days', category, index]
-
-            cursor.execute(query, params)
-            stats = cursor.fetchall()
-
-            result = {}
-            for stat in stats:
-                link_type = stat[0]
-                result[link_type] = {
-                    'total_clicks': stat[1],
-                    'unique_users': stat[2],
-                    'recent_clicks': stat[3]
-                }
-
-            return result
-        except Exception as e:
-            print(f"❌ Ошибка при получении статистики ссылок аддона: {e}")
-            return {}
-        finally:
-            conn.close()
-
-
-    def get_addon_video_stats(self, category, index, days=30):
-        """Получение статистики по видео для конкретного аддона"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        try:
-            # Статистика по добавленным видео
-            cursor.execute('''
-                SELECT 
-                    COUNT(*) as total_videos,
-                    SUM(views) as total_views,
-                    SUM(likes) as total_likes,
-                    SUM(dislikes) as total_dislikes
-                FROM addon_videos
-                WHERE addon_category = ? AND addon_index = ?
-            ''', (category, index))
-
-            video_stats = cursor.fetchone()
-
-            # Статистика по действиям с видео за период
-            cursor.execute('''
-                SELECT 
-                    vs.action,
-                    COUNT(*) as count,
-                    COUNT(DISTINCT vs.user_id) as unique_users
-                FROM video_stats vs
-                JOIN addon_videos av ON vs.video_id = av.id
-                WHERE av.addon_category = ? 
-                  AND av.addon_index = ?
-                  AND vs.created_at >= datetime('now', ?)
-                GROUP BY vs.action
-            ''', (category, index, f'-{days} days'))
-
-            recent_actions = {}
-            for row in cursor.fetchall():
-                action = row[0]
-                recent_actions[action] = {
-                    'count': row[1],
-                    'unique_users': row[2]
-                }
-
-            return {
-                'total_videos': video_stats[0] or 0,
-                'total_views': video_stats[1] or 0,
-                'total_likes': video_stats[2] or 0,
-                'total_dislikes': video_stats[3] or 0,
-                'recent_actions': recent_actions
-            }
-        except Exception as e:
-            print(f"❌ Ошибка при получении статистики видео аддона: {e}")
-            return {}
-        finally:
-            conn.close()
-# Создаем глобальный экземпляр базы данных
-db = Database()
\ No newline at end of file
+# file: database.py
+import asyncio
+import functools
+import re
+import sqlite3
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from config import (
+    DB_FILE, DB_EXECUTOR_WORKERS, DB_MAX_PENDING,
+    STATS_RAW_RETENTION_DAYS, STATS_HOURLY_RETENTION_DAYS, STATS_DAILY_RETENTION_DAYS
+)
+from db_pool import ConnectionManager
+from write_buffer import WriteBehindBuffer
+
+# Формат хэштегов из _generate_hashtag
+HASHTAG_RE = re.compile(r'tag[0-9a-f]{8}')
+
+# Итоги в stats_totals: таблица -> {имя счётчика: суммируемая колонка или None для числа строк}
+STATS_COUNTERS = {
+    'notes': {'notes_total': None, 'notes_views': 'views'},
+    'addon_videos': {
+        'videos_total': None, 'videos_views': 'views',
+        'videos_likes': 'likes', 'videos_dislikes': 'dislikes'
+    },
+    'addon_stats': {'addons_total': None, 'addons_views': 'views'},
+}
+
+# Сырые события, которые сворачиваются в почасовые и посуточные таблицы: таблица -> ключ
+STATS_ROLLUPS = {
+    'video_stats': 'video_id',
+    'note_stats': 'note_id',
+}
+
+# Уникальные пользователи: таблица -> (вид в stats_users, имя счётчика в stats_totals)
+STATS_USERS = {
+    'notes': ('notes', 'users_notes'),
+    'addon_videos': ('videos', 'users_videos'),
+    'video_likes': ('likes', 'users_likes'),
+}
+
+
+class Database:
+    def __init__(self, db_file=DB_FILE):
+        self.db_file = db_file
+        # Постоянные соединения: один писатель и пул читателей (WAL)
+        self.pool = ConnectionManager(db_file)
+        self.init_db()
+        # Просмотры и события статистики пишутся пачками
+        self.buffer = WriteBehindBuffer(self._flush_buffer)
+
+    def close(self):
+        """Сброс буфера и закрытие всех соединений с базой"""
+        self.buffer.close()
+        self.pool.close()
+
+    # В методе init_db удалите создание таблицы link_clicks:
+    def init_db(self):
+        """Инициализация базы данных"""
+        conn = self.pool.writer()
+        cursor = conn.cursor()
+
+        print("🔄 Инициализация базы данных...")
+
+        self._migrate_legacy_addon_keys(cursor)
+
+        # Таблица заметок
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS notes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                title TEXT,
+                hashtag TEXT UNIQUE,
+                message_id INTEGER,
+                chat_id INTEGER,
+                views INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Таблица пользовательских видео для аддонов
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS addon_videos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                addon_id INTEGER,
+                user_id INTEGER,
+                youtube_url TEXT,
+                title TEXT,
+                description TEXT DEFAULT '',
+                likes INTEGER DEFAULT 0,
+                dislikes INTEGER DEFAULT 0,
+                views INTEGER DEFAULT 0,
+                verified BOOLEAN DEFAULT TRUE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Таблица лайков видео
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS video_likes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                video_id INTEGER,
+                user_id INTEGER,
+                is_like BOOLEAN,  -- TRUE = like, FALSE = dislike
+                UNIQUE(video_id, user_id)
+            )
+        ''')
+
+        # Таблица для статистики заметок
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS note_stats (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                note_id INTEGER,
+                user_id INTEGER,
+                action TEXT,  -- 'view', 'search', 'open'
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (note_id) REFERENCES notes(id) ON DELETE CASCADE
+            )
+        ''')
+
+        # УДАЛЕНО: Таблица для статистики ссылок (GitHub, YouTube)
+
+        # Таблица для статистики видео
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS video_stats (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                video_id INTEGER,
+                user_id INTEGER,
+                action TEXT,  -- 'view', 'like', 'dislike', 'add'
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (video_id) REFERENCES addon_videos(id) ON DELETE CASCADE
+            )
+        ''')
+        # В методе init_db() добавьте после создания таблицы video_stats:
+
+        # Таблица для статистики просмотров аддонов
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS addon_stats (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                addon_id INTEGER NOT NULL UNIQUE,
+                views INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Каталог аддонов: id категорий и аддонов не меняются после удаления соседей
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS categories (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE,
+                position INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS addons (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                category_id INTEGER NOT NULL,
+                position INTEGER NOT NULL DEFAULT 0,
+                name TEXT NOT NULL,
+                description TEXT DEFAULT '',
+                github TEXT DEFAULT '',
+                youtube TEXT DEFAULT '',
+                FOREIGN KEY (category_id) REFERENCES categories(id)
+            )
+        ''')
+        # Ревизия каталога: растёт с каждым изменением categories/addons.
+        # Записывается в addons_data.json, чтобы не применять устаревший файл
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS catalog_meta (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                revision INTEGER NOT NULL
+            )
+        ''')
+
+        # Названия видео YouTube, полученные из сети (по id видео YouTube).
+        # status: 'ok' - название получено, 'failed' - видео недоступно (запоминается на короткий срок)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS video_metadata (
+                video_id TEXT PRIMARY KEY,
+                title TEXT,
+                source TEXT,
+                status TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        ''')
+
+        # Состояние пошаговых сценариев пользователей (context.user_data) по ключам.
+        # value - JSON, expires_at - когда ключ считается брошенным и удаляется
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS user_state (
+                user_id INTEGER NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (user_id, key)
+            ) WITHOUT ROWID
+        ''')
+
+        # Индекс для быстрого поиска
+
+
+        # Индексы для быстрого поиска
+        try:
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_videos_user ON addon_videos(user_id)')
+            # Индексы для постраничного вывода по курсору
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_notes_user_page ON notes(user_id, created_at, id)')
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_videos_addon_page '
+                'ON addon_videos(addon_id, likes, created_at, id)'
+            )
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_addons_category ON addons(category_id, position)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_note_stats_note ON note_stats(note_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_video_stats_video ON video_stats(video_id)')
+        except Exception as e:
+            print(f"⚠️ Ошибка при создании индексов: {e}")
+
+        self._init_notes_fts(cursor)
+        self._init_stats_totals(cursor)
+        self._init_stats_rollups(cursor)
+
+        conn.commit()
+        conn.close()
+        print("✅ База данных инициализирована")
+
+    def _migrate_legacy_addon_keys(self, cursor):
+        """Подготовка старой схемы, где аддон задавался парой (категория, индекс).
+
+        В addon_videos добавляется колонка addon_id, старая addon_stats
+        переименовывается в addon_stats_legacy. Сами строки переносятся
+        в import_catalog, когда каталог загружен и известны id аддонов.
+        """
+        cursor.execute('PRAGMA table_info(addon_videos)')
+        columns = [row[1] for row in cursor.fetchall()]
+        if columns and 'addon_id' not in columns:
+            cursor.execute('ALTER TABLE addon_videos ADD COLUMN addon_id INTEGER')
+            cursor.execute('DROP INDEX IF EXISTS idx_videos_addon')
+            cursor.execute('DROP INDEX IF EXISTS idx_videos_addon_page')
+            print("🔄 В addon_videos добавлена колонка addon_id")
+
+        cursor.execute('PRAGMA table_info(addon_stats)')
+        columns = [row[1] for row in cursor.fetchall()]
+        if columns and 'addon_id' not in columns:
+            # Триггеры итогов переехали бы вместе с таблицей
+            for event in ('insert', 'delete', 'update'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS addon_stats_totals_{event}')
+            cursor.execute('DROP INDEX IF EXISTS idx_addon_stats_cat')
+            cursor.execute('ALTER TABLE addon_stats RENAME TO addon_stats_legacy')
+            print("🔄 Старая addon_stats переименована в addon_stats_legacy")
+
+    def _remap_legacy_addons(self, cursor):
+        """Перенос строк со ссылками (категория, индекс) на addon_id.
+
+        Позиция аддона при импорте равна его старому индексу в списке категории.
+        """
+        cursor.execute('PRAGMA table_info(addon_videos)')
+        if 'addon_category' in [row[1] for row in cursor.fetchall()]:
+            cursor.execute('''
+                UPDATE addon_videos SET addon_id = a.id
+                FROM addons a JOIN categories c ON c.id = a.category_id
+                WHERE addon_videos.addon_id IS NULL
+                  AND c.name = addon_videos.addon_category
+                  AND a.position = addon_videos.addon_index
+            ''')
+            print(f"🔄 Видео привязано к addon_id: {cursor.rowcount}")
+
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'addon_stats_legacy'")
+        if cursor.fetchone() is not None:
+            cursor.execute('''
+                INSERT INTO addon_stats (addon_id, views, created_at)
+                SELECT a.id, s.views, s.created_at
+                FROM addon_stats_legacy s
+                JOIN categories c ON c.name = s.category
+                JOIN addons a ON a.category_id = c.id AND a.position = s.addon_index
+                WHERE true
+                ON CONFLICT(addon_id) DO UPDATE SET views = views + excluded.views
+            ''')
+            print(f"🔄 Перенесено строк статистики аддонов: {cursor.rowcount}")
+            cursor.execute('DROP TABLE addon_stats_legacy')
+
+    def _init_notes_fts(self, cursor):
+        """Полнотекстовый индекс FTS5 по названиям и хэштегам заметок.
+
+        Индекс хранит только токены (content='notes'), синхронизируется
+        триггерами. Колонка user_id индексируется как токен, чтобы поиск
+        сразу пересекал списки документов пользователя и запроса.
+        При первом создании индекс заполняется из существующих заметок.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'notes_fts'")
+        exists = cursor.fetchone() is not None
+
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+                user_id, title, hashtag,
+                content='notes', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS notes_fts_insert AFTER INSERT ON notes BEGIN
+                INSERT INTO notes_fts (rowid, user_id, title, hashtag)
+                VALUES (new.id, new.user_id, new.title, new.hashtag);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS notes_fts_delete AFTER DELETE ON notes BEGIN
+                INSERT INTO notes_fts (notes_fts, rowid, user_id, title, hashtag)
+                VALUES ('delete', old.id, old.user_id, old.title, old.hashtag);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS notes_fts_update AFTER UPDATE OF user_id, title, hashtag ON notes BEGIN
+                INSERT INTO notes_fts (notes_fts, rowid, user_id, title, hashtag)
+                VALUES ('delete', old.id, old.user_id, old.title, old.hashtag);
+                INSERT INTO notes_fts (rowid, user_id, title, hashtag)
+                VALUES (new.id, new.user_id, new.title, new.hashtag);
+            END
+        ''')
+
+        if not exists:
+            cursor.execute("INSERT INTO notes_fts (notes_fts) VALUES ('rebuild')")
+            print("✅ Построен полнотекстовый индекс заметок")
+
+    def rebuild_notes_index(self):
+        """Полная перестройка полнотекстового индекса заметок"""
+        conn = self.pool.writer()
+        try:
+            conn.execute("INSERT INTO notes_fts (notes_fts) VALUES ('rebuild')")
+            conn.commit()
+            print("✅ Полнотекстовый индекс заметок перестроен")
+            return True
+        except Exception as e:
+            print(f"❌ Ошибка при перестройке индекса заметок: {e}")
+            return False
+        finally:
+            conn.close()
+
+    def _init_stats_totals(self, cursor):
+        """Таблицы итогов для общей статистики и триггеры, которые их поддерживают.
+
+        stats_totals хранит счётчики по имени, stats_users - число записей
+        каждого пользователя по видам (заметки, видео, оценки), чтобы
+        количество уникальных пользователей менялось только при появлении
+        первой и удалении последней записи пользователя.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stats_totals'")
+        exists = cursor.fetchone() is not None
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS stats_totals (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS stats_users (
+                kind TEXT NOT NULL,
+                user_id INTEGER NOT NULL,
+                refs INTEGER NOT NULL,
+                PRIMARY KEY (kind, user_id)
+            ) WITHOUT ROWID
+        ''')
+
+        for table, counters in STATS_COUNTERS.items():
+            names = ', '.join(f"'{name}'" for name in counters)
+            for event, row, sign in (('INSERT', 'new', '+'), ('DELETE', 'old', '-')):
+                cases = ' '.join(
+                    f"WHEN '{name}' THEN {'1' if column is None else f'COALESCE({row}.{column}, 0)'}"
+                    for name, column in counters.items()
+                )
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS {table}_totals_{event.lower()} AFTER {event} ON {table} BEGIN
+                        UPDATE stats_totals SET value = value {sign} CASE name {cases} END
+                        WHERE name IN ({names});
+                    END
+                ''')
+            columns = {name: column for name, column in counters.items() if column}
+            if columns:
+                cases = ' '.join(
+                    f"WHEN '{name}' THEN COALESCE(new.{column}, 0) - COALESCE(old.{column}, 0)"
+                    for name, column in columns.items()
+                )
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS {table}_totals_update
+                    AFTER UPDATE OF {', '.join(columns.values())} ON {table} BEGIN
+                        UPDATE stats_totals SET value = value + CASE name {cases} END
+                        WHERE name IN ({', '.join(f"'{name}'" for name in columns)});
+                    END
+                ''')
+
+        for table, (kind, name) in STATS_USERS.items():
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_users_insert AFTER INSERT ON {table}
+                WHEN new.user_id IS NOT NULL BEGIN
+                    UPDATE stats_totals SET value = value + 1
+                    WHERE name = '{name}' AND NOT EXISTS (
+                        SELECT 1 FROM stats_users WHERE kind = '{kind}' AND user_id = new.user_id
+                    );
+                    INSERT INTO stats_users (kind, user_id, refs) VALUES ('{kind}', new.user_id, 1)
+                    ON CONFLICT(kind, user_id) DO UPDATE SET refs = refs + 1;
+                END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_users_delete AFTER DELETE ON {table}
+                WHEN old.user_id IS NOT NULL BEGIN
+                    UPDATE stats_users SET refs = refs - 1 WHERE kind = '{kind}' AND user_id = old.user_id;
+                    UPDATE stats_totals SET value = value - 1
+                    WHERE name = '{name}' AND EXISTS (
+                        SELECT 1 FROM stats_users WHERE kind = '{kind}' AND user_id = old.user_id AND refs <= 0
+                    );
+                    DELETE FROM stats_users WHERE kind = '{kind}' AND user_id = old.user_id AND refs <= 0;
+                END
+            ''')
+
+        if not exists:
+            self._rebuild_stats_totals(cursor)
+            print("✅ Заполнены итоги статистики")
+
+    def _rebuild_stats_totals(self, cursor):
+        """Пересчёт итогов статистики по основным таблицам"""
+        cursor.execute('DELETE FROM stats_totals')
+        for table, counters in STATS_COUNTERS.items():
+            columns = [f"COALESCE(SUM({column}), 0)" if column else "COUNT(*)" for column in counters.values()]
+            cursor.execute(f"SELECT {', '.join(columns)} FROM {table}")
+            cursor.executemany('INSERT INTO stats_totals (name, value) VALUES (?, ?)',
+                               list(zip(counters, cursor.fetchone())))
+
+        cursor.execute('DELETE FROM stats_users')
+        for table, (kind, name) in STATS_USERS.items():
+            cursor.execute(f'''
+                INSERT INTO stats_users (kind, user_id, refs)
+                SELECT ?, user_id, COUNT(*) FROM {table}
+                WHERE user_id IS NOT NULL
+                GROUP BY user_id
+            ''', (kind,))
+            cursor.execute('''
+                INSERT INTO stats_totals (name, value)
+                SELECT ?, COUNT(*) FROM stats_users WHERE kind = ?
+            ''', (name, kind))
+
+    def _init_stats_rollups(self, cursor):
+        """Почасовые и посуточные свёртки событий video_stats и note_stats.
+
+        {table}_{period} хранит число событий в интервале, {table}_{period}_users -
+        кто совершал действие в интервале: уникальных пользователей за период
+        нельзя получить сложением уникальных по интервалам, они считаются
+        COUNT(DISTINCT) по этим множествам.
+        """
+        for table, key in STATS_ROLLUPS.items():
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_created ON {table}(created_at)')
+            for period in ('hourly', 'daily'):
+                cursor.execute(f'''
+                    CREATE TABLE IF NOT EXISTS {table}_{period} (
+                        bucket TEXT NOT NULL,
+                        {key} INTEGER,
+                        action TEXT NOT NULL,
+                        count INTEGER NOT NULL DEFAULT 0,
+                        PRIMARY KEY (bucket, {key}, action)
+                    ) WITHOUT ROWID
+                ''')
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS idx_{table}_{period}_key ON {table}_{period}({key}, bucket)'
+                )
+                cursor.execute(f'''
+                    CREATE TABLE IF NOT EXISTS {table}_{period}_users (
+                        bucket TEXT NOT NULL,
+                        {key} INTEGER,
+                        action TEXT NOT NULL,
+                        user_id INTEGER NOT NULL,
+                        PRIMARY KEY (bucket, {key}, action, user_id)
+                    ) WITHOUT ROWID
+                ''')
+
+    def _windowed_actions_sql(self, table, days):
+        """Подзапросы за последние days дней: события (ключ, action, count)
+        и пользователи (ключ, action, user_id), плюс параметры каждого из них.
+
+        Свежие события берутся из сырой таблицы, более старые - из свёрток
+        (почасовых, пока они хранятся, иначе посуточных). Уникальных
+        пользователей вызывающий считает COUNT(DISTINCT user_id) по второму
+        подзапросу на нужном ему уровне группировки; для окон длиннее
+        STATS_DAILY_RETENTION_DAYS это число за последние
+        STATS_DAILY_RETENTION_DAYS дней.
+        """
+        key = STATS_ROLLUPS[table]
+        if days <= STATS_HOURLY_RETENTION_DAYS:
+            rollup, bucket = f'{table}_hourly', "strftime('%Y-%m-%d %H:00:00', 'now', ?)"
+        else:
+            rollup, bucket = f'{table}_daily', "date('now', ?)"
+        events = f'''
+            SELECT {key}, action, COUNT(*) AS count
+            FROM {table}
+            WHERE created_at >= datetime('now', ?)
+            GROUP BY {key}, action
+            UNION ALL
+            SELECT {key}, action, count
+            FROM {rollup}
+            WHERE bucket >= {bucket}
+        '''
+        users = f'''
+            SELECT {key}, action, user_id
+            FROM {table}
+            WHERE created_at >= datetime('now', ?)
+            UNION ALL
+            SELECT {key}, action, user_id
+            FROM {rollup}_users
+            WHERE bucket >= {bucket}
+        '''
+        return events, users, [f'-{days} days', f'-{days} days']
+
+    def compact_stats(self, raw_retention_days=STATS_RAW_RETENTION_DAYS,
+                      hourly_retention_days=STATS_HOURLY_RETENTION_DAYS,
+                      daily_retention_days=STATS_DAILY_RETENTION_DAYS):
+        """Свёртка старых событий статистики.
+
+        События старше raw_retention_days (целыми сутками) суммируются в
+        почасовые и посуточные таблицы и удаляются из сырых таблиц.
+        Почасовые свёртки старше hourly_retention_days удаляются,
+        посуточные счётчики хранятся всегда, а посуточные множества
+        пользователей - daily_retention_days.
+        """
+        conn = self.pool.writer()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT date('now', ?), date('now', ?), date('now', ?)",
+                           (f'-{raw_retention_days} days', f'-{hourly_retention_days} days',
+                            f'-{daily_retention_days} days'))
+            cutoff, hourly_cutoff, daily_cutoff = cursor.fetchone()
+
+            folded = 0
+            for table, key in STATS_ROLLUPS.items():
+                for period, bucket in (('hourly', "strftime('%Y-%m-%d %H:00:00', created_at)"),
+                                       ('daily', 'date(created_at)')):
+                    cursor.execute(f'''
+                        INSERT INTO {table}_{period} (bucket, {key}, action, count)
+                        SELECT {bucket}, {key}, action, COUNT(*)
+                        FROM {table}
+                        WHERE created_at < ?
+                        GROUP BY 1, 2, 3
+                        ON CONFLICT(bucket, {key}, action) DO UPDATE SET
+                            count = count + excluded.count
+                    ''', (cutoff,))
+                    cursor.execute(f'''
+                        INSERT OR IGNORE INTO {table}_{period}_users (bucket, {key}, action, user_id)
+                        SELECT DISTINCT {bucket}, {key}, action, user_id
+                        FROM {table}
+                        WHERE created_at < ? AND user_id IS NOT NULL
+                    ''', (cutoff,))
+                cursor.execute(f'DELETE FROM {table} WHERE created_at < ?', (cutoff,))
+                folded += cursor.rowcount
+                cursor.execute(f'DELETE FROM {table}_hourly WHERE bucket < ?', (hourly_cutoff,))
+                cursor.execute(f'DELETE FROM {table}_hourly_users WHERE bucket < ?', (hourly_cutoff,))
+                cursor.execute(f'DELETE FROM {table}_daily_users WHERE bucket < ?', (daily_cutoff,))
+
+            conn.commit()
+            if folded:
+                print(f"🗜️ Свёрнуто событий статистики: {folded} (до {cutoff})")
+            return folded
+        except Exception as e:
+            print(f"❌ Ошибка при свёртке статистики: {e}")
+            return 0
+        finally:
+            conn.close()
+
+    def rebuild_stats_totals(self):
+        """Сверка: пересчёт итогов статистики с нуля"""
+        self.buffer.flush()
+        conn = self.pool.writer()
+        try:
+            self._rebuild_stats_totals(conn.cursor())
+            conn.commit()
+            print("✅ Итоги статистики пересчитаны")
+            return True
+        except Exception as e:
+            print(f"❌ Ошибка при пересчёте итогов статистики: {e}")
+            return False
+        finally:
+            conn.close()
+
+    # ========== ЗАМЕТКИ ==========
+
+    def save_note(self, user_id, title, message_id, chat_id):
+        """Сохраняем только метаданные заметки"""
+        hashtag = self._generate_hashtag(title, user_id)
+        conn = self.pool.writer()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('''
+                INSERT INTO notes (user_id, title, hashtag, message_id, chat_id)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (user_id, title, hashtag, message_id, chat_id))
+            conn.commit()
+            note_id = cursor.lastrowid
+            print(f"✅ Сохранена заметка: user_id={user_id}, title='{title}', note_id={note_id}")
+        except Exception as e:
+            print(f"❌ Ошибка при сохранении заметки: {e}")
+            raise
+        finally:
+            conn.close()
+        return note_id, hashtag
+
+    def get_user_notes(self, user_id, limit=20):
+        """Получаем только метаданные заметок пользователя"""
+        conn = self.pool.reader()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('''
+                SELECT id, title, hashtag, views, created_at 
+                FROM notes 
+                WHERE user_id = ? 
+                ORDER BY created_at DESC 
+                LIMIT ?
+            ''', (user_id, limit))
+            notes = cursor.fetchall()
+            print(f"📊 Получено {len(notes)} заметок пользователя {user_id}")
+            return notes
+        except Exception as e:
+            print(f"❌ Ошибка при получении заметок пользователя {user_id}: {e}")
+            return []
+        finally:
+            conn.close()
+
+    def _keyset_page(self, conn, query, params, key, cursor_sql, cursor_params, direction, limit):
+        """Страница по курсору (keyset): стоимость не зависит от номера страницы.
+
+        query содержит {where} и {order}; key - колонки сортировки,
+        cursor_sql - значения ключа граничной строки. Строки упорядочены
+        по убыванию ключа; для direction='prev' они выбираются в обратном
+        порядке и разворачиваются. Возвращает (строки, есть_ли_ещё).
+        """
+        backwards = cursor_params is not None and direction == 'prev'
+        where = ''
+        if cursor_params is not None:
+            where = f"AND ({', '.join(key)}) {'>' if backwards else '<'} ({cursor_sql})"
+        order = ', '.join(f"{column} {'ASC' if backwards else 'DESC'}" for column in key)
+
+        rows = conn.execute(
+            query.format(where=where, order=order),
+            list(params) + list(cursor_params or ()) + [limit + 1]
+        ).fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if backwards:
+            rows.reverse()
+        return rows, has_more
+
+    @staticmethod
+    def _page_cursors(rows, cursor, direction, has_more, make_cursor):
+        """Курсоры соседних страниц: (назад, вперёд), None - страницы нет"""
+        if not rows:
+            return None, None
+        if cursor is None:
+            return None, (make_cursor(rows[-1]) if has_more else None)
+        if direction == 'prev':
+            return (make_cursor(rows[0]) if has_more else None), make_cursor(rows[-1])
+        return make_cursor(rows[0]), (make_cursor(rows[-1]) if has_more else None)
+
+    def get_user_notes_page(self, user_id, cursor=None, direction='next', limit=20):
+        """Страница заметок пользователя, новые сверху.
+
+        cursor - id граничной заметки соседней страницы, direction - 'next'
+        (более старые) или 'prev' (более новые).
+        Возвращает (заметки, курсор_назад, курсор_вперёд).
+        """
+        conn = self.pool.reader()
+        try:
+            notes, has_more = self._keyset_page(
+                conn,
+                '''
+                    SELECT id, title, hashtag, views, created_at
+                    FROM notes
+                    WHERE user_id = ? {where}
+                    ORDER BY {order}
+                    LIMIT ?
+                ''',
+                [user_id],
+                ['created_at', 'id'],
+                '(SELECT created_at FROM notes WHERE id = ?), ?',
+                [cursor, cursor] if cursor is not None else None,
+                direction, limit
+            )
+            prev_cursor, next_cursor = self._page_cursors(
+                notes, cursor, direction, has_more, lambda note: str(note[0])
+            )
+            print(f"📊 Получено {len(notes)} заметок пользователя {user_id}")
+            return notes, prev_cursor, next_cursor
+        except Exception as e:
+            print(f"❌ Ошибка при получении заметок пользователя {user_id}: {e}")
+            return [], None, None
+        finally:
+            conn.close()
+
+    def get_note(self, note_id):
+        """Получаем метаданные заметки"""
+        conn = self.pool.reader()
+        cursor = conn.cursor()
+        try:
+            with self.buffer.reading():
+                cursor.execute('SELECT * FROM notes WHERE id = ?', (note_id,))
+                note = cursor.fetchone()
+                pending = self.buffer.pending_counter('note_views', note_id)
+            if note and pending:
+                note = note[:6] + ((note[6] or 0) + pending,) + note[7:]
+            print(f"📄 Получена заметка {note_id}")
+            return note
+        except Exception as e:
+            print(f"❌ Ошибка при получении заметки {note_id}: {e}")
+            return None
+        finally:
+            conn.close()
+
+    def search_notes(self, user_id, query, limit=50):
+        """Поиск заметок по названию или хэштегу.
+
+        Запрос вида '#tag1a2b3c4d' ищется точным совпадением по индексу
+        хэштегов, остальные - по FTS5 с префиксным поиском слов и
+        сортировкой по bm25.
+        """
+        conn = self.pool.reader()
+        cursor = conn.cursor()
+        try:
+            query = query.strip()
+            hashtag = query.lstrip('#')
+            if query.startswith('#') or HASHTAG_RE.fullmatch(hashtag):
+                cursor.execute('''
+                    SELECT id, title, hashtag, views, created_at
+                    FROM notes
+                    WHERE hashtag = ? AND user_id = ?
+                ''', (hashtag, user_id))
+                notes = cursor.fetchall()
+                if notes:
+                    print(f"🔍 Найдена заметка по хэштегу '#{hashtag}' для пользователя {user_id}")
+                    return notes
+
+            words = re.findall(r'\w+', query)
+            if not words:
+                return []
+            terms = ' AND '.join('"{}"*'.format(word) for word in words)
+            cursor.execute('''
+                SELECT n.id, n.title, n.hashtag, n.views, n.created_at
+                FROM notes_fts
+                JOIN notes n ON n.id = notes_fts.rowid
+                WHERE notes_fts MATCH ?
+                ORDER BY bm25(notes_fts, 0.0, 10.0, 5.0), n.created_at DESC
+                LIMIT ?
+            ''', (f'user_id:{int(user_id)} AND {{title hashtag}}: ({terms})', limit))
+            notes = cursor.fetchall()
+            print(f"🔍 Найдено {len(notes)} заметок по запросу '{query}' для пользователя {user_id}")
+            return notes
+        except Exception as e:
+            print(f"❌ Ошибка при поиске заметок: {e}")
+            return []
+        finally:
+            conn.close()
+
+    def _generate_hashtag(self, title, user_id):
+        """Генерируем уникальный хэштег"""
+        base = f"{title}_{user_id}_{datetime.now().timestamp()}"
+        hashtag = f"tag{hashlib.md5(base.encode()).hexdigest()[:8]}"
+        print(f"🏷️ Сгенерирован хэштег: {hashtag}")
+        return hashtag
+
+    def increment_note_views(self, note_id):
+        """Увеличение счетчика просмотров заметки (через буфер отложенной записи)"""
+        self.buffer.add_counter('note_views', note_id)
+        return True
+
+    def get_note_views(self, note_id):
+        """Получение количества просмотров заметки"""
+        conn = self.pool.reader()
+        cursor = conn.cursor()
+        try:
+            with self.buffer.reading():
+                cursor.execute('SELECT views FROM notes WHERE id = ?', (note_id,))
+                result = cursor.fetchone()
+                return (result[0] if result else 0) + self.buffer.pending_counter('note_views', note_id)
+        except Exception as e:
+            print(f"❌ Ошибка при получении просмотров заметки: {e}")
+            return 0
+        finally:
+            conn.close()
+
+    # ========== ВИДЕО ==========
+
+    def add_video(self, addon_id, user_id, youtube_url, title):
+        """Добавление пользовательского видео"""
+        conn = self.pool.writer()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('''
+                INSERT INTO addon_videos 
+                (addon_id, user_id, youtube_url, title)
+                VALUES (?, ?, ?, ?)
+            ''', (addon_id, user_id, youtube_url, title))
+            conn.commit()
+            video_id = cursor.lastrowid
+            print(f"✅ Добавлено видео: user_id={user_id}, video_id={video_id}, аддон={addon_id}")
+            return True, video_id
+        except Exception as e:
+            print(f"❌ Ошибка при добавлении видео: {e}")
+            return False, f"Ошибка базы данных: {str(e)}"
+        finally:
+            conn.close()
+
+    def get_video_metadata(self, youtube_id):
+        """Сохранённые данные видео YouTube: (title, source, status, fetched_at) или None"""
+        conn = self.pool.reader()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                'SELECT title, source, status, fetched_at FROM video_metadata WHERE video_id = ?',
+                (youtube_id,)
+            )
+            return cursor.fetchone()
+        except Exception as e:
+            print(f"❌ Ошибка при получении данных видео {youtube_id}: {e}")
+            return None
+        finally:
+            conn.close()
+
+    def save_video_metadata(self, youtube_id, title, source, status, fetched_at):
+        """Сохранение результата запроса названия видео YouTube"""
+        conn = self.pool.writer()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('''
+                INSERT INTO video_metadata (video_id, title, source, status, fetched_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(video_id) DO UPDATE SET
+                    title = excluded.title,
+                    source = excluded.source,
+                    status = excluded.status,
+                    fetched_at = excluded.fetched_at
+            ''', (youtube_id, title, source, status, fetched_at))
+            conn.commit()
+            return True
+        except Exception as e:
+            print(f"❌ Ошибка при сохранении данных видео {youtube_id}: {e}")
+            return False
+        finally:
+            conn.close()
+
+    def load_user_state(self, now):
+        """Неистёкшее состояние пользователей: [(user_id, key, value, expires_at)]"""
+        conn = self.pool.reader()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                'SELECT user_id, key, value, expires_at FROM user_state WHERE expires_at > ?',
+                (now,)
+            )
+            return cursor.fetchall()
+        except Exception as e:
+            print(f"❌ Ошибка при загрузке состояния пользователей: {e}")
+            return []
+        finally:
+            conn.close()
+
+    def save_user_state(self, upserts, deletes, dropped_users):
+        """Запись накопленных изменений состояния одной транзакцией.
+
+        upserts - [(user_id, key, value, expires_at)], deletes - [(user_id, key)],
+        dropped_users - пользователи, всё состояние которых удаляется (до upserts)
+        """
+        conn = self.pool.writer()
+        cursor = conn.cursor()
+        try:
+            cursor.executemany('DELETE FROM user_state WHERE user_id = ?', [(u,) for u in dropped_users])
+            cursor.executemany('DELETE FROM user_state WHERE user_id = ? AND key = ?', deletes)
+            cursor.executemany('''
+                INSERT INTO user_state (user_id, key, value, expires_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(user_id, key) DO UPDATE SET
+                    value = excluded.value,
+                    expires_at = excluded.expires_at
+            ''', upserts)
+            conn.commit()
+            return True
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Ошибка при сохранении состояния пользователей: {e}")
+            return False
+        finally:
+            conn.close()
+
+    def delete_expired_user_state(self, now):
+        """Удаление истёкших ключей состояния, возвращает число удалённых"""
+        conn = self.pool.writer()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('DELETE FROM user_state WHERE expires_at <= ?', (now,))
+            conn.commit()
+            return cursor.rowcount
+        except Exception as e:
+            print(f"❌ Ошибка при удалении истёкшего состояния: {e}")
+            return 0
+        finally:
+            conn.close()
+
+    def get_videos(self, addon_id, limit=20):
+        """Получение видео для аддона"""
+        conn = self.pool.reader()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('''
+                SELECT id, user_id, youtube_url, title, description, likes, dislikes, views, verified, created_at
+                FROM addon_videos
+                WHERE addon_id = ?
+                ORDER BY likes DESC, created_at DESC
+                LIMIT ?
+            ''', (addon_id, limit))
+            videos = cursor.fetchall()
+            print(f"📊 Получено {len(videos)} видео для аддона {addon_id}")
+            return videos
+        except Exception as e:
+            print(f"❌ Ошибка при получении видео: {e}")
+            return []
+        finally:
+            conn.close()
+
+    def get_videos_page(self, addon_id, cursor=None, direction='next', limit=20):
+        """Страница видео аддона: сначала популярные, затем новые.
+
+        cursor - строка 'лайки.id' граничного видео соседней страницы
+        (лайки меняются, поэтому хранятся в курсоре).
+        Возвращает (видео, курсор_назад, курсор_вперёд).
+        """
+        conn = self.pool.reader()
+        try:
+            cursor_params = None
+            if cursor is not None:
+                likes, video_id = (int(value) for value in cursor.split('.'))
+                cursor_params = [likes, video_id, video_id]
+            videos, has_more = self._keyset_page(
+                conn,
+                '''
+                    SELECT id, user_id, youtube_url, title, description, likes, dislikes, views, verified, created_at
+                    FROM addon_videos
+                    WHERE addon_id = ? {where}
+                    ORDER BY {order}
+                    LIMIT ?
+                ''',
+                [addon_id],
+                ['likes', 'created_at', 'id'],
+                '?, (SELECT created_at FROM addon_videos WHERE id = ?), ?',
+                cursor_params,
+                direction, limit
+            )
+            prev_cursor, next_cursor = self._page_cursors(
+                videos, cursor, direction, has_more, lambda video: f"{video[5]}.{video[0]}"
+            )
+            print(f"📊 Получено {len(videos)} видео для аддона {addon_id}")
+            return videos, prev_cursor, next_cursor
+        except Exception as e:
+            print(f"❌ Ошибка при получении видео: {e}")
+            return [], None, None
+        finally:
+            conn.close()
+
+    def get_video_by_id(self, video_id):
+        """Получение видео по ID"""
+        conn = self.pool.reader()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('''
+                SELECT id, addon_id, user_id, youtube_url, title, 
+                       description, likes, dislikes, views, verified, created_at
+                FROM addon_videos
+                WHERE id = ?
+            ''', (video_id,))
+            video = cursor.fetchone()
+            print(f"📊 Получено видео {video_id}")
+            return video
+        except Exception as e:
+            print(f"❌ Ошибка при получении видео {video_id}: {e}")
+            return None
+        finally:
+            conn.close()
+
+    def _apply_rating(self, cursor, video_id, user_id, is_like):
+        """Оценка внутри открытой транзакции: дельта счётчиков и UPSERT.
+
+        Возвращает False, если видео не существует.
+        """
+        params = {
+            'video_id': video_id, 'user_id': user_id, 'is_like': bool(is_like),
+            'like': 1 if is_like else 0, 'dislike': 0 if is_like else 1
+        }
+        # Дельта счётчиков считается по старой оценке до её перезаписи:
+        # (старая IS 1) - был лайк, (старая IS 0) - был дизлайк, NULL - оценки не было
+        cursor.execute('''
+            UPDATE addon_videos
+            SET likes = likes + :like - (old.is_like IS 1),
+                dislikes = dislikes + :dislike - (old.is_like IS 0)
+            FROM (SELECT (SELECT is_like FROM video_likes
+                          WHERE video_id = :video_id AND user_id = :user_id) AS is_like) AS old
+            WHERE addon_videos.id = :video_id
+            RETURNING likes, dislikes
+        ''', params)
+        if cursor.fetchone() is None:
+            return False
+
+        cursor.execute('''
+            INSERT INTO video_likes (video_id, user_id, is_like)
+            VALUES (:video_id, :user_id, :is_like)
+            ON CONFLICT(video_id, user_id) DO UPDATE SET is_like = excluded.is_like
+            WHERE is_like IS NOT excluded.is_like
+        ''', params)
+        return True
+
+    def rate_video(self, video_id, user_id, is_like):
+        """Лайк или дизлайк видео"""
+        conn = self.pool.writer()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            if not self._apply_rating(cursor, video_id, user_id, is_like):
+                conn.rollback()
+                return False, "Видео не найдено"
+
+            conn.commit()
+            action = "лайк" if is_like else "дизлайк"
+            print(f"{'👍' if is_like else '👎'} Пользователь {user_id} поставил {action} видео {video_id}")
+            return True, f"{'Лайк' if is_like else 'Дизлайк'} учтен"
+        except Exception as e:
+            print(f"❌ Ошибка при оценке видео {video_id} пользователем {user_id}: {e}")
+            return False, f"Ошибка: {str(e)}"
+        finally:
+            conn.close()
+
+    def rate_videos(self, votes):
+        """Пакетная оценка видео одной транзакцией.
+
+        votes - список (video_id, user_id, is_like) в порядке поступления.
+        Возвращает число учтённых оценок (оценки несуществующих видео пропускаются).
+        """
+        conn = self.pool.writer()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            applied = 0
+            for video_id, user_id, is_like in votes:
+                if self._apply_rating(cursor, video_id, user_id, is_like):
+                    applied += 1
+
+            conn.commit()
+            print(f"👍 Учтено оценок видео: {applied} из {len(votes)}")
+            return applied
+        except Exception as e:
+            print(f"❌ Ошибка при пакетной оценке видео: {e}")
+            return 0
+        finally:
+            conn.close()
+
+    def get_user_rating(self, video_id, user_id):
+        """Получение оценки пользователя для видео"""
+        conn = self.pool.reader()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('SELECT is_like FROM video_likes WHERE video_id = ? AND user_id = ?',
+                           (video_id, user_id))
+            result = cursor.fetchone()
+            if result:
+                return result[0]  # True = like, False = dislike
+            return None
+        except Exception as e:
+            print(f"❌ Ошибка при получении оценки пользователя: {e}")
+            return None
+        finally:
+            conn.close()
+
+    def delete_video(self, video_id, user_id):
+        """Удаление видео пользователем"""
+        conn = self.pool.writer()
+        cursor = conn.cursor()
+        try:
+            # Пользователь может удалить только свое видео
+            cursor.execute('DELETE FROM addon_videos WHERE id = ? AND user_id = ?',
+                           (video_id, user_id))
+            # Удаляем связанные оценки
+            cursor.execute('DELETE FROM video_likes WHERE video_id = ?', (video_id,))
+            conn.commit()
+            deleted = cursor.rowcount > 0
+            if deleted:
+                print(f"🗑️ Удалено видео {video_id} пользователем {user_id}")
+            return deleted
+        except Exception as e:
+            print(f"❌ Ошибка при удалении видео {video_id}: {e}")
+            return False
+        finally:
+            conn.close()
+
+    # ========== КАТАЛОГ АДДОНОВ ==========
+
+    def get_catalog(self):
+        """Весь каталог: (категории, аддоны, ревизия) в порядке отображения.
+
+        Категории - строки (id, name), аддоны - (id, category_id, name,
+        description, github, youtube). Всё читается одной транзакцией.
+        """
+        conn = self.pool.reader()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN')
+            cursor.execute('SELECT id, name FROM categories ORDER BY position, id')
+            categories = cursor.fetchall()
+            cursor.execute('''
+                SELECT id, category_id, name, description, github, youtube
+                FROM addons
+                ORDER BY category_id, position, id
+            ''')
+            addons = cursor.fetchall()
+            cursor.execute('SELECT revision FROM catalog_meta WHERE id = 1')
+            row = cursor.fetchone()
+            return categories, addons, row[0] if row else 0
+        except Exception as e:
+            print(f"❌ Ошибка при загрузке каталога: {e}")
+            return [], [], 0
+        finally:
+            conn.rollback()
+            conn.close()
+
+    @staticmethod
+    def _bump_catalog_revision(cursor):
+        """Новая ревизия каталога в текущей транзакции, возвращает её"""
+        cursor.execute('''
+            INSERT INTO catalog_meta (id, revision) VALUES (1, 1)
+            ON CONFLICT(id) DO UPDATE SET revision = revision + 1
+        ''')
+        cursor.execute('SELECT revision FROM catalog_meta WHERE id = 1')
+        return cursor.fetchone()[0]
+
+    def import_catalog(self, catalog):
+        """Загрузка каталога {категория: [аддоны]} в пустые таблицы categories/addons.
+
+        Аддоны получают позицию, равную индексу в списке, поэтому старые строки
+        addon_videos и addon_stats переносятся на addon_id в той же транзакции.
+        """
+        conn = self.pool.writer()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('SELECT COUNT(*) FROM categories')
+            if cursor.fetchone()[0] > 0:
+                conn.rollback()
+                print("⚠️ Каталог уже загружен в базу")
+                return False
+
+            for position, (category, addons) in enumerate(catalog.items()):
+                cursor.execute('INSERT INTO categories (name, position) VALUES (?, ?)', (category, position))
+                category_id = cursor.lastrowid
+                cursor.executemany('''
+                    INSERT INTO addons (id, category_id, position, name, description, github, youtube)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', [
+                    (addon.get('id'), category_id, index, addon['name'], addon.get('description', ''),
+                     addon.get('github', ''), addon.get('youtube', ''))
+                    for index, addon in enumerate(addons)
+                ])
+
+            self._remap_legacy_addons(cursor)
+            self._rebuild_stats_totals(cursor)
+            self._bump_catalog_revision(cursor)
+            conn.commit()
+            print(f"✅ Каталог загружен в базу: {len(catalog)} категорий")
+            return True
+        except Exception as e:
+            print(f"❌ Ошибка при загрузке каталога: {e}")
+            return False
+        finally:
+            conn.close()
+
+    def sync_catalog(self, catalog, expected_revision):
+        """Приведение таблиц каталога к содержимому {категория: [аддоны]}.
+
+        Аддоны с известным id обновляются на месте (в том числе категория и
+        позиция), аддоны без id или с чужим id добавляются с новым id,
+        отсутствующие в каталоге аддоны и категории удаляются.
+
+        Каталог применяется, только если ревизия в базе всё ещё
+        expected_revision: правка, сделанная после чтения файла (например,
+        через админ-панель), не откатывается. Возвращает новую ревизию
+        или None, если каталог не применён.
+        """
+        conn = self.pool.writer()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('SELECT revision FROM catalog_meta WHERE id = 1')
+            row = cursor.fetchone()
+            revision = row[0] if row else 0
+            if revision != expected_revision:
+                conn.rollback()
+                print(f"⚠️ Каталог не синхронизирован: файл основан на ревизии {expected_revision}, "
+                      f"в базе уже {revision}")
+                return None
+            cursor.execute('SELECT id FROM addons')
+            known_ids = {row[0] for row in cursor.fetchall()}
+            keep_ids = []
+            added = updated = 0
+
+            for position, (category, addons) in enumerate(catalog.items()):
+                cursor.execute('''
+                    INSERT INTO categories (name, position) VALUES (?, ?)
+                    ON CONFLICT(name) DO UPDATE SET position = excluded.position
+                ''', (category, position))
+                cursor.execute('SELECT id FROM categories WHERE name = ?', (category,))
+                category_id = cursor.fetchone()[0]
+
+                for index, addon in enumerate(addons):
+                    values = (category_id, index, addon['name'], addon.get('description', ''),
+                              addon.get('github', ''), addon.get('youtube', ''))
+                    addon_id = addon.get('id')
+                    if addon_id in known_ids:
+                        cursor.execute('''
+                            UPDATE addons
+                            SET category_id = ?, position = ?, name = ?, description = ?, github = ?, youtube = ?
+                            WHERE id = ?
+                        ''', values + (addon_id,))
+                        updated += 1
+                    else:
+                        # id удалённого аддона не используется повторно, иначе к новому
+                        # аддону прикрепились бы видео и статистика старого
+                        cursor.execute('''
+                            INSERT INTO addons (category_id, position, name, description, github, youtube)
+                            VALUES (?, ?, ?, ?, ?, ?)
+                        ''', values)
+                        addon_id = cursor.lastrowid
+                        added += 1
+                    known_ids.add(addon_id)
+                    keep_ids.append(addon_id)
+
+            cursor.execute('DELETE FROM addons WHERE id NOT IN (SELECT value FROM json_each(?))',
+                           (json.dumps(keep_ids),))
+            deleted = cursor.rowcount
+            cursor.execute('DELETE FROM categories WHERE name NOT IN (SELECT value FROM json_each(?))',
+                           (json.dumps(list(catalog)),))
+            revision = self._bump_catalog_revision(cursor)
+            conn.commit()
+            print(f"✅ Каталог синхронизирован: добавлено {added}, обновлено {updated}, удалено {deleted}")
+            return revision
+        except Exception as e:
+            print(f"❌ Ошибка при синхронизации каталога: {e}")
+            return None
+        finally:
+            conn.close()
+
+    def add_category(self, name):
+        """Добавление категории, возвращает её id (None, если категория уже есть)"""
+        conn = self.pool.writer()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('''
+                INSERT OR IGNORE INTO categories (name, position)
+                SELECT ?, COALESCE(MAX(position), -1) + 1 FROM categories
+            ''', (name,))
+            if not cursor.rowcount:
+                conn.rollback()
+                return None
+            category_id = cursor.lastrowid
+            self._bump_catalog_revision(cursor)
+            conn.commit()
+            return category_id
+        except Exception as e:
+            print(f"❌ Ошибка при добавлении категории: {e}")
+            return None
+        finally:
+            conn.close()
+
+    def add_addon(self, category, name, description, github, youtube):
+        """Добавление аддона в конец категории (категория создаётся при необходимости).
+
+        Возвращает id нового аддона или None при ошибке.
+        """
+        conn = self.pool.writer()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('''
+                INSERT OR IGNORE INTO categories (name, position)
+                SELECT ?, COALESCE(MAX(position), -1) + 1 FROM categories
+            ''', (category,))
+            cursor.execute('SELECT id FROM categories WHERE name = ?', (category,))
+            category_id = cursor.fetchone()[0]
+            cursor.execute('''
+                INSERT INTO addons (category_id, position, name, description, github, youtube)
+                SELECT ?, COALESCE(MAX(position), -1) + 1, ?, ?, ?, ?
+                FROM addons WHERE category_id = ?
+            ''', (category_id, name, description, github, youtube, category_id))
+            addon_id = cursor.lastrowid
+            self._bump_catalog_revision(cursor)
+            conn.commit()
+            return addon_id
+        except Exception as e:
+            print(f"❌ Ошибка при добавлении аддона: {e}")
+            return None
+        finally:
+            conn.close()
+
+    def update_addon(self, addon_id, name=None, description=None, github=None, youtube=None):
+        """Обновление полей аддона (пустые значения не меняются)"""
+        conn = self.pool.writer()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('''
+                UPDATE addons SET
+                    name = COALESCE(?, name),
+                    description = COALESCE(?, description),
+                    github = COALESCE(?, github),
+                    youtube = COALESCE(?, youtube)
+                WHERE id = ?
+            ''', (name or None, description or None, github or None, youtube or None, addon_id))
+            if not cursor.rowcount:
+                conn.rollback()
+                return False
+            self._bump_catalog_revision(cursor)
+            conn.commit()
+            return True
+        except Exception as e:
+            print(f"❌ Ошибка при обновлении аддона {addon_id}: {e}")
+            return False
+        finally:
+            conn.close()
+
+    def delete_addon(self, addon_id):
+        """Удаление аддона; опустевшая категория удаляется вместе с ним.
+
+        Видео и статистика аддона остаются в базе: его id больше никому не достанется.
+        """
+        conn = self.pool.writer()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('DELETE FROM addons WHERE id = ? RETURNING category_id', (addon_id,))
+            row = cursor.fetchone()
+            if row is None:
+                conn.rollback()
+                return False
+            cursor.execute('''
+                DELETE FROM categories
+                WHERE id = ? AND NOT EXISTS (SELECT 1 FROM addons WHERE category_id = ?)
+            ''', (row[0], row[0]))
+            self._bump_catalog_revision(cursor)
+            conn.commit()
+            return True
+        except Exception as e:
+            print(f"❌ Ошибка при удалении аддона {addon_id}: {e}")
+            return False
+        finally:
+            conn.close()
+
+    def get_total_videos(self):
+        """Получение общего количества видео"""
+        conn = self.pool.reader()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('SELECT COUNT(*) FROM addon_videos')
+            count = cursor.fetchone()[0]
+            return count
+        except Exception as e:
+            print(f"❌ Ошибка при получении количества видео: {e}")
+            return 0
+        finally:
+            conn.close()
+
+    # ========== СТАТИСТИКА ==========
+
+    def log_note_action(self, note_id, user_id, action):
+        """Логирование действий с заметками (через буфер отложенной записи)"""
+        self.buffer.add_event('note_stats', (note_id, user_id, action))
+        return True
+
+    def log_video_action(self, video_id, user_id, action):
+        """Логирование действий с видео (через буфер отложенной записи)"""
+        self.buffer.add_event('video_stats', (video_id, user_id, action))
+        return True
+
+    def increment_addon_views(self, addon_id):
+        """Увеличение счетчика просмотров аддона (через буфер отложенной записи)"""
+        self.buffer.add_counter('addon_views', addon_id)
+        return True
+
+    def _flush_buffer(self, counters, events):
+        """Запись накопленных счётчиков и событий одной транзакцией"""
+        conn = self.pool.writer()
+        try:
+            cursor = conn.cursor()
+            note_views = counters.get('note_views', {})
+            if note_views:
+                cursor.executemany('UPDATE notes SET views = views + ? WHERE id = ?',
+                                   [(delta, note_id) for note_id, delta in note_views.items()])
+
+            addon_views = counters.get('addon_views', {})
+            if addon_views:
+                cursor.executemany('''
+                    INSERT INTO addon_stats (addon_id, views)
+                    VALUES (?, ?)
+                    ON CONFLICT(addon_id) DO UPDATE SET views = views + excluded.views
+                ''', list(addon_views.items()))
+
+            if events.get('note_stats'):
+                cursor.executemany('INSERT INTO note_stats (note_id, user_id, action) VALUES (?, ?, ?)',
+                                   events['note_stats'])
+            if events.get('video_stats'):
+                cursor.executemany('INSERT INTO video_stats (video_id, user_id, action) VALUES (?, ?, ?)',
+                                   events['video_stats'])
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get_addon_views(self, addon_id):
+        """Получение количества просмотров аддона"""
+        conn = self.pool.reader()
+        cursor = conn.cursor()
+        try:
+            with self.buffer.reading():
+                cursor.execute('''
+                    SELECT views FROM addon_stats 
+                    WHERE addon_id = ?
+                ''', (addon_id,))
+                result = cursor.fetchone()
+                return (result[0] if result else 0) + self.buffer.pending_counter('addon_views', addon_id)
+        except Exception as e:
+            print(f"❌ Ошибка при получении просмотров аддона: {e}")
+            return 0
+        finally:
+            conn.close()
+
+    def get_top_addons_by_views(self, limit=10, days=30):
+        """Получение топ аддонов по просмотрам"""
+        # Агрегаты должны учитывать ещё не записанные просмотры и события
+        self.buffer.flush()
+        conn = self.pool.reader()
+        cursor = conn.cursor()
+        try:
+            query = '''
+                SELECT 
+                    addon_id,
+                    views,
+                    created_at
+                FROM addon_stats
+                WHERE created_at >= datetime('now', ?)
+                ORDER BY views DESC
+                LIMIT ?
+            '''
+            params = [f'-{days} days', limit]
+
+            cursor.execute(query, params)
+            addons = cursor.fetchall()
+            return addons
+        except Exception as e:
+            print(f"❌ Ошибка при получении топ аддонов: {e}")
+            return []
+        finally:
+            conn.close()
+
+    def get_overall_stats(self):
+        """Общая статистика бота"""
+        # Агрегаты должны учитывать ещё не записанные просмотры и события
+        self.buffer.flush()
+        conn = self.pool.reader()
+        cursor = conn.cursor()
+        try:
+            # Итоги поддерживаются триггерами, чтение не сканирует таблицы
+            cursor.execute('SELECT name, value FROM stats_totals')
+            totals = dict(cursor.fetchall())
+
+            stats = {
+                'notes': {
+                    'total': totals.get('notes_total', 0),
+                    'total_views': totals.get('notes_views', 0)
+                },
+                'videos': {
+                    'total': totals.get('videos_total', 0),
+                    'total_views': totals.get('videos_views', 0),
+                    'total_likes': totals.get('videos_likes', 0),
+                    'total_dislikes': totals.get('videos_dislikes', 0)
+                },
+                'addons': {
+                    'total': totals.get('addons_total', 0),
+                    'total_views': totals.get('addons_views', 0)
+                },
+                'users': {
+                    'notes': totals.get('users_notes', 0),
+                    'videos': totals.get('users_videos', 0),
+                    'likes': totals.get('users_likes', 0)
+                }
+            }
+
+            return stats
+        except Exception as e:
+            print(f"❌ Ошибка при получении общей статистики: {e}")
+            return {}
+        finally:
+            conn.close()
+
+    def get_video_stats(self, video_id=None, days=7):
+        """Получение статистики по видео"""
+        # Агрегаты должны учитывать ещё не записанные просмотры и события
+        self.buffer.flush()
+        conn = self.pool.reader()
+        cursor = conn.cursor()
+        try:
+            events, users, window = self._windowed_actions_sql('video_stats', days)
+            query = f'''
+                SELECT 
+                    e.video_id,
+                    e.action,
+                    e.count,
+                    COALESCE(u.unique_users, 0) as unique_users
+                FROM (
+                    SELECT video_id, action, SUM(count) as count
+                    FROM ({events})
+                    GROUP BY video_id, action
+                ) e
+                LEFT JOIN (
+                    SELECT video_id, action, COUNT(DISTINCT user_id) as unique_users
+                    FROM ({users})
+                    GROUP BY video_id, action
+                ) u ON u.video_id = e.video_id AND u.action = e.action
+            '''
+            params = window + window
+
+            if video_id:
+                query += ' WHERE e.video_id = ?'
+                params.append(video_id)
+
+            query += ' ORDER BY e.video_id, e.action'
+
+            cursor.execute(query, params)
+            stats = cursor.fetchall()
+
+            result = {}
+            for stat in stats:
+                vid = stat[0]
+                if vid not in result:
+                    result[vid] = {}
+                result[vid][stat[1]] = {
+                    'count': stat[2],
+                    'unique_users': stat[3]
+                }
+
+            return result
+        except Exception as e:
+            print(f"❌ Ошибка при получении статистики видео: {e}")
+            return {}
+        finally:
+            conn.close()
+
+    # В функции get_top_videos в database.py ИСПРАВЬТЕ запрос:
+    def get_top_videos(self, addon_id=None, limit=10, days=30):
+        """Получение топ видео по просмотрам"""
+        conn = self.pool.reader()
+        cursor = conn.cursor()
+        try:
+            query = '''
+                SELECT 
+                    v.id,
+                    v.title,
+                    v.youtube_url,
+                    v.views,
+                    v.likes,
+                    v.dislikes,
+                    v.addon_id
+                FROM addon_videos v
+                WHERE v.created_at >= datetime('now', ?)
+            '''
+            # ... остальной код функции без изменений
+
+            params = [f'-{days} days']
+
+            if addon_id is not None:
+                query += ' AND v.addon_id = ?'
+                params.append(addon_id)
+
+            query += '''
+                GROUP BY v.id
+                ORDER BY v.views DESC, v.likes DESC
+                LIMIT ?
+            '''
+            params.append(limit)
+
+            cursor.execute(query, params)
+            videos = cursor.fetchall()
+
+            return videos
+        except Exception as e:
+            print(f"❌ Ошибка при получении топ видео: {e}")
+            return []
+        finally:
+            conn.close()
+
+
+# В database.py добавьте в класс Database новые методы:
+
+# Добавьте после метода get_link_stats в классе Database:
+
+    def get_addon_link_stats(self, addon_id, days=30):
+        """Получение статистики кликов по ссылкам для конкретного аддона"""
+        conn = self.pool.reader()
+        cursor = conn.cursor()
+        try:
+            query = '''
+                SELECT 
+                    link_type,
+                    COUNT(*) as total_clicks,
+                    COUNT(DISTINCT user_id) as unique_users,
+                    COUNT(CASE WHEN created_at >= datetime('now', ?) THEN 1 END) as recent_clicks
+                FROM link_clicks
+                WHERE addon_id = ?
+                GROUP BY link_type
+                ORDER BY link_type
+            '''
+            params = [f'-{days} days', addon_id]
+
+            cursor.execute(query, params)
+            stats = cursor.fetchall()
+
+            result = {}
+            for stat in stats:
+                link_type = stat[0]
+                result[link_type] = {
+                    'total_clicks': stat[1],
+                    'unique_users': stat[2],
+                    'recent_clicks': stat[3]
+                }
+
+            return result
+        except Exception as e:
+            print(f"❌ Ошибка при получении статистики ссылок аддона: {e}")
+            return {}
+        finally:
+            conn.close()
+
+
+    def get_addon_video_stats(self, addon_id, days=30):
+        """Получение статистики по видео для конкретного аддона"""
+        # Агрегаты должны учитывать ещё не записанные просмотры и события
+        self.buffer.flush()
+        conn = self.pool.reader()
+        cursor = conn.cursor()
+        try:
+            # Статистика по добавленным видео
+            cursor.execute('''
+                SELECT 
+                    COUNT(*) as total_videos,
+                    SUM(views) as total_views,
+                    SUM(likes) as total_likes,
+                    SUM(dislikes) as total_dislikes
+                FROM addon_videos
+                WHERE addon_id = ?
+            ''', (addon_id,))
+
+            video_stats = cursor.fetchone()
+
+            # Статистика по действиям с видео за период
+            events, users, window = self._windowed_actions_sql('video_stats', days)
+            cursor.execute(f'''
+                SELECT 
+                    e.action,
+                    e.count,
+                    COALESCE(u.unique_users, 0) as unique_users
+                FROM (
+                    SELECT vs.action, SUM(vs.count) as count
+                    FROM ({events}) vs
+                    JOIN addon_videos av ON vs.video_id = av.id
+                    WHERE av.addon_id = ?
+                    GROUP BY vs.action
+                ) e
+                LEFT JOIN (
+                    SELECT vu.action, COUNT(DISTINCT vu.user_id) as unique_users
+                    FROM ({users}) vu
+                    JOIN addon_videos av ON vu.video_id = av.id
+                    WHERE av.addon_id = ?
+                    GROUP BY vu.action
+                ) u ON u.action = e.action
+            ''', window + [addon_id] + window + [addon_id])
+
+            recent_actions = {}
+            for row in cursor.fetchall():
+                action = row[0]
+                recent_actions[action] = {
+                    'count': row[1],
+                    'unique_users': row[2]
+                }
+
+            return {
+                'total_videos': video_stats[0] or 0,
+                'total_views': video_stats[1] or 0,
+                'total_likes': video_stats[2] or 0,
+                'total_dislikes': video_stats[3] or 0,
+                'recent_actions': recent_actions
+            }
+        except Exception as e:
+            print(f"❌ Ошибка при получении статистики видео аддона: {e}")
+            return {}
+        finally:
+            conn.close()
+
+
+class AsyncDatabase:
+    """Асинхронная обёртка над Database.
+
+    Каждый вызов выполняется в отдельном ограниченном пуле потоков, поэтому
+    медленный запрос или ожидание блокировки SQLite не останавливает цикл
+    событий бота. Число одновременно ожидающих запросов ограничено
+    (backpressure): при переполнении вызывающий код ждёт освобождения слота.
+
+    Использование: ``videos = await adb.get_videos(addon_id)``
+    """
+
+    def __init__(self, database, max_workers=DB_EXECUTOR_WORKERS, max_pending=DB_MAX_PENDING):
+        self._db = database
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+        self._max_pending = max_pending
+        self._semaphore = None
+        self._loop = None
+        self.pending = 0
+
+    def _get_semaphore(self):
+        """Семафор создаётся лениво для текущего цикла событий"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self._max_pending)
+            self._loop = loop
+        return self._semaphore
+
+    async def run(self, func, *args, **kwargs):
+        """Выполнение синхронной функции в пуле потоков базы данных"""
+        self.pending += 1
+        try:
+            async with self._get_semaphore():
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+        finally:
+            self.pending -= 1
+
+    def __getattr__(self, name):
+        attr = getattr(self._db, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def wrapper(*args, **kwargs):
+            return await self.run(attr, *args, **kwargs)
+
+        return wrapper
+
+    def shutdown(self, wait=True):
+        """Остановка пула потоков (вызывается при завершении бота)"""
+        self._executor.shutdown(wait=wait)
+        print("✅ Пул потоков базы данных остановлен")
+
+
+# Создаем глобальный экземпляр базы данных
+db = Database()
+adb = AsyncDatabase(db)
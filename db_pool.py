@@ -0,0 +1,114 @@
+# file: db_pool.py
+import queue
+import sqlite3
+import threading
+from config import (
+    DB_READERS, DB_BUSY_TIMEOUT_MS, DB_CACHE_SIZE_KB, DB_MMAP_SIZE, DB_SYNCHRONOUS
+)
+
+
+class PooledConnection:
+    """Соединение из пула: close() возвращает его в пул, а не закрывает.
+
+    Незавершённая транзакция откатывается при возврате, чтобы следующий
+    пользователь соединения не закоммитил чужие частичные изменения.
+    """
+
+    def __init__(self, conn, release):
+        self._conn = conn
+        self._release = release
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self):
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        if conn.in_transaction:
+            conn.rollback()
+        self._release(conn)
+
+
+class ConnectionManager:
+    """Постоянные соединения SQLite: один писатель и пул читателей.
+
+    База работает в режиме WAL, поэтому читатели не ждут писателя.
+    Все записи идут через единственное соединение-писатель под блокировкой,
+    так что писатели не конкурируют друг с другом за блокировку файла.
+    """
+
+    def __init__(self, db_file, readers=DB_READERS, busy_timeout_ms=DB_BUSY_TIMEOUT_MS,
+                 cache_size_kb=DB_CACHE_SIZE_KB, mmap_size=DB_MMAP_SIZE, synchronous=DB_SYNCHRONOUS):
+        self.db_file = db_file
+        self.max_readers = readers
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.synchronous = synchronous
+
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._readers = queue.LifoQueue()
+        self._all_readers = []
+        self._readers_lock = threading.Lock()
+
+    def _configure(self, conn):
+        """Настройка соединения через PRAGMA"""
+        conn.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout_ms)}')
+        conn.execute(f'PRAGMA synchronous = {self.synchronous}')
+        conn.execute(f'PRAGMA cache_size = -{int(self.cache_size_kb)}')
+        conn.execute(f'PRAGMA mmap_size = {int(self.mmap_size)}')
+
+    def _open_writer(self):
+        conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        mode = conn.execute('PRAGMA journal_mode = WAL').fetchone()[0]
+        if mode.lower() != 'wal':
+            print(f"⚠️ Не удалось включить WAL, режим журнала: {mode}")
+        self._configure(conn)
+        return conn
+
+    def _open_reader(self):
+        conn = sqlite3.connect(f'file:{self.db_file}?mode=ro', uri=True, check_same_thread=False)
+        self._configure(conn)
+        conn.execute('PRAGMA query_only = ON')
+        return conn
+
+    def writer(self):
+        """Захватывает соединение-писатель (освобождается через close())"""
+        self._writer_lock.acquire()
+        try:
+            if self._writer is None:
+                self._writer = self._open_writer()
+        except Exception:
+            self._writer_lock.release()
+            raise
+        return PooledConnection(self._writer, lambda conn: self._writer_lock.release())
+
+    def reader(self):
+        """Берёт соединение-читатель из пула, при необходимости открывает новое"""
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._readers_lock:
+                if len(self._all_readers) < self.max_readers:
+                    # Писатель создаёт файл базы и включает WAL до первого читателя
+                    self.writer().close()
+                    conn = self._open_reader()
+                    self._all_readers.append(conn)
+            if conn is None:
+                conn = self._readers.get()
+        return PooledConnection(conn, self._readers.put)
+
+    def close(self):
+        """Закрывает все соединения"""
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        with self._readers_lock:
+            for conn in self._all_readers:
+                conn.close()
+            self._all_readers = []
+            self._readers = queue.LifoQueue()
@@ -1,6 +1,6 @@
-# file: handlers/__init__.py
-from .command import start, admin_command
-from .message import handle_message
-from .callback import handle_callback
-
-__all__ = ['start', 'admin_command', 'handle_message', 'handle_callback']
\ No newline at end of file
+# file: handlers/__init__.py
+from .command import start, admin_command
+from .message import handle_message, video_queue
+from .callback import handle_callback
+
+__all__ = ['start', 'admin_command', 'handle_message', 'handle_callback', 'video_queue']
\ No newline at end of file
@@ -1,862 +1,959 @@
-# file: handlers/callback.py
-import logging
-import html
-from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
-from telegram.ext import ContextTypes
-
-from config import ADMIN_IDS
-from menus.main_menu import get_main_menu
-from menus.addons_menu import (
-    get_categories_menu, get_addons_menu, get_addon_details_menu,
-    get_videos_list_menu, get_video_view_menu, get_add_video_menu
-)
-from menus.notes_menu import get_notes_menu
-from menus.admin_menu import get_admin_menu, get_addon_management_menu
-from data.addons_data import get_categories, get_addons, get_addon, delete_addon
-from utils.youtube import extract_video_id, get_youtube_title
-logger = logging.getLogger(__name__)
-
-# Импортируем базу данных
-import sys
-import os
-
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-try:
-    from database import db
-except ImportError:
-    from database import Database
-
-    db = Database()
-
-
-async def handle_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Обработчик inline кнопок"""
-    query = update.callback_query
-    await query.answer()
-
-    user_id = query.from_user.id
-    data = query.data
-
-    print(f"\n🖱️ КНОПКА: {user_id} нажал '{data}'")
-
-    # Обработка отмен
-    if data.startswith("cancel_"):
-        await handle_cancel_actions(query, context, data)
-        return
-
-    # Главное меню
-    if data == "main":
-        await handle_main_menu(query, context)
-
-    # Админское меню
-    elif data == "admin":
-        await handle_admin_menu(query, user_id)
-
-    # Админские действия
-    elif data.startswith("admin_"):
-        await handle_admin_actions(query, context, data, user_id)
-
-    # ВСТАВЬТЕ ЗДЕСЬ НОВЫЕ ОБРАБОТЧИКИ:
-    # Статистика по аддонам
-    elif data.startswith("admin_stats_cat:"):
-        await handle_admin_addon_stats_category(query, data)
-
-    elif data.startswith("admin_stats_addon:"):
-        await handle_admin_addon_stats_view(query, data)
-
-
-    # Категории
-    elif data == "cats":
-        await query.edit_message_text(
-            "📂 **Выберите категорию:**",
-            reply_markup=get_categories_menu(),
-            parse_mode="Markdown"
-        )
-
-
-    # Выбор категории
-    elif data.startswith("cat:"):
-        await handle_category_selection(query, data)
-
-    # Выбор аддона
-    elif data.startswith("add:"):
-        await handle_addon_selection(query, data)
-
-    # Список видео для аддона
-    elif data.startswith("videos:"):
-        await handle_videos_list(query, data)
-
-    # Просмотр видео
-    elif data.startswith("view_video:"):
-        await handle_video_view(query, data)
-
-    # Добавление видео (начало)
-    elif data.startswith("add_video:"):
-        await handle_video_addition_start(query, context, data)
-
-    # Лайк видео
-    elif data.startswith("like_video:"):
-        await handle_video_like(query, data, user_id)
-
-    # Дизлайк видео
-    elif data.startswith("dislike_video:"):
-        await handle_video_dislike(query, data, user_id)
-
-    # Просмотр заметки
-    elif data.startswith("note:"):
-        await handle_note_view(query, data, context)
-
-    # Возврат к списку заметок
-    elif data == "notes":
-        await handle_notes_list(query, user_id)
-
-    # Обработка GitHub и YouTube ссылок
-    elif data.startswith("github:") or data.startswith("youtube:"):
-        await handle_link_click(query, data, context)
-
-
-async def handle_cancel_actions(query, context, data):
-    """Обработка отмен действий"""
-    if data == "cancel_note":
-        context.user_data.clear()
-        await query.edit_message_text(
-            "❌ **Добавление заметки отменено.**",
-            parse_mode="Markdown"
-        )
-
-    elif data == "cancel_search":
-        context.user_data.clear()
-        await query.edit_message_text(
-            "❌ **Поиск отменен.**",
-            parse_mode="Markdown"
-        )
-
-    elif data == "cancel_admin":
-        await query.edit_message_text(
-            "❌ **Действие отменено.**",
-            reply_markup=get_admin_menu(),
-            parse_mode="Markdown"
-        )
-
-    elif data.startswith("cancel_add_video:"):
-        parts = data.split(":")
-        if len(parts) >= 3:
-            category = parts[1]
-            index = int(parts[2])
-            addon = get_addon(category, index)
-
-            if addon:
-                context.user_data.clear()
-                await query.edit_message_text(
-                    f"❌ **Добавление видео отменено.**\n\n"
-                    f"🎯 **{addon['name']}**\n\n"
-                    f"📝 {addon['description']}\n\n"
-                    f"**Официальные ссылки:**",
-                    reply_markup=get_addon_details_menu(category, index),
-                    parse_mode="Markdown"
-                )
-
-
-async def handle_main_menu(query, context):
-    """Обработка возврата в главное меню"""
-    context.user_data.clear()
-    await query.edit_message_text(
-        "🏠 **Вы вернулись в главное меню.**\n\n"
-        "Используйте кнопки внизу экрана для навигации.",
-        parse_mode="Markdown"
-    )
-
-
-async def handle_admin_menu(query, user_id):
-    """Обработка админского меню"""
-    if user_id not in ADMIN_IDS:
-        await query.answer("❌ У вас нет прав администратора.", show_alert=True)
-        return
-
-    await query.edit_message_text(
-        "👑 **Панель администратора**\n\nВыберите действие:",
-        reply_markup=get_admin_menu(),
-        parse_mode="Markdown"
-    )
-
-
-async def handle_admin_actions(query, context, data, user_id):
-    """Обработка админских действий"""
-    if user_id not in ADMIN_IDS:
-        await query.answer("❌ У вас нет прав администратора.", show_alert=True)
-        return
-
-    if data == "admin_addons":
-        await query.edit_message_text(
-            "📦 **Управление аддонами**\n\nВыберите действие:",
-            reply_markup=get_addon_management_menu(),
-            parse_mode="Markdown"
-        )
-
-    elif data == "admin_stats":
-        await handle_admin_stats(query, user_id)
-
-    elif data == "admin_add_category":
-        await handle_admin_add_category(query, context)
-
-    elif data == "admin_add_addon":
-        await handle_admin_add_addon_start(query)
-
-    elif data.startswith("admin_addon_cat:"):
-        await handle_admin_add_addon_category(query, context, data)
-
-    elif data == "admin_edit_addon":
-        await handle_admin_edit_addon(query)
-
-    elif data == "admin_delete_addon":
-        await handle_admin_delete_addon_start(query)
-
-    elif data.startswith("admin_delete_addon_confirm:"):
-        await handle_admin_delete_addon_confirm(query, data)
-
-    elif data.startswith("admin_do_delete:"):
-        await handle_admin_do_delete(query, data)
-
-    elif data == "admin_addon_stats":
-        await handle_admin_addon_stats_start(query)
-
-    # ДОБАВЬТЕ ЭТИ ДВА УСЛОВИЯ:
-    elif data.startswith("admin_stats_cat:"):
-        await handle_admin_addon_stats_category(query, data)
-
-    elif data.startswith("admin_stats_addon:"):
-        await handle_admin_addon_stats_view(query, data)
-
-
-async def handle_admin_stats(query, user_id):
-    """Обработка статистики админа"""
-    from data.addons_data import get_addon
-
-    stats = db.get_overall_stats()
-
-    print(f"👑 АДМИН {user_id} запросил статистику")
-
-    message = "📊 **Статистика бота**\n\n"
-
-    # Общая статистика
-    message += "📈 **Общая статистика:**\n"
-    message += f"• Заметок: {stats.get('notes', {}).get('total', 0)}\n"
-    message += f"• Просмотров заметок: {stats.get('notes', {}).get('total_views', 0)}\n"
-    message += f"• Видео: {stats.get('videos', {}).get('total', 0)}\n"
-    message += f"• Просмотров видео: {stats.get('videos', {}).get('total_views', 0)}\n"
-    message += f"• Лайков видео: {stats.get('videos', {}).get('total_likes', 0)}\n"
-    message += f"• Дизлайков видео: {stats.get('videos', {}).get('total_dislikes', 0)}\n"
-    message += f"• Просмотров аддонов: {stats.get('addons', {}).get('total_views', 0)}\n\n"  # НОВОЕ
-
-    # Статистика пользователей
-    message += "👥 **Пользователи:**\n"
-    message += f"• Создавали заметки: {stats.get('users', {}).get('notes', 0)}\n"
-    message += f"• Добавляли видео: {stats.get('users', {}).get('videos', 0)}\n"
-    message += f"• Оценивали видео: {stats.get('users', {}).get('likes', 0)}\n\n"
-
-    # Топ аддонов по просмотрам (НОВОЕ)
-    top_addons = db.get_top_addons_by_views(limit=5, days=30)
-    if top_addons:
-        message += "🏆 **Топ-5 аддонов по просмотрам (30 дней):**\n"
-        for i, addon_data in enumerate(top_addons, 1):
-            category, addon_index, views, created_at = addon_data
-            try:
-                addon = get_addon(category, addon_index)
-                addon_name = addon['name'] if addon else "Неизвестный аддон"
-                message += f"{i}. {addon_name}\n"
-                message += f"   📦 Категория: {category}\n"
-                message += f"   👁️ Просмотров: {views}\n"
-            except:
-                message += f"{i}. Ошибка данных\n"
-                continue
-        message += "\n"
-
-    # Топ видео
-    top_videos = db.get_top_videos(limit=5, days=7)
-    if top_videos:
-        message += "🎬 **Топ-5 видео (7 дней):**\n"
-        for i, video in enumerate(top_videos, 1):
-            try:
-                video_id, title, url, views, likes, dislikes, category, index = video
-                short_title = title[:20] + "..." if len(title) > 20 else title
-
-                try:
-                    addon = get_addon(category, index)
-                    addon_name = addon['name'] if addon else "Неизвестный аддон"
-                except:
-                    addon_name = "Неизвестный аддон"
-
-                message += f"{i}. {short_title}\n"
-                message += f"   📦 Аддон: {addon_name}\n"
-                message += f"   👁️ Просмотров: {views}\n"
-                message += f"   👍 {likes} | 👎 {dislikes}\n"
-            except ValueError as e:
-                print(f"⚠️ Ошибка распаковки данных видео: {e}")
-                message += f"{i}. Ошибка данных\n"
-                continue
-
-    await query.edit_message_text(
-        message,
-        parse_mode="Markdown"
-    )
-
-
-async def handle_admin_add_category(query, context):
-    """Начало добавления категории"""
-    keyboard = [[InlineKeyboardButton("❌ Отмена", callback_data="cancel_admin")]]
-    await query.edit_message_text(
-        "➕ **Добавление категории**\n\n"
-        "Введите название новой категории в чат:",
-        reply_markup=InlineKeyboardMarkup(keyboard),
-        parse_mode="Markdown"
-    )
-    context.user_data['admin_adding_category'] = True
-
-
-async def handle_admin_add_addon_start(query):
-    """Начало добавления аддона"""
-    categories = get_categories()
-    if not categories:
-        await query.edit_message_text(
-            "❌ **Сначала добавьте категорию!**",
-            reply_markup=get_addon_management_menu(),
-            parse_mode="Markdown"
-        )
-        return
-
-    keyboard = []
-    for category in categories:
-        keyboard.append([InlineKeyboardButton(category, callback_data=f"admin_addon_cat:{category}")])
-    keyboard.append([InlineKeyboardButton("❌ Отмена", callback_data="cancel_admin")])
-
-    await query.edit_message_text(
-        "➕ **Добавление аддона**\n\n"
-        "Сначала выберите категорию:",
-        reply_markup=InlineKeyboardMarkup(keyboard),
-        parse_mode="Markdown"
-    )
-
-
-async def handle_admin_add_addon_category(query, context, data):
-    """Выбор категории для добавления аддона"""
-    category = data.split(":")[1]
-
-    keyboard = [[InlineKeyboardButton("❌ Отмена", callback_data="cancel_admin")]]
-    await query.edit_message_text(
-        f"➕ **Добавление аддона в категорию '{category}'**\n\n"
-        "Введите название аддона в чат:",
-        reply_markup=InlineKeyboardMarkup(keyboard),
-        parse_mode="Markdown"
-    )
-    context.user_data['admin_adding_addon'] = True
-    context.user_data['admin_addon_data'] = {
-        'category': category,
-        'step': 0
-    }
-
-
-async def handle_admin_edit_addon(query):
-    """Редактирование аддона"""
-    await query.edit_message_text(
-        "✏️ **Редактирование аддона**\n\n"
-        "⚠️ **Редактирование временно недоступно**\n"
-        "Используйте удаление и добавление нового аддона.",
-        reply_markup=get_addon_management_menu(),
-        parse_mode="Markdown"
-    )
-
-
-async def handle_admin_delete_addon_start(query):
-    """Начало удаления аддона"""
-    categories = get_categories()
-    if not categories:
-        await query.edit_message_text(
-            "❌ **Нет категорий для удаления!**",
-            reply_markup=get_addon_management_menu(),
-            parse_mode="Markdown"
-        )
-        return
-
-    keyboard = []
-    for category in categories:
-        addons = get_addons(category)
-        if addons:
-            for i, addon in enumerate(addons):
-                keyboard.append([InlineKeyboardButton(
-                    f"{category}: {addon['name']}",
-                    callback_data=f"admin_delete_addon_confirm:{category}:{i}"
-                )])
-
-    if not keyboard:
-        await query.edit_message_text(
-            "❌ **Нет аддонов для удаления!**",
-            reply_markup=get_addon_management_menu(),
-            parse_mode="Markdown"
-        )
-        return
-
-    keyboard.append([InlineKeyboardButton("❌ Отмена", callback_data="admin_addons")])
-
-    await query.edit_message_text(
-        "🗑️ **Удаление аддона**\n\n"
-        "Выберите аддон для удаления:",
-        reply_markup=InlineKeyboardMarkup(keyboard),
-        parse_mode="Markdown"
-    )
-
-
-async def handle_admin_delete_addon_confirm(query, data):
-    """Подтверждение удаления аддона"""
-    parts = data.split(":")
-    if len(parts) >= 3:
-        category = parts[1]
-        index = int(parts[2])
-
-        addon = get_addon(category, index)
-        if not addon:
-            await query.edit_message_text(
-                "❌ **Аддон не найден!**",
-                reply_markup=get_addon_management_menu(),
-                parse_mode="Markdown"
-            )
-            return
-
-        keyboard = [
-            [
-                InlineKeyboardButton("✅ Да, удалить",
-                                     callback_data=f"admin_do_delete:{category}:{index}"),
-                InlineKeyboardButton("❌ Нет, отменить",
-                                     callback_data="admin_addons")
-            ]
-        ]
-
-        await query.edit_message_text(
-            f"🗑️ **Удаление аддона**\n\n"
-            f"Вы уверены, что хотите удалить аддон:\n"
-            f"**{addon['name']}** из категории {category}?\n\n"
-            f"⚠️ **Это действие необратимо!**",
-            reply_markup=InlineKeyboardMarkup(keyboard),
-            parse_mode="Markdown"
-        )
-
-
-async def handle_admin_do_delete(query, data):
-    """Удаление аддона"""
-    parts = data.split(":")
-    if len(parts) >= 3:
-        category = parts[1]
-        index = int(parts[2])
-
-        success = delete_addon(category, index)
-        if success:
-            await query.edit_message_text(
-                f"✅ **Аддон удален из категории '{category}'!**",
-                reply_markup=get_addon_management_menu(),
-                parse_mode="Markdown"
-            )
-        else:
-            await query.edit_message_text(
-                f"❌ **Не удалось удалить аддон!**",
-                reply_markup=get_addon_management_menu(),
-                parse_mode="Markdown"
-            )
-
-
-async def handle_admin_addon_stats_start(query):
-    """Начало просмотра статистики по аддонам"""
-    categories = get_categories()
-    if not categories:
-        await query.edit_message_text(
-            "❌ **Нет категорий!**",
-            reply_markup=get_addon_management_menu(),
-            parse_mode="Markdown"
-        )
-        return
-
-    keyboard = []
-    for category in categories:
-        keyboard.append([InlineKeyboardButton(category, callback_data=f"admin_stats_cat:{category}")])
-
-    keyboard.append([InlineKeyboardButton("🔙 Назад", callback_data="admin_addons")])
-
-    await query.edit_message_text(
-        "📊 **Статистика по аддонам**\n\n"
-        "Выберите категорию:",
-        reply_markup=InlineKeyboardMarkup(keyboard),
-        parse_mode="Markdown"
-    )
-
-
-async def handle_admin_addon_stats_category(query, data):
-    """Выбор категории для статистики по аддону"""
-    category = data.split(":")[1]
-    addons = get_addons(category)
-
-    if not addons:
-        await query.edit_message_text(
-            f"❌ **В категории '{category}' нет аддонов!**",
-            reply_markup=get_addon_management_menu(),
-            parse_mode="Markdown"
-        )
-        return
-
-    keyboard = []
-    for i, addon in enumerate(addons):
-        keyboard.append([InlineKeyboardButton(addon['name'], callback_data=f"admin_stats_addon:{category}:{i}")])
-
-    keyboard.append([InlineKeyboardButton("🔙 Назад", callback_data="admin_addon_stats")])
-
-    await query.edit_message_text(
-        f"📊 **Статистика по аддонам**\n\n"
-        f"Категория: {category}\n"
-        f"Выберите аддон:",
-        reply_markup=InlineKeyboardMarkup(keyboard),
-        parse_mode="Markdown"
-    )
-
-
-async def handle_admin_addon_stats_view(query, data):
-    """Просмотр статистики по аддону"""
-    parts = data.split(":")
-    if len(parts) >= 3:
-        category = parts[1]
-        index = int(parts[2])
-
-        addon = get_addon(category, index)
-        if not addon:
-            await query.edit_message_text(
-                "❌ **Аддон не найден!**",
-                reply_markup=get_addon_management_menu(),
-                parse_mode="Markdown"
-            )
-            return
-
-        videos = db.get_videos(category, index, limit=1000)
-
-        total_videos = len(videos)
-        total_views = sum(video[7] for video in videos) if total_videos > 0 else 0
-        total_likes = sum(video[5] for video in videos) if total_videos > 0 else 0
-        total_dislikes = sum(video[6] for video in videos) if total_videos > 0 else 0
-
-        # ПОЛУЧАЕМ КОЛИЧЕСТВО ПРОСМОТРОВ АДДОНА (НОВОЕ)
-        addon_views = db.get_addon_views(category, index)
-
-        top_videos = db.get_top_videos(category, index, limit=5, days=30)
-
-        message = f"📊 **Статистика аддона:** {addon['name']}\n\n"
-        message += f"📦 **Категория:** {category}\n\n"
-
-        # Статистика просмотров аддона (НОВОЕ)
-        message += f"📈 **Просмотры карточки аддона:** {addon_views}\n\n"
-
-        # Статистика по видео
-        message += f"🎬 **Статистика по видео:**\n"
-        message += f"• Всего видео: {total_videos}\n"
-        message += f"• Всего просмотров видео: {total_views}\n"
-        message += f"• Всего лайков: {total_likes}\n"
-        message += f"• Всего дизлайков: {total_dislikes}\n\n"
-
-        message += f"🔗 **Ссылки аддона:**\n"
-        if addon.get('github'):
-            message += f"• GitHub: {addon['github']}\n"
-        if addon.get('youtube'):
-            message += f"• YouTube: {addon['youtube']}\n"
-
-        # Топ видео
-        if top_videos:
-            message += "\n🏆 **Топ видео за 30 дней:**\n"
-            for i, video in enumerate(top_videos, 1):
-                try:
-                    video_id, title, url, views, likes, dislikes, cat, idx = video
-                    short_title = title[:20] + "..." if len(title) > 20 else title
-                    message += f"{i}. {short_title}\n"
-                    message += f"   👁️ {views} | 👍 {likes} | 👎 {dislikes}\n"
-                except ValueError as e:
-                    print(f"⚠️ Ошибка распаковки данных топа видео: {e}")
-                    message += f"{i}. Ошибка данных\n"
-                    continue
-
-        keyboard = [
-            [InlineKeyboardButton("🔙 Назад", callback_data=f"admin_stats_cat:{category}")]
-        ]
-
-        await query.edit_message_text(
-            message,
-            reply_markup=InlineKeyboardMarkup(keyboard),
-            parse_mode="Markdown"
-        )
-
-
-async def handle_category_selection(query, data):
-    """Обработка выбора категории"""
-    category = data[4:]
-    print(f"📂 {query.from_user.id} выбрал категорию '{category}'")
-    await query.edit_message_text(
-        f"📦 **Аддоны в категории '{category}'**\n\n**Выберите аддон:**",
-        reply_markup=get_addons_menu(category),
-        parse_mode="Markdown"
-    )
-
-
-async def handle_addon_selection(query, data):
-    """Обработка выбора аддона"""
-    parts = data.split(":")
-    if len(parts) >= 3:
-        category = parts[1]
-        index = int(parts[2])
-        print(f"📦 {query.from_user.id} выбрал аддон {category}/{index}")
-
-        # ЛОГИРУЕМ ПРОСМОТР АДДОНА (НОВОЕ)
-        db.increment_addon_views(category, index)
-
-        addon = get_addon(category, index)
-
-        if addon:
-            videos = db.get_videos(category, index)
-
-            await query.edit_message_text(
-                f"🎯 **{addon['name']}**\n\n"
-                f"📝 {addon['description']}\n\n"
-                f"**Официальные ссылки:**",
-                reply_markup=get_addon_details_menu(
-                    category, index,
-                    has_videos=len(videos) > 0
-                ),
-                parse_mode="Markdown"
-            )
-
-
-async def handle_videos_list(query, data):
-    """Обработка списка видео"""
-    parts = data.split(":")
-    if len(parts) >= 3:
-        category = parts[1]
-        index = int(parts[2])
-        print(f"🎬 {query.from_user.id} просматривает видео для аддона {category}/{index}")
-        videos = db.get_videos(category, index)
-        addon = get_addon(category, index)
-
-        if videos and len(videos) > 0:
-            await query.edit_message_text(
-                f"🎬 **Полезные видео для {addon['name']}**\n\n"
-                f"Выберите видео для просмотра (показаны оригинальные названия с YouTube):",
-                reply_markup=get_videos_list_menu(videos, category, index),
-                parse_mode="Markdown"
-            )
-        else:
-            print(f"🎬 Нет видео для аддона {category}/{index}")
-            await query.edit_message_text(
-                f"🎬 **Полезные видео для {addon['name']}**\n\n"
-                f"Пока нет видео для этого аддона.\n\n"
-                f"Будьте первым, кто добавит полезное видео!",
-                reply_markup=get_add_video_menu(category, index),
-                parse_mode="Markdown"
-            )
-
-
-async def handle_video_view(query, data):
-    """Обработка просмотра видео"""
-    video_id = int(data.split(":")[1])
-    video = db.get_video_by_id(video_id)
-
-    if video:
-        # Логируем просмотр
-        db.log_video_action(video_id, query.from_user.id, "view")
-
-        v_id, category, index, user_id_video, youtube_url, title, description, likes, dislikes, views, verified, created_at = video
-        addon = get_addon(category, index)
-
-        safe_title = html.escape(title)
-        safe_description = html.escape(description) if description else "Нет описания"
-
-        message_text = f"🎬 <b>{safe_title}</b>\n\n"
-        message_text += f"🔗 <a href='{youtube_url}'>{youtube_url}</a>\n\n"
-        message_text += f"📝 {safe_description}\n\n"
-        message_text += f"👁️ {views} просмотров | 👍 {likes} | 👎 {dislikes}\n\n"
-        message_text += f"Для аддона: <b>{addon['name']}</b>"
-
-        await query.edit_message_text(
-            message_text,
-            reply_markup=get_video_view_menu(v_id, category, index),
-            parse_mode="HTML",
-            disable_web_page_preview=False
-        )
-
-
-async def handle_video_addition_start(query, context, data):
-    """Начало добавления видео"""
-    parts = data.split(":")
-    if len(parts) >= 3:
-        category = parts[1]
-        index = int(parts[2])
-        print(f"🎬 {query.from_user.id} начал добавление видео для аддона {category}/{index}")
-
-        context.user_data['add_video'] = {
-            'category': category,
-            'index': index
-        }
-
-        await query.edit_message_text(
-            "🎬 **Добавление полезного видео**\n\n"
-            "Отправьте ссылку на YouTube видео в чат:\n\n"
-            "Пример: https://www.youtube.com/watch?v=...\n\n"
-            "Я автоматически получу название видео с YouTube.",
-            reply_markup=get_add_video_menu(category, index),
-            parse_mode="Markdown"
-        )
-
-        context.user_data['adding_video_url'] = True
-
-
-async def handle_video_like(query, data, user_id):
-    """Обработка лайка видео"""
-    video_id = int(data.split(":")[1])
-    # Логируем лайк
-    db.log_video_action(video_id, user_id, "like")
-    success, message = db.rate_video(video_id, user_id, is_like=True)
-    await query.answer(message, show_alert=True)
-
-    if success:
-        await update_video_view(query, video_id)
-
-
-async def handle_video_dislike(query, data, user_id):
-    """Обработка дизлайка видео"""
-    video_id = int(data.split(":")[1])
-    # Логируем дизлайк
-    db.log_video_action(video_id, user_id, "dislike")
-    success, message = db.rate_video(video_id, user_id, is_like=False)
-    await query.answer(message, show_alert=True)
-
-    if success:
-        await update_video_view(query, video_id)
-
-
-async def update_video_view(query, video_id):
-    """Обновление просмотра видео после оценки"""
-    video = db.get_video_by_id(video_id)
-    if video:
-        v_id, category, index, user_id_video, youtube_url, title, description, likes, dislikes, views, verified, created_at = video
-        addon = get_addon(category, index)
-
-        safe_title = html.escape(title)
-        safe_description = html.escape(description) if description else "Нет описания"
-
-        message_text = f"🎬 <b>{safe_title}</b>\n\n"
-        message_text += f"🔗 <a href='{youtube_url}'>{youtube_url}</a>\n\n"
-        message_text += f"📝 {safe_description}\n\n"
-        message_text += f"👁️ {views} просмотров | 👍 {likes} | 👎 {dislikes}\n\n"
-        message_text += f"Для аддона: <b>{addon['name']}</b>"
-
-        await query.edit_message_text(
-            message_text,
-            reply_markup=get_video_view_menu(v_id, category, index),
-            parse_mode="HTML",
-            disable_web_page_preview=False
-        )
-
-
-async def handle_note_view(query, data, context):
-    """Обработка просмотра заметки"""
-    note_id = int(data[5:])
-    note = db.get_note(note_id)
-
-    if note:
-        message_id = note[4]
-        chat_id = note[5]
-        title = note[2]
-        hashtag = note[3]
-        user_id_note = note[1]
-        views = note[6] if len(note) > 6 else 0
-
-        print(f"📄 {query.from_user.id} открывает заметку {note_id}: '{title}'")
-
-        # Увеличиваем счетчик просмотров
-        db.increment_note_views(note_id)
-
-        try:
-            # Отправляем сообщение-указатель, которое будет ссылаться на оригинальную заметку
-            # Это заставит Telegram прокрутить ленту до нужного сообщения
-            await context.bot.send_message(
-                chat_id=query.from_user.id,
-                text=f"📄 **Заметка: {title}**\n\n"
-                     f"Нажмите на это сообщение, чтобы Telegram прокрутил ленту к заметке.\n"
-                     f"Хэштег: #{hashtag}",
-                reply_to_message_id=message_id,
-                parse_mode="Markdown"
-            )
-
-            # Редактируем сообщение с кнопками
-            await query.edit_message_text(
-                f"✅ **Сообщение-указатель отправлено!**\n\n"
-                f"Telegram должен прокрутить ленту к заметке:\n"
-                f"📄 **{title}**\n"
-                f"🏷️ #{hashtag}\n"
-                f"👁️ Просмотров: {views + 1}",
-                parse_mode="Markdown"
-            )
-
-        except Exception as e:
-            print(f"❌ Ошибка при создании reply-сообщения: {e}")
-
-            # Если не удалось отправить reply, показываем информацию обычным способом
-            await query.edit_message_text(
-                f"📄 **{title}**\n\n"
-                f"🏷️ **Хэштег:** #{hashtag}\n"
-                f"👤 **Автор:** {user_id_note}\n"
-                f"👁️ **Просмотров:** {views + 1}\n\n"
-                f"**Как найти заметку:**\n"
-                f"1. Вернитесь в наш личный чат\n"
-                f"2. Найдите сообщение с хэштегом: #{hashtag}\n"
-                f"3. Используйте поиск по хэштегу в чате",
-                parse_mode="Markdown"
-            )
-
-
-async def handle_notes_list(query, user_id):
-    """Обработка списка заметок"""
-    notes = db.get_user_notes(user_id)
-
-    if not notes:
-        await query.edit_message_text(
-            "📭 **У вас нет заметок.**",
-            parse_mode="Markdown"
-        )
-    else:
-        await query.edit_message_text(
-            "📒 **Ваши заметки:**",
-            reply_markup=get_notes_menu(notes),
-            parse_mode="Markdown"
-        )
-
-
-async def handle_link_click(query, data, context):
-    """Обработка кликов по ссылкам GitHub и YouTube"""
-    parts = data.split(":")
-    link_type = parts[0]
-
-    if link_type == "github":
-        category = parts[1]
-        index = int(parts[2])
-        addon = get_addon(category, index)
-        if addon and addon.get("github"):
-            # Логируем клик
-            db.log_link_click(query.from_user.id, "github", addon["github"], category, index)
-            await query.answer(f"Открываю GitHub... (Кликов: {db.get_addon_link_stats(category, index, 30).get('github', {}).get('recent_clicks', 0) + 1})", show_alert=False)
-            await context.bot.send_message(
-                chat_id=query.from_user.id,
-                text=f"🔗 **GitHub ссылка для {addon['name']}:**\n{addon['github']}"
-            )
-
-    elif link_type == "youtube":
-        category = parts[1]
-        index = int(parts[2])
-        addon = get_addon(category, index)
-        if addon and addon.get("youtube"):
-            db.log_link_click(query.from_user.id, "youtube", addon["youtube"], category, index)
-            await query.answer(f"Открываю YouTube... (Кликов: {db.get_addon_link_stats(category, index, 30).get('youtube', {}).get('recent_clicks', 0) + 1})", show_alert=False)
-            await context.bot.send_message(
-                chat_id=query.from_user.id,
-                text=f"🎬 **YouTube ссылка для {addon['name']}:**\n{addon['youtube']}"
-            )
\ No newline at end of file
+# file: handlers/callback.py
+import logging
+import html
+import json
+from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
+from telegram.ext import ContextTypes
+
+from config import ADMIN_IDS
+from menus.main_menu import get_main_menu
+from menus.addons_menu import (
+    get_categories_menu, get_addons_menu, get_addon_details_menu,
+    get_videos_list_menu, get_video_view_menu, get_add_video_menu
+)
+from menus.notes_menu import get_notes_menu
+from menus.admin_menu import get_admin_menu, get_addon_management_menu
+from data.addons_data import get_categories, get_addons, get_addon, get_category, get_category_id, delete_addon
+from utils.youtube import (
+    extract_video_id, get_youtube_title, invidious_backends, reload_invidious_instances, title_lookups
+)
+from utils.callback_data import encode_callback, decode_callback
+from utils.view_cache import edit_view, views
+from handlers.message import video_queue
+from handlers.router import CallbackRouter
+from update_processor import update_processor
+from outbound_scheduler import outbound_scheduler
+from user_state import persistence
+logger = logging.getLogger(__name__)
+
+# Импортируем базу данных
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from database import adb
+except ImportError:
+    from database import Database, AsyncDatabase
+
+    adb = AsyncDatabase(Database())
+
+
+async def handle_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Обработчик inline кнопок"""
+    query = update.callback_query
+    await query.answer()
+
+    user_id = query.from_user.id
+    data = query.data
+
+    print(f"\n🖱️ КНОПКА: {user_id} нажал '{data}'")
+
+    decoded = decode_callback(data)
+    if decoded is None:
+        # Кнопка из старого сообщения или истёк срок данных в реестре
+        await edit_view(
+            query,
+            "⌛ **Эта кнопка устарела.**\n\nОткройте меню заново.",
+            parse_mode="Markdown"
+        )
+        return
+    route, args = decoded
+    print(f"🖱️ Маршрут: {route} {args}")
+
+    if not await router.dispatch(query, context, route, args):
+        print(f"⚠️ Нет обработчика для маршрута '{route}'")
+
+
+def admin_only(handler):
+    """Обработчик маршрута, доступный только администраторам"""
+    async def wrapper(query, context, route, args):
+        if query.from_user.id not in ADMIN_IDS:
+            await query.answer("❌ У вас нет прав администратора.", show_alert=True)
+            return
+        await handler(query, context, route, args)
+    return wrapper
+
+
+async def handle_cancel_actions(query, context, route, args):
+    """Обработка отмен действий"""
+    if route == "cancel_note":
+        context.user_data.clear()
+        await edit_view(
+            query,
+            "❌ **Добавление заметки отменено.**",
+            parse_mode="Markdown"
+        )
+
+    elif route == "cancel_search":
+        context.user_data.clear()
+        await edit_view(
+            query,
+            "❌ **Поиск отменен.**",
+            parse_mode="Markdown"
+        )
+
+    elif route == "cancel_admin":
+        await edit_view(
+            query,
+            "❌ **Действие отменено.**",
+            reply_markup=get_admin_menu(),
+            parse_mode="Markdown"
+        )
+
+    elif route == "cancel_add_video":
+        if args:
+            addon_id = args[0]
+            addon = get_addon(addon_id)
+
+            if addon:
+                context.user_data.clear()
+                await edit_view(
+                    query,
+                    f"❌ **Добавление видео отменено.**\n\n"
+                    f"🎯 **{addon['name']}**\n\n"
+                    f"📝 {addon['description']}\n\n"
+                    f"**Официальные ссылки:**",
+                    reply_markup=get_addon_details_menu(addon_id),
+                    parse_mode="Markdown"
+                )
+
+
+async def handle_main_menu(query, context):
+    """Обработка возврата в главное меню"""
+    context.user_data.clear()
+    await edit_view(
+        query,
+        "🏠 **Вы вернулись в главное меню.**\n\n"
+        "Используйте кнопки внизу экрана для навигации.",
+        parse_mode="Markdown"
+    )
+
+
+async def handle_admin_menu(query, user_id):
+    """Обработка админского меню"""
+    if user_id not in ADMIN_IDS:
+        await query.answer("❌ У вас нет прав администратора.", show_alert=True)
+        return
+
+    await edit_view(
+        query,
+        "👑 **Панель администратора**\n\nВыберите действие:",
+        reply_markup=get_admin_menu(),
+        parse_mode="Markdown"
+    )
+
+
+async def handle_admin_addons(query):
+    """Меню управления аддонами"""
+    await edit_view(
+        query,
+        "📦 **Управление аддонами**\n\nВыберите действие:",
+        reply_markup=get_addon_management_menu(),
+        parse_mode="Markdown"
+    )
+
+
+async def handle_admin_routes(query, context):
+    """Скорость обработки кнопок по маршрутам"""
+    keyboard = [
+        [InlineKeyboardButton("📤 Выгрузить JSON", callback_data=encode_callback("admin_routes_export"))],
+        [InlineKeyboardButton("🔙 Назад", callback_data=encode_callback("admin"))]
+    ]
+    await edit_view(
+        query,
+        "⏱️ **Скорость обработки кнопок**\n\n" + router.report()
+        + "\n\n📨 Обновления: " + update_processor.report()
+        + "\n\n📤 Исходящие: " + outbound_scheduler.report()
+        + "\n\n♻️ Правки сообщений: " + views.report()
+        + "\n\n🧠 Состояние пользователей: " + persistence.report(context.application.user_data),
+        reply_markup=InlineKeyboardMarkup(keyboard),
+        parse_mode="Markdown"
+    )
+
+
+async def handle_admin_backends(query, note=""):
+    """Здоровье инстансов Invidious"""
+    keyboard = [
+        [InlineKeyboardButton("🔄 Перечитать список", callback_data=encode_callback("admin_backends_reload"))],
+        [InlineKeyboardButton("🔙 Назад", callback_data=encode_callback("admin"))]
+    ]
+    await edit_view(
+        query,
+        "🩺 **Инстансы Invidious**\n"
+        "🟢 работает, 🟡 пробный запрос, 🔴 отключён\n\n"
+        + invidious_backends.report()
+        + "\n\n🔗 " + title_lookups.report()
+        + "\n\n📥 Очередь видео: " + video_queue.report() + note,
+        reply_markup=InlineKeyboardMarkup(keyboard),
+        parse_mode="Markdown"
+    )
+
+
+async def handle_admin_backends_reload(query):
+    """Перечитывание списка инстансов Invidious"""
+    instances = reload_invidious_instances()
+    await handle_admin_backends(query, f"\n\n✅ Список перечитан: {len(instances)} шт.")
+
+
+async def handle_admin_routes_export(query, context):
+    """Выгрузка метрик маршрутов файлом"""
+    report = json.dumps(router.export(), ensure_ascii=False, indent=2)
+    await context.bot.send_document(
+        chat_id=query.from_user.id,
+        document=report.encode('utf-8'),
+        filename="callback_metrics.json"
+    )
+
+
+async def handle_admin_stats(query, user_id):
+    """Обработка статистики админа"""
+    from data.addons_data import get_addon
+
+    stats = await adb.get_overall_stats()
+
+    print(f"👑 АДМИН {user_id} запросил статистику")
+
+    message = "📊 **Статистика бота**\n\n"
+
+    # Общая статистика
+    message += "📈 **Общая статистика:**\n"
+    message += f"• Заметок: {stats.get('notes', {}).get('total', 0)}\n"
+    message += f"• Просмотров заметок: {stats.get('notes', {}).get('total_views', 0)}\n"
+    message += f"• Видео: {stats.get('videos', {}).get('total', 0)}\n"
+    message += f"• Просмотров видео: {stats.get('videos', {}).get('total_views', 0)}\n"
+    message += f"• Лайков видео: {stats.get('videos', {}).get('total_likes', 0)}\n"
+    message += f"• Дизлайков видео: {stats.get('videos', {}).get('total_dislikes', 0)}\n"
+    message += f"• Просмотров аддонов: {stats.get('addons', {}).get('total_views', 0)}\n\n"  # НОВОЕ
+
+    # Статистика пользователей
+    message += "👥 **Пользователи:**\n"
+    message += f"• Создавали заметки: {stats.get('users', {}).get('notes', 0)}\n"
+    message += f"• Добавляли видео: {stats.get('users', {}).get('videos', 0)}\n"
+    message += f"• Оценивали видео: {stats.get('users', {}).get('likes', 0)}\n\n"
+
+    # Топ аддонов по просмотрам (НОВОЕ)
+    top_addons = await adb.get_top_addons_by_views(limit=5, days=30)
+    if top_addons:
+        message += "🏆 **Топ-5 аддонов по просмотрам (30 дней):**\n"
+        for i, addon_data in enumerate(top_addons, 1):
+            addon_id, views, created_at = addon_data
+            try:
+                addon = get_addon(addon_id)
+                addon_name = addon['name'] if addon else "Неизвестный аддон"
+                category = addon['category'] if addon else "-"
+                message += f"{i}. {addon_name}\n"
+                message += f"   📦 Категория: {category}\n"
+                message += f"   👁️ Просмотров: {views}\n"
+            except:
+                message += f"{i}. Ошибка данных\n"
+                continue
+        message += "\n"
+
+    # Топ видео
+    top_videos = await adb.get_top_videos(limit=5, days=7)
+    if top_videos:
+        message += "🎬 **Топ-5 видео (7 дней):**\n"
+        for i, video in enumerate(top_videos, 1):
+            try:
+                video_id, title, url, views, likes, dislikes, addon_id = video
+                short_title = title[:20] + "..." if len(title) > 20 else title
+
+                try:
+                    addon = get_addon(addon_id)
+                    addon_name = addon['name'] if addon else "Неизвестный аддон"
+                except:
+                    addon_name = "Неизвестный аддон"
+
+                message += f"{i}. {short_title}\n"
+                message += f"   📦 Аддон: {addon_name}\n"
+                message += f"   👁️ Просмотров: {views}\n"
+                message += f"   👍 {likes} | 👎 {dislikes}\n"
+            except ValueError as e:
+                print(f"⚠️ Ошибка распаковки данных видео: {e}")
+                message += f"{i}. Ошибка данных\n"
+                continue
+
+    await edit_view(
+        query,
+        message,
+        parse_mode="Markdown"
+    )
+
+
+async def handle_admin_add_category(query, context):
+    """Начало добавления категории"""
+    keyboard = [[InlineKeyboardButton("❌ Отмена", callback_data=encode_callback("cancel_admin"))]]
+    await edit_view(
+        query,
+        "➕ **Добавление категории**\n\n"
+        "Введите название новой категории в чат:",
+        reply_markup=InlineKeyboardMarkup(keyboard),
+        parse_mode="Markdown"
+    )
+    context.user_data['admin_adding_category'] = True
+
+
+async def handle_admin_add_addon_start(query):
+    """Начало добавления аддона"""
+    categories = get_categories()
+    if not categories:
+        await edit_view(
+            query,
+            "❌ **Сначала добавьте категорию!**",
+            reply_markup=get_addon_management_menu(),
+            parse_mode="Markdown"
+        )
+        return
+
+    keyboard = []
+    for category in categories:
+        keyboard.append([InlineKeyboardButton(
+            category, callback_data=encode_callback("admin_addon_cat", get_category_id(category))
+        )])
+    keyboard.append([InlineKeyboardButton("❌ Отмена", callback_data=encode_callback("cancel_admin"))])
+
+    await edit_view(
+        query,
+        "➕ **Добавление аддона**\n\n"
+        "Сначала выберите категорию:",
+        reply_markup=InlineKeyboardMarkup(keyboard),
+        parse_mode="Markdown"
+    )
+
+
+async def handle_admin_add_addon_category(query, context, args):
+    """Выбор категории для добавления аддона"""
+    category = get_category(args[0]) if args else None
+    if category is None:
+        await edit_view(
+            query,
+            "❌ **Категория не найдена!**",
+            reply_markup=get_addon_management_menu(),
+            parse_mode="Markdown"
+        )
+        return
+
+    keyboard = [[InlineKeyboardButton("❌ Отмена", callback_data=encode_callback("cancel_admin"))]]
+    await edit_view(
+        query,
+        f"➕ **Добавление аддона в категорию '{category}'**\n\n"
+        "Введите название аддона в чат:",
+        reply_markup=InlineKeyboardMarkup(keyboard),
+        parse_mode="Markdown"
+    )
+    context.user_data['admin_adding_addon'] = True
+    context.user_data['admin_addon_data'] = {
+        'category': category,
+        'step': 0
+    }
+
+
+async def handle_admin_edit_addon(query):
+    """Редактирование аддона"""
+    await edit_view(
+        query,
+        "✏️ **Редактирование аддона**\n\n"
+        "⚠️ **Редактирование временно недоступно**\n"
+        "Используйте удаление и добавление нового аддона.",
+        reply_markup=get_addon_management_menu(),
+        parse_mode="Markdown"
+    )
+
+
+async def handle_admin_delete_addon_start(query):
+    """Начало удаления аддона"""
+    categories = get_categories()
+    if not categories:
+        await edit_view(
+            query,
+            "❌ **Нет категорий для удаления!**",
+            reply_markup=get_addon_management_menu(),
+            parse_mode="Markdown"
+        )
+        return
+
+    keyboard = []
+    for category in categories:
+        addons = get_addons(category)
+        if addons:
+            for addon in addons:
+                keyboard.append([InlineKeyboardButton(
+                    f"{category}: {addon['name']}",
+                    callback_data=encode_callback("admin_delete_addon_confirm", addon['id'])
+                )])
+
+    if not keyboard:
+        await edit_view(
+            query,
+            "❌ **Нет аддонов для удаления!**",
+            reply_markup=get_addon_management_menu(),
+            parse_mode="Markdown"
+        )
+        return
+
+    keyboard.append([InlineKeyboardButton("❌ Отмена", callback_data=encode_callback("admin_addons"))])
+
+    await edit_view(
+        query,
+        "🗑️ **Удаление аддона**\n\n"
+        "Выберите аддон для удаления:",
+        reply_markup=InlineKeyboardMarkup(keyboard),
+        parse_mode="Markdown"
+    )
+
+
+async def handle_admin_delete_addon_confirm(query, args):
+    """Подтверждение удаления аддона"""
+    if args:
+        addon_id = args[0]
+
+        addon = get_addon(addon_id)
+        if not addon:
+            await edit_view(
+                query,
+                "❌ **Аддон не найден!**",
+                reply_markup=get_addon_management_menu(),
+                parse_mode="Markdown"
+            )
+            return
+
+        keyboard = [
+            [
+                InlineKeyboardButton("✅ Да, удалить",
+                                     callback_data=encode_callback("admin_do_delete", addon_id)),
+                InlineKeyboardButton("❌ Нет, отменить",
+                                     callback_data=encode_callback("admin_addons"))
+            ]
+        ]
+
+        await edit_view(
+            query,
+            f"🗑️ **Удаление аддона**\n\n"
+            f"Вы уверены, что хотите удалить аддон:\n"
+            f"**{addon['name']}** из категории {addon['category']}?\n\n"
+            f"⚠️ **Это действие необратимо!**",
+            reply_markup=InlineKeyboardMarkup(keyboard),
+            parse_mode="Markdown"
+        )
+
+
+async def handle_admin_do_delete(query, args):
+    """Удаление аддона"""
+    if args:
+        addon_id = args[0]
+        addon = get_addon(addon_id)
+
+        success = addon is not None and await adb.run(delete_addon, addon_id)
+        if success:
+            await edit_view(
+                query,
+                f"✅ **Аддон удален из категории '{addon['category']}'!**",
+                reply_markup=get_addon_management_menu(),
+                parse_mode="Markdown"
+            )
+        else:
+            await edit_view(
+                query,
+                f"❌ **Не удалось удалить аддон!**",
+                reply_markup=get_addon_management_menu(),
+                parse_mode="Markdown"
+            )
+
+
+async def handle_admin_addon_stats_start(query):
+    """Начало просмотра статистики по аддонам"""
+    categories = get_categories()
+    if not categories:
+        await edit_view(
+            query,
+            "❌ **Нет категорий!**",
+            reply_markup=get_addon_management_menu(),
+            parse_mode="Markdown"
+        )
+        return
+
+    keyboard = []
+    for category in categories:
+        keyboard.append([InlineKeyboardButton(
+            category, callback_data=encode_callback("admin_stats_cat", get_category_id(category))
+        )])
+
+    keyboard.append([InlineKeyboardButton("🔙 Назад", callback_data=encode_callback("admin_addons"))])
+
+    await edit_view(
+        query,
+        "📊 **Статистика по аддонам**\n\n"
+        "Выберите категорию:",
+        reply_markup=InlineKeyboardMarkup(keyboard),
+        parse_mode="Markdown"
+    )
+
+
+async def handle_admin_addon_stats_category(query, args):
+    """Выбор категории для статистики по аддону"""
+    category = get_category(args[0]) if args else None
+    addons = get_addons(category)
+
+    if not addons:
+        await edit_view(
+            query,
+            f"❌ **В категории '{category}' нет аддонов!**",
+            reply_markup=get_addon_management_menu(),
+            parse_mode="Markdown"
+        )
+        return
+
+    keyboard = []
+    for addon in addons:
+        keyboard.append([InlineKeyboardButton(addon['name'], callback_data=encode_callback("admin_stats_addon", addon['id']))])
+
+    keyboard.append([InlineKeyboardButton("🔙 Назад", callback_data=encode_callback("admin_addon_stats"))])
+
+    await edit_view(
+        query,
+        f"📊 **Статистика по аддонам**\n\n"
+        f"Категория: {category}\n"
+        f"Выберите аддон:",
+        reply_markup=InlineKeyboardMarkup(keyboard),
+        parse_mode="Markdown"
+    )
+
+
+async def handle_admin_addon_stats_view(query, args):
+    """Просмотр статистики по аддону"""
+    if args:
+        addon_id = args[0]
+
+        addon = get_addon(addon_id)
+        if not addon:
+            await edit_view(
+                query,
+                "❌ **Аддон не найден!**",
+                reply_markup=get_addon_management_menu(),
+                parse_mode="Markdown"
+            )
+            return
+
+        category = addon['category']
+        video_stats = await adb.get_addon_video_stats(addon_id)
+
+        total_videos = video_stats.get('total_videos', 0)
+        total_views = video_stats.get('total_views', 0)
+        total_likes = video_stats.get('total_likes', 0)
+        total_dislikes = video_stats.get('total_dislikes', 0)
+
+        # ПОЛУЧАЕМ КОЛИЧЕСТВО ПРОСМОТРОВ АДДОНА (НОВОЕ)
+        addon_views = await adb.get_addon_views(addon_id)
+
+        top_videos = await adb.get_top_videos(addon_id, limit=5, days=30)
+
+        message = f"📊 **Статистика аддона:** {addon['name']}\n\n"
+        message += f"📦 **Категория:** {category}\n\n"
+
+        # Статистика просмотров аддона (НОВОЕ)
+        message += f"📈 **Просмотры карточки аддона:** {addon_views}\n\n"
+
+        # Статистика по видео
+        message += f"🎬 **Статистика по видео:**\n"
+        message += f"• Всего видео: {total_videos}\n"
+        message += f"• Всего просмотров видео: {total_views}\n"
+        message += f"• Всего лайков: {total_likes}\n"
+        message += f"• Всего дизлайков: {total_dislikes}\n\n"
+
+        message += f"🔗 **Ссылки аддона:**\n"
+        if addon.get('github'):
+            message += f"• GitHub: {addon['github']}\n"
+        if addon.get('youtube'):
+            message += f"• YouTube: {addon['youtube']}\n"
+
+        # Топ видео
+        if top_videos:
+            message += "\n🏆 **Топ видео за 30 дней:**\n"
+            for i, video in enumerate(top_videos, 1):
+                try:
+                    video_id, title, url, views, likes, dislikes, video_addon_id = video
+                    short_title = title[:20] + "..." if len(title) > 20 else title
+                    message += f"{i}. {short_title}\n"
+                    message += f"   👁️ {views} | 👍 {likes} | 👎 {dislikes}\n"
+                except ValueError as e:
+                    print(f"⚠️ Ошибка распаковки данных топа видео: {e}")
+                    message += f"{i}. Ошибка данных\n"
+                    continue
+
+        keyboard = [
+            [InlineKeyboardButton(
+                "🔙 Назад", callback_data=encode_callback("admin_stats_cat", get_category_id(category))
+            )]
+        ]
+
+        await edit_view(
+            query,
+            message,
+            reply_markup=InlineKeyboardMarkup(keyboard),
+            parse_mode="Markdown"
+        )
+
+
+async def handle_category_selection(query, args):
+    """Обработка выбора категории"""
+    category = get_category(args[0]) if args else None
+    if category is None:
+        await edit_view(
+            query,
+            "❌ **Категория не найдена.**",
+            reply_markup=get_categories_menu(),
+            parse_mode="Markdown"
+        )
+        return
+    print(f"📂 {query.from_user.id} выбрал категорию '{category}'")
+    await edit_view(
+        query,
+        f"📦 **Аддоны в категории '{category}'**\n\n**Выберите аддон:**",
+        reply_markup=get_addons_menu(category),
+        parse_mode="Markdown"
+    )
+
+
+async def handle_addon_selection(query, args):
+    """Обработка выбора аддона"""
+    if args:
+        addon_id = args[0]
+        print(f"📦 {query.from_user.id} выбрал аддон {addon_id}")
+
+        # ЛОГИРУЕМ ПРОСМОТР АДДОНА (НОВОЕ)
+        await adb.increment_addon_views(addon_id)
+
+        addon = get_addon(addon_id)
+
+        if addon:
+            videos = await adb.get_videos(addon_id, limit=1)
+
+            await edit_view(
+                query,
+                f"🎯 **{addon['name']}**\n\n"
+                f"📝 {addon['description']}\n\n"
+                f"**Официальные ссылки:**",
+                reply_markup=get_addon_details_menu(
+                    addon_id,
+                    has_videos=len(videos) > 0
+                ),
+                parse_mode="Markdown"
+            )
+        else:
+            await edit_view(
+                query,
+                "❌ **Аддон не найден.**",
+                reply_markup=get_categories_menu(),
+                parse_mode="Markdown"
+            )
+
+
+async def handle_videos_list(query, args):
+    """Обработка списка видео (аргументы: id аддона[, "p"|"n", курсор])"""
+    if args:
+        addon_id = args[0]
+        cursor, direction = None, 'next'
+        if len(args) >= 3:
+            direction = 'prev' if args[1] == 'p' else 'next'
+            cursor = args[2]
+        print(f"🎬 {query.from_user.id} просматривает видео для аддона {addon_id}")
+        addon = get_addon(addon_id)
+        if not addon:
+            await query.answer("❌ Аддон не найден.", show_alert=True)
+            return
+        videos, prev_cursor, next_cursor = await adb.get_videos_page(addon_id, cursor, direction)
+        if not videos and cursor is not None:
+            # Граничное видео удалено - начинаем с первой страницы
+            videos, prev_cursor, next_cursor = await adb.get_videos_page(addon_id)
+
+        if videos and len(videos) > 0:
+            await edit_view(
+                query,
+                f"🎬 **Полезные видео для {addon['name']}**\n\n"
+                f"Выберите видео для просмотра (показаны оригинальные названия с YouTube):",
+                reply_markup=get_videos_list_menu(videos, addon_id, prev_cursor, next_cursor),
+                parse_mode="Markdown"
+            )
+        else:
+            print(f"🎬 Нет видео для аддона {addon_id}")
+            await edit_view(
+                query,
+                f"🎬 **Полезные видео для {addon['name']}**\n\n"
+                f"Пока нет видео для этого аддона.\n\n"
+                f"Будьте первым, кто добавит полезное видео!",
+                reply_markup=get_add_video_menu(addon_id),
+                parse_mode="Markdown"
+            )
+
+
+async def handle_video_view(query, args):
+    """Обработка просмотра видео"""
+    video_id = args[0]
+    video = await adb.get_video_by_id(video_id)
+
+    if video:
+        # Логируем просмотр
+        await adb.log_video_action(video_id, query.from_user.id, "view")
+
+        v_id, addon_id, user_id_video, youtube_url, title, description, likes, dislikes, views, verified, created_at = video
+        addon = get_addon(addon_id)
+        addon_name = addon['name'] if addon else "Неизвестный аддон"
+
+        safe_title = html.escape(title)
+        safe_description = html.escape(description) if description else "Нет описания"
+
+        message_text = f"🎬 <b>{safe_title}</b>\n\n"
+        message_text += f"🔗 <a href='{youtube_url}'>{youtube_url}</a>\n\n"
+        message_text += f"📝 {safe_description}\n\n"
+        message_text += f"👁️ {views} просмотров | 👍 {likes} | 👎 {dislikes}\n\n"
+        message_text += f"Для аддона: <b>{html.escape(addon_name)}</b>"
+
+        await edit_view(
+            query,
+            message_text,
+            reply_markup=get_video_view_menu(v_id, addon_id),
+            parse_mode="HTML",
+            disable_web_page_preview=False
+        )
+
+
+async def handle_video_addition_start(query, context, args):
+    """Начало добавления видео"""
+    if args:
+        addon_id = args[0]
+        print(f"🎬 {query.from_user.id} начал добавление видео для аддона {addon_id}")
+
+        context.user_data['add_video'] = {
+            'addon_id': addon_id
+        }
+
+        await edit_view(
+            query,
+            "🎬 **Добавление полезного видео**\n\n"
+            "Отправьте ссылку на YouTube видео в чат:\n\n"
+            "Пример: https://www.youtube.com/watch?v=...\n\n"
+            "Я автоматически получу название видео с YouTube.",
+            reply_markup=get_add_video_menu(addon_id),
+            parse_mode="Markdown"
+        )
+
+        context.user_data['adding_video_url'] = True
+
+
+async def handle_video_like(query, args, user_id):
+    """Обработка лайка видео"""
+    video_id = args[0]
+    # Логируем лайк
+    await adb.log_video_action(video_id, user_id, "like")
+    success, message = await adb.rate_video(video_id, user_id, is_like=True)
+    await query.answer(message, show_alert=True)
+
+    if success:
+        await update_video_view(query, video_id)
+
+
+async def handle_video_dislike(query, args, user_id):
+    """Обработка дизлайка видео"""
+    video_id = args[0]
+    # Логируем дизлайк
+    await adb.log_video_action(video_id, user_id, "dislike")
+    success, message = await adb.rate_video(video_id, user_id, is_like=False)
+    await query.answer(message, show_alert=True)
+
+    if success:
+        await update_video_view(query, video_id)
+
+
+async def update_video_view(query, video_id):
+    """Обновление просмотра видео после оценки"""
+    video = await adb.get_video_by_id(video_id)
+    if video:
+        v_id, addon_id, user_id_video, youtube_url, title, description, likes, dislikes, views, verified, created_at = video
+        addon = get_addon(addon_id)
+        addon_name = addon['name'] if addon else "Неизвестный аддон"
+
+        safe_title = html.escape(title)
+        safe_description = html.escape(description) if description else "Нет описания"
+
+        message_text = f"🎬 <b>{safe_title}</b>\n\n"
+        message_text += f"🔗 <a href='{youtube_url}'>{youtube_url}</a>\n\n"
+        message_text += f"📝 {safe_description}\n\n"
+        message_text += f"👁️ {views} просмотров | 👍 {likes} | 👎 {dislikes}\n\n"
+        message_text += f"Для аддона: <b>{html.escape(addon_name)}</b>"
+
+        await edit_view(
+            query,
+            message_text,
+            reply_markup=get_video_view_menu(v_id, addon_id),
+            parse_mode="HTML",
+            disable_web_page_preview=False
+        )
+
+
+async def handle_note_view(query, args, context):
+    """Обработка просмотра заметки"""
+    note_id = args[0]
+    note = await adb.get_note(note_id)
+
+    if note:
+        message_id = note[4]
+        chat_id = note[5]
+        title = note[2]
+        hashtag = note[3]
+        user_id_note = note[1]
+        views = note[6] if len(note) > 6 else 0
+
+        print(f"📄 {query.from_user.id} открывает заметку {note_id}: '{title}'")
+
+        # Увеличиваем счетчик просмотров
+        await adb.increment_note_views(note_id)
+
+        try:
+            # Отправляем сообщение-указатель, которое будет ссылаться на оригинальную заметку
+            # Это заставит Telegram прокрутить ленту до нужного сообщения
+            await context.bot.send_message(
+                chat_id=query.from_user.id,
+                text=f"📄 **Заметка: {title}**\n\n"
+                     f"Нажмите на это сообщение, чтобы Telegram прокрутил ленту к заметке.\n"
+                     f"Хэштег: #{hashtag}",
+                reply_to_message_id=message_id,
+                parse_mode="Markdown"
+            )
+
+            # Редактируем сообщение с кнопками
+            await edit_view(
+                query,
+                f"✅ **Сообщение-указатель отправлено!**\n\n"
+                f"Telegram должен прокрутить ленту к заметке:\n"
+                f"📄 **{title}**\n"
+                f"🏷️ #{hashtag}\n"
+                f"👁️ Просмотров: {views + 1}",
+                parse_mode="Markdown"
+            )
+
+        except Exception as e:
+            print(f"❌ Ошибка при создании reply-сообщения: {e}")
+
+            # Если не удалось отправить reply, показываем информацию обычным способом
+            await edit_view(
+                query,
+                f"📄 **{title}**\n\n"
+                f"🏷️ **Хэштег:** #{hashtag}\n"
+                f"👤 **Автор:** {user_id_note}\n"
+                f"👁️ **Просмотров:** {views + 1}\n\n"
+                f"**Как найти заметку:**\n"
+                f"1. Вернитесь в наш личный чат\n"
+                f"2. Найдите сообщение с хэштегом: #{hashtag}\n"
+                f"3. Используйте поиск по хэштегу в чате",
+                parse_mode="Markdown"
+            )
+
+
+async def handle_notes_list(query, user_id, args=()):
+    """Обработка списка заметок (аргументы: ["p"|"n", курсор])"""
+    cursor, direction = None, 'next'
+    if len(args) >= 2:
+        direction = 'prev' if args[0] == 'p' else 'next'
+        try:
+            cursor = int(args[1])
+        except (TypeError, ValueError):
+            # Повреждённые данные кнопки - показываем первую страницу
+            print(f"⚠️ Некорректный курсор заметок: {args[1]!r}")
+            direction = 'next'
+    notes, prev_cursor, next_cursor = await adb.get_user_notes_page(user_id, cursor, direction)
+    if not notes and cursor is not None:
+        # Граничная заметка удалена - начинаем с первой страницы
+        notes, prev_cursor, next_cursor = await adb.get_user_notes_page(user_id)
+
+    if not notes:
+        await edit_view(
+            query,
+            "📭 **У вас нет заметок.**",
+            parse_mode="Markdown"
+        )
+    else:
+        await edit_view(
+            query,
+            "📒 **Ваши заметки:**",
+            reply_markup=get_notes_menu(notes, prev_cursor, next_cursor),
+            parse_mode="Markdown"
+        )
+
+
+async def handle_link_click(query, link_type, args, context):
+    """Обработка кликов по ссылкам GitHub и YouTube"""
+
+    if link_type == "github":
+        addon_id = args[0]
+        addon = get_addon(addon_id)
+        if addon and addon.get("github"):
+            # Логируем клик
+            await adb.log_link_click(query.from_user.id, "github", addon["github"], addon_id)
+            await query.answer(f"Открываю GitHub... (Кликов: {(await adb.get_addon_link_stats(addon_id, 30)).get('github', {}).get('recent_clicks', 0) + 1})", show_alert=False)
+            await context.bot.send_message(
+                chat_id=query.from_user.id,
+                text=f"🔗 **GitHub ссылка для {addon['name']}:**\n{addon['github']}"
+            )
+
+    elif link_type == "youtube":
+        addon_id = args[0]
+        addon = get_addon(addon_id)
+        if addon and addon.get("youtube"):
+            await adb.log_link_click(query.from_user.id, "youtube", addon["youtube"], addon_id)
+            await query.answer(f"Открываю YouTube... (Кликов: {(await adb.get_addon_link_stats(addon_id, 30)).get('youtube', {}).get('recent_clicks', 0) + 1})", show_alert=False)
+            await context.bot.send_message(
+                chat_id=query.from_user.id,
+                text=f"🎬 **YouTube ссылка для {addon['name']}:**\n{addon['youtube']}"
+            )
+
+
+# ==================== ТАБЛИЦА МАРШРУТОВ ====================
+# Обработчик маршрута вызывается как handler(query, context, route, args)
+
+router = CallbackRouter()
+
+router.add("main", lambda query, context, route, args: handle_main_menu(query, context))
+router.add("admin", lambda query, context, route, args: handle_admin_menu(query, query.from_user.id))
+router.add("cats", lambda query, context, route, args: edit_view(
+    query,
+    "📂 **Выберите категорию:**",
+    reply_markup=get_categories_menu(),
+    parse_mode="Markdown"
+))
+router.add("cat", lambda query, context, route, args: handle_category_selection(query, args))
+router.add("addon", lambda query, context, route, args: handle_addon_selection(query, args))
+router.add("videos", lambda query, context, route, args: handle_videos_list(query, args))
+router.add("view_video", lambda query, context, route, args: handle_video_view(query, args))
+router.add("add_video", lambda query, context, route, args: handle_video_addition_start(query, context, args))
+router.add("like_video", lambda query, context, route, args: handle_video_like(query, args, query.from_user.id))
+router.add("dislike_video", lambda query, context, route, args: handle_video_dislike(query, args, query.from_user.id))
+router.add("note", lambda query, context, route, args: handle_note_view(query, args, context))
+router.add("notes", lambda query, context, route, args: handle_notes_list(query, query.from_user.id, args))
+router.add("github", lambda query, context, route, args: handle_link_click(query, route, args, context))
+router.add("youtube", lambda query, context, route, args: handle_link_click(query, route, args, context))
+
+# Все отмены обрабатываются одной функцией
+router.add_prefix("cancel_", handle_cancel_actions)
+
+_ADMIN_ROUTES = {
+    "admin_addons": lambda query, context, route, args: handle_admin_addons(query),
+    "admin_stats": lambda query, context, route, args: handle_admin_stats(query, query.from_user.id),
+    "admin_routes": lambda query, context, route, args: handle_admin_routes(query, context),
+    "admin_routes_export": lambda query, context, route, args: handle_admin_routes_export(query, context),
+    "admin_backends": lambda query, context, route, args: handle_admin_backends(query),
+    "admin_backends_reload": lambda query, context, route, args: handle_admin_backends_reload(query),
+    "admin_add_category": lambda query, context, route, args: handle_admin_add_category(query, context),
+    "admin_add_addon": lambda query, context, route, args: handle_admin_add_addon_start(query),
+    "admin_addon_cat": lambda query, context, route, args: handle_admin_add_addon_category(query, context, args),
+    "admin_edit_addon": lambda query, context, route, args: handle_admin_edit_addon(query),
+    "admin_delete_addon": lambda query, context, route, args: handle_admin_delete_addon_start(query),
+    "admin_delete_addon_confirm": lambda query, context, route, args: handle_admin_delete_addon_confirm(query, args),
+    "admin_do_delete": lambda query, context, route, args: handle_admin_do_delete(query, args),
+    "admin_addon_stats": lambda query, context, route, args: handle_admin_addon_stats_start(query),
+    "admin_stats_cat": lambda query, context, route, args: handle_admin_addon_stats_category(query, args),
+    "admin_stats_addon": lambda query, context, route, args: handle_admin_addon_stats_view(query, args),
+}
+for _route, _handler in _ADMIN_ROUTES.items():
+    router.add(_route, admin_only(_handler))
@@ -0,0 +1,140 @@
+# file: handlers/router.py
+import time
+from bisect import bisect_left
+
+from config import CALLBACK_LATENCY_BUCKETS_MS
+
+
+class RouteStats:
+    """Счётчики одного маршрута: вызовы, ошибки и гистограмма времени обработки"""
+
+    __slots__ = ('calls', 'errors', 'total_s', 'max_s', 'buckets')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        # Последняя корзина - всё, что дольше верхней границы
+        self.buckets = [0] * (len(CALLBACK_LATENCY_BUCKETS_MS) + 1)
+
+    def record(self, elapsed_s, failed=False):
+        self.calls += 1
+        if failed:
+            self.errors += 1
+        self.total_s += elapsed_s
+        if elapsed_s > self.max_s:
+            self.max_s = elapsed_s
+        self.buckets[bisect_left(CALLBACK_LATENCY_BUCKETS_MS, elapsed_s * 1000)] += 1
+
+    def percentile_ms(self, share):
+        """Оценка перцентиля по гистограмме - верхняя граница нужной корзины"""
+        if not self.calls:
+            return 0.0
+        rank = share * self.calls
+        seen = 0
+        for bound, count in zip(CALLBACK_LATENCY_BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return float(bound)
+        return self.max_s * 1000
+
+    def export(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_ms": round(self.total_s * 1000 / self.calls, 2) if self.calls else 0.0,
+            "max_ms": round(self.max_s * 1000, 2),
+            "p50_ms": self.percentile_ms(0.5),
+            "p95_ms": self.percentile_ms(0.95),
+            "buckets_ms": dict(zip([*map(str, CALLBACK_LATENCY_BUCKETS_MS), "inf"], self.buckets)),
+        }
+
+
+class CallbackRouter:
+    """Таблица маршрутов inline кнопок.
+
+    Точные маршруты лежат в словаре (поиск за O(1)), маршруты по префиксу -
+    в префиксном дереве (поиск за O(длины маршрута), выбирается самый длинный
+    префикс). Обработчик вызывается как handler(query, context, route, args).
+    Для каждого маршрута считаются вызовы и время обработки.
+    """
+
+    _HANDLER = object()
+
+    def __init__(self):
+        self._exact = {}
+        self._trie = {}
+        self.stats = {}
+
+    def add(self, route, handler):
+        if route in self._exact:
+            raise ValueError(f"маршрут '{route}' уже зарегистрирован")
+        self._exact[route] = handler
+
+    def add_prefix(self, prefix, handler):
+        node = self._trie
+        for char in prefix:
+            node = node.setdefault(char, {})
+        if self._HANDLER in node:
+            raise ValueError(f"префикс '{prefix}' уже зарегистрирован")
+        node[self._HANDLER] = handler
+
+    def resolve(self, route):
+        """Обработчик маршрута или None"""
+        handler = self._exact.get(route)
+        if handler is not None:
+            return handler
+
+        node = self._trie
+        handler = node.get(self._HANDLER)
+        for char in route:
+            node = node.get(char)
+            if node is None:
+                break
+            handler = node.get(self._HANDLER, handler)
+        return handler
+
+    async def dispatch(self, query, context, route, args):
+        """Вызов обработчика с замером времени. False, если маршрут не найден"""
+        handler = self.resolve(route)
+        if handler is None:
+            return False
+
+        stats = self.stats.get(route)
+        if stats is None:
+            stats = self.stats[route] = RouteStats()
+
+        started = time.perf_counter()
+        failed = True
+        try:
+            await handler(query, context, route, args)
+            failed = False
+        finally:
+            stats.record(time.perf_counter() - started, failed)
+        return True
+
+    def export(self):
+        """Метрики всех маршрутов в виде словаря (для JSON)"""
+        return {route: stats.export() for route, stats in sorted(self.stats.items())}
+
+    def report(self, limit=15):
+        """Текстовый отчёт: самые затратные маршруты по суммарному времени"""
+        # Маршрут, который обрабатывается прямо сейчас, ещё без вызовов
+        done = [(route, stats) for route, stats in self.stats.items() if stats.calls]
+        if not done:
+            return "Кнопки ещё не нажимали."
+
+        lines = []
+        top = sorted(done, key=lambda item: item[1].total_s, reverse=True)[:limit]
+        for route, stats in top:
+            data = stats.export()
+            lines.append(
+                f"• `{route}`: {data['calls']} раз, ср. {data['avg_ms']} мс, "
+                f"p95 ≤ {data['p95_ms']:g} мс, макс. {data['max_ms']} мс"
+                + (f", ошибок: {data['errors']}" if data['errors'] else "")
+            )
+        return "\n".join(lines)
+
+    def reset(self):
+        self.stats.clear()
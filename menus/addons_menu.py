@@ -1,83 +1,136 @@
-# file: menus/addons_menu.py
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup
-from data.addons_data import get_categories, get_addons, get_addon
-
-def get_categories_menu():
-    keyboard = []
-    for category in get_categories():
-        keyboard.append([InlineKeyboardButton(category, callback_data=f"cat:{category}")])
-    # Убрали только "🏠 Главное меню", оставили все остальное
-    return InlineKeyboardMarkup(keyboard)
-
-def get_addons_menu(category):
-    keyboard = []
-    addons = get_addons(category)
-
-    for i, addon in enumerate(addons):
-        keyboard.append([InlineKeyboardButton(addon["name"], callback_data=f"add:{category}:{i}")])
-
-    keyboard.append([InlineKeyboardButton("🔙 К категориям", callback_data="cats")])
-    # Убрали только "🏠 Главное меню", кнопка назад осталась
-    return InlineKeyboardMarkup(keyboard)
-
-
-# В addons_menu.py
-# В addons_menu.py
-def get_addon_details_menu(category, index, has_videos=None):
-    addon = get_addon(category, index)
-
-    keyboard = []
-    if addon.get("github"):
-        keyboard.append([InlineKeyboardButton("🔗 GitHub", url=addon["github"])])
-    if addon.get("youtube"):
-        keyboard.append([InlineKeyboardButton("📺 YouTube (официальный)", url=addon["youtube"])])
-
-    keyboard.append([InlineKeyboardButton("🎬 Полезные видео", callback_data=f"videos:{category}:{index}")])
-    keyboard.append([InlineKeyboardButton("🎬 Добавить видео", callback_data=f"add_video:{category}:{index}")])
-    keyboard.append([InlineKeyboardButton("🔙 К аддонам", callback_data=f"cat:{category}")])
-
-    return InlineKeyboardMarkup(keyboard)
-
-    return InlineKeyboardMarkup(keyboard)
-def get_videos_list_menu(videos, category, index):
-    keyboard = []
-    for video in videos:
-        video_id = video[0]
-        title = video[3]
-        likes = video[5]
-        dislikes = video[6]
-
-        short_title = title[:25] + "..." if len(title) > 25 else title
-        likes_text = f" 👍{likes}" if likes > 0 else ""
-        dislikes_text = f" 👎{dislikes}" if dislikes > 0 else ""
-        button_text = f"{short_title}{likes_text}{dislikes_text}"
-
-        keyboard.append([
-            InlineKeyboardButton(button_text, callback_data=f"view_video:{video_id}")
-        ])
-
-    keyboard.append([
-        InlineKeyboardButton("➕ Добавить видео", callback_data=f"add_video:{category}:{index}")
-    ])
-    keyboard.append([
-        InlineKeyboardButton("🔙 Назад", callback_data=f"add:{category}:{index}")
-    ])
-    return InlineKeyboardMarkup(keyboard)  # Кнопка "Назад" осталась
-
-def get_video_view_menu(video_id, category, index):
-    keyboard = [
-        [
-            InlineKeyboardButton("👍", callback_data=f"like_video:{video_id}"),
-            InlineKeyboardButton("👎", callback_data=f"dislike_video:{video_id}")
-        ],
-        [
-            InlineKeyboardButton("🔙 К списку видео", callback_data=f"videos:{category}:{index}")
-        ]
-    ]
-    return InlineKeyboardMarkup(keyboard)  # Кнопка "Назад" осталась
-
-def get_add_video_menu(category, index):
-    keyboard = [
-        [InlineKeyboardButton("❌ Отмена", callback_data=f"cancel_add_video:{category}:{index}")]
-    ]
-    return InlineKeyboardMarkup(keyboard)
\ No newline at end of file
+# file: menus/addons_menu.py
+from functools import lru_cache
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from config import VIDEO_MENU_CACHE_SIZE
+from data.addons_data import get_snapshot
+from utils.callback_data import encode_callback
+
+# Клавиатуры каталога зависят только от снимка каталога, поэтому кэшируются
+# до смены его версии. InlineKeyboardMarkup неизменяем, его можно отдавать повторно.
+_keyboard_cache = {}
+_keyboard_cache_version = None
+
+
+def _cached_keyboard(snapshot, key, build, *args):
+    """Клавиатура из кэша или build(snapshot, *args); кэш сбрасывается при смене версии каталога"""
+    global _keyboard_cache, _keyboard_cache_version
+    if snapshot.version != _keyboard_cache_version:
+        _keyboard_cache, _keyboard_cache_version = {}, snapshot.version
+    markup = _keyboard_cache.get(key)
+    if markup is None:
+        markup = _keyboard_cache[key] = build(snapshot, *args)
+    return markup
+
+
+def _build_categories_menu(snapshot):
+    keyboard = []
+    for category in snapshot.categories:
+        keyboard.append([InlineKeyboardButton(
+            category, callback_data=encode_callback("cat", snapshot.category_ids[category])
+        )])
+    # Убрали только "🏠 Главное меню", оставили все остальное
+    return InlineKeyboardMarkup(keyboard)
+
+
+def get_categories_menu():
+    return _cached_keyboard(get_snapshot(), ("cats",), _build_categories_menu)
+
+
+def _build_addons_menu(snapshot, category):
+    keyboard = []
+    addons = snapshot.addons.get(category, ())
+
+    for addon in addons:
+        keyboard.append([InlineKeyboardButton(addon["name"], callback_data=encode_callback("addon", addon["id"]))])
+
+    keyboard.append([InlineKeyboardButton("🔙 К категориям", callback_data=encode_callback("cats"))])
+    # Убрали только "🏠 Главное меню", кнопка назад осталась
+    return InlineKeyboardMarkup(keyboard)
+
+
+def get_addons_menu(category):
+    return _cached_keyboard(get_snapshot(), ("cat", category), _build_addons_menu, category)
+
+
+# В addons_menu.py
+# В addons_menu.py
+def _build_addon_details_menu(snapshot, addon_id):
+    addon = snapshot.by_id.get(addon_id)
+    if addon is None:
+        # Аддон удалён или каталог перезагружен, пока готовился ответ
+        return InlineKeyboardMarkup([[InlineKeyboardButton("🔙 К категориям", callback_data=encode_callback("cats"))]])
+
+    keyboard = []
+    if addon.get("github"):
+        keyboard.append([InlineKeyboardButton("🔗 GitHub", url=addon["github"])])
+    if addon.get("youtube"):
+        keyboard.append([InlineKeyboardButton("📺 YouTube (официальный)", url=addon["youtube"])])
+
+    keyboard.append([InlineKeyboardButton("🎬 Полезные видео", callback_data=encode_callback("videos", addon_id))])
+    keyboard.append([InlineKeyboardButton("🎬 Добавить видео", callback_data=encode_callback("add_video", addon_id))])
+    category_id = snapshot.category_ids.get(addon["category"])
+    if category_id is not None:
+        keyboard.append([InlineKeyboardButton("🔙 К аддонам", callback_data=encode_callback("cat", category_id))])
+    else:
+        keyboard.append([InlineKeyboardButton("🔙 К категориям", callback_data=encode_callback("cats"))])
+
+    return InlineKeyboardMarkup(keyboard)
+
+
+def get_addon_details_menu(addon_id, has_videos=None):
+    return _cached_keyboard(get_snapshot(), ("addon", addon_id), _build_addon_details_menu, addon_id)
+
+    return InlineKeyboardMarkup(keyboard)
+def get_videos_list_menu(videos, addon_id, prev_cursor=None, next_cursor=None):
+    keyboard = []
+    for video in videos:
+        video_id = video[0]
+        title = video[3]
+        likes = video[5]
+        dislikes = video[6]
+
+        short_title = title[:25] + "..." if len(title) > 25 else title
+        likes_text = f" 👍{likes}" if likes > 0 else ""
+        dislikes_text = f" 👎{dislikes}" if dislikes > 0 else ""
+        button_text = f"{short_title}{likes_text}{dislikes_text}"
+
+        keyboard.append([
+            InlineKeyboardButton(button_text, callback_data=encode_callback("view_video", video_id))
+        ])
+
+    # Кнопки страниц несут курсор граничного видео
+    pages = []
+    if prev_cursor:
+        pages.append(InlineKeyboardButton("◀️", callback_data=encode_callback("videos", addon_id, "p", prev_cursor)))
+    if next_cursor:
+        pages.append(InlineKeyboardButton("▶️", callback_data=encode_callback("videos", addon_id, "n", next_cursor)))
+    if pages:
+        keyboard.append(pages)
+
+    keyboard.append([
+        InlineKeyboardButton("➕ Добавить видео", callback_data=encode_callback("add_video", addon_id))
+    ])
+    keyboard.append([
+        InlineKeyboardButton("🔙 Назад", callback_data=encode_callback("addon", addon_id))
+    ])
+    return InlineKeyboardMarkup(keyboard)  # Кнопка "Назад" осталась
+
+@lru_cache(maxsize=VIDEO_MENU_CACHE_SIZE)
+def get_video_view_menu(video_id, addon_id):
+    keyboard = [
+        [
+            InlineKeyboardButton("👍", callback_data=encode_callback("like_video", video_id)),
+            InlineKeyboardButton("👎", callback_data=encode_callback("dislike_video", video_id))
+        ],
+        [
+            InlineKeyboardButton("🔙 К списку видео", callback_data=encode_callback("videos", addon_id))
+        ]
+    ]
+    return InlineKeyboardMarkup(keyboard)  # Кнопка "Назад" осталась
+
+@lru_cache(maxsize=VIDEO_MENU_CACHE_SIZE)
+def get_add_video_menu(addon_id):
+    keyboard = [
+        [InlineKeyboardButton("❌ Отмена", callback_data=encode_callback("cancel_add_video", addon_id))]
+    ]
+    return InlineKeyboardMarkup(keyboard)
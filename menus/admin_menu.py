@@ -1,34 +1,37 @@
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup
-
-
-def get_admin_menu():
-    """Меню администратора"""
-    keyboard = [
-        [InlineKeyboardButton("📦 Управление аддонами", callback_data="admin_addons")],
-        [InlineKeyboardButton("📊 Статистика", callback_data="admin_stats")]
-        # Убрали только "🏠 Главное меню"
-    ]
-    return InlineKeyboardMarkup(keyboard)
-
-def get_addon_management_menu():
-    """Меню управления аддонами"""
-    keyboard = [
-        [InlineKeyboardButton("➕ Добавить аддон", callback_data="admin_add_addon")],
-        [InlineKeyboardButton("✏️ Редактировать аддон", callback_data="admin_edit_addon")],
-        [InlineKeyboardButton("🗑️ Удалить аддон", callback_data="admin_delete_addon")],
-        [InlineKeyboardButton("➕ Добавить категорию", callback_data="admin_add_category")],
-        [InlineKeyboardButton("🔙 Назад", callback_data="admin")]  # Кнопка назад в админ-меню
-    ]
-    return InlineKeyboardMarkup(keyboard)
-
-def get_addon_management_menu():
-    """Меню управления аддонами"""
-    keyboard = [
-        [InlineKeyboardButton("➕ Добавить аддон", callback_data="admin_add_addon")],
-        [InlineKeyboardButton("✏️ Редактировать аддон", callback_data="admin_edit_addon")],
-        [InlineKeyboardButton("🗑️ Удалить аддон", callback_data="admin_delete_addon")],
-        [InlineKeyboardButton("➕ Добавить категорию", callback_data="admin_add_category")],
-        [InlineKeyboardButton("📊 Статистика по аддону", callback_data="admin_addon_stats")],  # Новая кнопка
-        [InlineKeyboardButton("🔙 Назад", callback_data="admin")]
-    ]
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from utils.callback_data import encode_callback
+
+
+def get_admin_menu():
+    """Меню администратора"""
+    keyboard = [
+        [InlineKeyboardButton("📦 Управление аддонами", callback_data=encode_callback("admin_addons"))],
+        [InlineKeyboardButton("📊 Статистика", callback_data=encode_callback("admin_stats"))],
+        [InlineKeyboardButton("⏱️ Скорость кнопок", callback_data=encode_callback("admin_routes"))],
+        [InlineKeyboardButton("🩺 Источники видео", callback_data=encode_callback("admin_backends"))]
+        # Убрали только "🏠 Главное меню"
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
+def get_addon_management_menu():
+    """Меню управления аддонами"""
+    keyboard = [
+        [InlineKeyboardButton("➕ Добавить аддон", callback_data=encode_callback("admin_add_addon"))],
+        [InlineKeyboardButton("✏️ Редактировать аддон", callback_data=encode_callback("admin_edit_addon"))],
+        [InlineKeyboardButton("🗑️ Удалить аддон", callback_data=encode_callback("admin_delete_addon"))],
+        [InlineKeyboardButton("➕ Добавить категорию", callback_data=encode_callback("admin_add_category"))],
+        [InlineKeyboardButton("🔙 Назад", callback_data=encode_callback("admin"))]  # Кнопка назад в админ-меню
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
+def get_addon_management_menu():
+    """Меню управления аддонами"""
+    keyboard = [
+        [InlineKeyboardButton("➕ Добавить аддон", callback_data=encode_callback("admin_add_addon"))],
+        [InlineKeyboardButton("✏️ Редактировать аддон", callback_data=encode_callback("admin_edit_addon"))],
+        [InlineKeyboardButton("🗑️ Удалить аддон", callback_data=encode_callback("admin_delete_addon"))],
+        [InlineKeyboardButton("➕ Добавить категорию", callback_data=encode_callback("admin_add_category"))],
+        [InlineKeyboardButton("📊 Статистика по аддону", callback_data=encode_callback("admin_addon_stats"))],  # Новая кнопка
+        [InlineKeyboardButton("🔙 Назад", callback_data=encode_callback("admin"))]
+    ]
     return InlineKeyboardMarkup(keyboard)
\ No newline at end of file
@@ -1,22 +1,31 @@
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup
-
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup
-
-
-def get_notes_menu(notes):
-    """Список заметок - inline кнопки"""
-    keyboard = []
-    for note in notes:
-        note_id, title, hashtag, views, created_at = note
-        short_title = title[:20] + "..." if len(title) > 20 else title
-        button_text = f"📄 {short_title}"
-        if views and views > 0:
-            button_text += f" (👁️{views})"
-
-        keyboard.append([InlineKeyboardButton(
-            button_text,
-            callback_data=f"note:{note_id}"
-        )])
-
-    # Убрали только "🏠 Главное меню", но не добавляем других кнопок
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from utils.callback_data import encode_callback
+
+
+def get_notes_menu(notes, prev_cursor=None, next_cursor=None):
+    """Список заметок - inline кнопки (с кнопками страниц, если есть курсоры)"""
+    keyboard = []
+    for note in notes:
+        note_id, title, hashtag, views, created_at = note
+        short_title = title[:20] + "..." if len(title) > 20 else title
+        button_text = f"📄 {short_title}"
+        if views and views > 0:
+            button_text += f" (👁️{views})"
+
+        keyboard.append([InlineKeyboardButton(
+            button_text,
+            callback_data=encode_callback("note", note_id)
+        )])
+
+    pages = []
+    if prev_cursor:
+        pages.append(InlineKeyboardButton("◀️", callback_data=encode_callback("notes", "p", prev_cursor)))
+    if next_cursor:
+        pages.append(InlineKeyboardButton("▶️", callback_data=encode_callback("notes", "n", next_cursor)))
+    if pages:
+        keyboard.append(pages)
+
+    # Убрали только "🏠 Главное меню", но не добавляем других кнопок
     return InlineKeyboardMarkup(keyboard)
\ No newline at end of file
@@ -0,0 +1,295 @@
+# file: outbound_scheduler.py
+import asyncio
+import time
+from collections import OrderedDict
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from config import (
+    OUTBOUND_GLOBAL_RATE, OUTBOUND_GLOBAL_BURST, OUTBOUND_CHAT_RATE, OUTBOUND_CHAT_BURST,
+    OUTBOUND_GROUP_RATE, OUTBOUND_GROUP_BURST, OUTBOUND_MAX_RETRIES, OUTBOUND_CHAT_BUCKETS_MAX,
+    OUTBOUND_BULK_MAX_WAIT_S
+)
+
+INTERACTIVE = 'interactive'  # ответы на действия пользователя
+BULK = 'bulk'                # рассылки и файлы - уступают интерактивным
+
+# Методы, которые по умолчанию идут в медленную полосу
+BULK_ENDPOINTS = {'sendDocument', 'sendMediaGroup', 'copyMessages', 'forwardMessages'}
+# Правки сообщений: несколько ещё не отправленных правок одного сообщения схлопываются в последнюю
+EDIT_ENDPOINTS = {'editMessageText', 'editMessageReplyMarkup', 'editMessageCaption'}
+
+
+class TokenBucket:
+    """Ведро токенов: rate токенов в секунду, не больше capacity про запас"""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated', 'paused_until')
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def delay(self, now):
+        """Через сколько секунд появится токен (0 - уже есть)"""
+        if now < self.paused_until:
+            return self.paused_until - now
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def pause(self, until):
+        self.paused_until = max(self.paused_until, until)
+
+
+class _PendingEdit:
+    """Правка сообщения, ожидающая отправки"""
+
+    __slots__ = ('superseded_by', 'result')
+
+    def __init__(self):
+        self.superseded_by = None
+        self.result = asyncio.get_running_loop().create_future()
+
+
+class OutboundScheduler(BaseRateLimiter):
+    """Планировщик исходящих запросов к Telegram (подключается как rate_limiter бота).
+
+    Через него проходят все reply_text, edit_message_text, send_message и т.д.:
+    - общее ведро токенов и ведро на каждый чат (для групп - своё, более строгое);
+    - RetryAfter от Telegram приостанавливает чат (или всех) на указанное время,
+      запрос повторяется до max_retries раз, пользователь ошибку не видит;
+    - интерактивные запросы проходят раньше медленной полосы (файлы, рассылки),
+      но запрос медленной полосы уступает не дольше bulk_max_wait_s, а потом
+      получает каждый второй общий токен;
+    - если правка сообщения ещё ждёт очереди, а пришла новая правка того же
+      сообщения, отправляется только последняя; ожидавшие получают её результат.
+
+    Запросы без чата (getUpdates, answerCallbackQuery, ...) не ограничиваются.
+    """
+
+    def __init__(self, global_rate=OUTBOUND_GLOBAL_RATE, global_burst=OUTBOUND_GLOBAL_BURST,
+                 chat_rate=OUTBOUND_CHAT_RATE, chat_burst=OUTBOUND_CHAT_BURST,
+                 group_rate=OUTBOUND_GROUP_RATE, group_burst=OUTBOUND_GROUP_BURST,
+                 max_retries=OUTBOUND_MAX_RETRIES, max_chats=OUTBOUND_CHAT_BUCKETS_MAX,
+                 bulk_max_wait_s=OUTBOUND_BULK_MAX_WAIT_S):
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.chat_limits = (chat_rate, chat_burst)
+        self.group_limits = (group_rate, group_burst)
+        self.max_retries = max_retries
+        self.max_chats = max_chats
+        self.bulk_max_wait = bulk_max_wait_s
+        self._chats = OrderedDict()
+        self._edits = {}
+        self._interactive_waiting = 0
+        self._interactive_idle = None
+        # Запросы медленной полосы, которые уже уступали bulk_max_wait_s и ждут только общий токен
+        self._overdue_bulk = 0
+        self._bulk_turn = False
+
+        self.sent = 0
+        self.coalesced = 0
+        self.retries = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.wait_s = 0.0
+        self.max_wait_s = 0.0
+
+    async def initialize(self):
+        self._interactive_idle = asyncio.Event()
+        self._interactive_idle.set()
+
+    async def shutdown(self):
+        pass
+
+    def _chat_bucket(self, chat_id):
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # Отрицательные id - группы и каналы, строковые (@username) - каналы
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            bucket = self._chats[chat_id] = TokenBucket(*(self.group_limits if is_group else self.chat_limits))
+            if len(self._chats) > self.max_chats:
+                self._evict_chats(chat_id)
+        else:
+            self._chats.move_to_end(chat_id)
+        return bucket
+
+    def _evict_chats(self, keep):
+        """Вытеснение давно не писавших чатов; чаты на паузе после RetryAfter остаются"""
+        now = time.monotonic()
+        for chat_id in list(self._chats):
+            if len(self._chats) <= self.max_chats:
+                break
+            if chat_id != keep and self._chats[chat_id].paused_until <= now:
+                del self._chats[chat_id]
+
+    async def _acquire(self, lane, bucket, edit):
+        """Ожидание токенов. Возвращает False, если правку заменила более новая.
+
+        Запрос медленной полосы ждёт, пока есть интерактивные, но не дольше
+        bulk_max_wait_s. После этого, как только у его чата есть токен, он
+        считается просроченным: пока есть и просроченные, и интерактивные
+        запросы, общие токены достаются им по очереди.
+        """
+        yield_until = time.monotonic() + self.bulk_max_wait
+        overdue = False
+        try:
+            while True:
+                if edit is not None and edit.superseded_by is not None:
+                    return False
+                now = time.monotonic()
+                if lane == BULK and now < yield_until and not self._interactive_idle.is_set():
+                    try:
+                        await asyncio.wait_for(self._interactive_idle.wait(), yield_until - now)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                chat_delay = bucket.delay(now) if bucket is not None else 0.0
+                if lane == BULK and (now >= yield_until and chat_delay <= 0) != overdue:
+                    overdue = not overdue
+                    self._overdue_bulk += 1 if overdue else -1
+
+                delay = max(self.global_bucket.delay(now), chat_delay)
+                if lane == INTERACTIVE and self._overdue_bulk and self._bulk_turn:
+                    # Следующий общий токен достанется просроченной медленной полосе
+                    await asyncio.sleep(max(delay, 1 / self.global_bucket.rate))
+                    continue
+                if overdue and not self._bulk_turn and not self._interactive_idle.is_set():
+                    # А этот - интерактивному запросу
+                    await asyncio.sleep(max(delay, 1 / self.global_bucket.rate))
+                    continue
+                if delay <= 0:
+                    self.global_bucket.take()
+                    if bucket is not None:
+                        bucket.take()
+                    self._bulk_turn = lane == INTERACTIVE
+                    return True
+                await asyncio.sleep(delay)
+        finally:
+            if overdue:
+                self._overdue_bulk -= 1
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        chat_id = data.get('chat_id')
+        inline_id = data.get('inline_message_id')
+        if chat_id is None and inline_id is None:
+            return await callback(*args, **kwargs)
+
+        if self._interactive_idle is None:
+            await self.initialize()
+
+        with_args = rate_limit_args if isinstance(rate_limit_args, dict) else {}
+        lane = with_args.get('lane', BULK if endpoint in BULK_ENDPOINTS else INTERACTIVE)
+        max_retries = with_args.get('max_retries', self.max_retries)
+
+        if chat_id is not None:
+            try:
+                chat_id = int(chat_id)
+            except (TypeError, ValueError):
+                pass
+        bucket = self._chat_bucket(chat_id) if chat_id is not None else None
+
+        edit = None
+        edit_key = None
+        if endpoint in EDIT_ENDPOINTS:
+            edit_key = (endpoint, chat_id, data.get('message_id'), inline_id)
+            previous = self._edits.get(edit_key)
+            edit = self._edits[edit_key] = _PendingEdit()
+            if previous is not None:
+                previous.superseded_by = edit
+
+        try:
+            result = await self._send(callback, args, kwargs, lane, bucket, edit, edit_key, max_retries)
+        except BaseException as e:
+            if edit is not None and not edit.result.done():
+                if isinstance(e, asyncio.CancelledError):
+                    edit.result.cancel()
+                else:
+                    edit.result.set_exception(e)
+                    # Исключение получит вызывающий; пометим, что оно обработано
+                    edit.result.exception()
+            raise
+        finally:
+            if edit is not None and self._edits.get(edit_key) is edit:
+                # Правка завершилась, не дойдя до отправки (ошибка, отмена) - следующие не должны к ней цепляться
+                del self._edits[edit_key]
+        if edit is not None and not edit.result.done():
+            edit.result.set_result(result)
+        return result
+
+    async def _send(self, callback, args, kwargs, lane, bucket, edit, edit_key, max_retries):
+        started = time.monotonic()
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        if lane == INTERACTIVE:
+            self._interactive_waiting += 1
+            self._interactive_idle.clear()
+        try:
+            acquired = await self._acquire(lane, bucket, edit)
+        finally:
+            self.waiting -= 1
+            if lane == INTERACTIVE:
+                self._interactive_waiting -= 1
+                if self._interactive_waiting == 0:
+                    self._interactive_idle.set()
+
+        waited = time.monotonic() - started
+        self.wait_s += waited
+        self.max_wait_s = max(self.max_wait_s, waited)
+
+        if not acquired:
+            # Сообщение всё равно получит более новое содержимое
+            self.coalesced += 1
+            return await asyncio.shield(edit.superseded_by.result)
+
+        if edit is not None and self._edits.get(edit_key) is edit:
+            # Правка уходит в сеть - следующие правки отправятся отдельно
+            del self._edits[edit_key]
+
+        for attempt in range(max_retries + 1):
+            try:
+                result = await callback(*args, **kwargs)
+                self.sent += 1
+                return result
+            except RetryAfter as e:
+                if attempt == max_retries:
+                    print(f"❌ Telegram ограничил запросы, повторы исчерпаны: {e}")
+                    raise
+                self.retries += 1
+                retry_after = e.retry_after.total_seconds() if hasattr(e.retry_after, 'total_seconds') else e.retry_after
+                until = time.monotonic() + retry_after + 0.1
+                (bucket or self.global_bucket).pause(until)
+                print(f"⏳ Telegram просит подождать {retry_after} сек., повтор {attempt + 1}/{max_retries}")
+                # Повтор - новый запрос к API: ждёт конца паузы и свой токен
+                await self._acquire(lane, bucket, None)
+
+    def export(self):
+        done = self.sent + self.coalesced
+        return {
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "retries": self.retries,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "chats": len(self._chats),
+            "avg_wait_ms": round(self.wait_s * 1000 / done, 2) if done else 0.0,
+            "max_wait_ms": round(self.max_wait_s * 1000, 2),
+        }
+
+    def report(self):
+        data = self.export()
+        return (
+            f"отправлено {data['sent']}, схлопнуто правок {data['coalesced']}, повторов после RetryAfter "
+            f"{data['retries']}, ждут {data['waiting']} (макс. {data['max_waiting']}), "
+            f"ожидание ср. {data['avg_wait_ms']} мс, макс. {data['max_wait_ms']} мс"
+        )
+
+
+outbound_scheduler = OutboundScheduler()
@@ -0,0 +1,10 @@
+# file: tests/conftest.py
+import os
+import sys
+import tempfile
+
+# database.py создаёт глобальную базу при импорте - пусть она будет во временном каталоге,
+# а не в рабочем каталоге того, кто запускает тесты
+_tmp = tempfile.TemporaryDirectory(prefix="bab-tests-")
+os.environ["DB_FILE"] = os.path.join(_tmp.name, "blender_addon_bot.db")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,104 @@
+# file: tests/test_callback_data.py
+import base64
+
+import pytest
+
+from utils import callback_data
+from utils.callback_data import (
+    CALLBACK_DATA_LIMIT, PACKED_PREFIX, TOKEN_PREFIX, CallbackRegistry,
+    decode_callback, encode_callback, pack, unpack,
+)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Свой реестр на каждый тест, чтобы токены не пересекались"""
+    registry = CallbackRegistry(ttl_s=60, max_items=3)
+    monkeypatch.setattr(callback_data, "registry", registry)
+    return registry
+
+
+@pytest.mark.parametrize("value", [
+    0, 1, -1, 63, -64, 64, -65, 127, 128, -128,
+    2 ** 31, -2 ** 31, 2 ** 62, 2 ** 63 - 1, -2 ** 63,
+    2 ** 63, -2 ** 63 - 1, 2 ** 64, -2 ** 70, 10 ** 30,
+])
+def test_int_round_trip(value):
+    assert unpack(pack("addon", value)) == ("addon", [value])
+
+
+def test_mixed_args_round_trip():
+    args = [0, -5, "Меню", "", 2 ** 40, "a" * 200, -1]
+    assert unpack(pack("cat", *args)) == ("cat", args)
+
+
+def test_small_ints_stay_short():
+    # Маршрут и по одному байту на -32..31 (ещё один бит - признак числа)
+    assert len(pack("addon", 0)) == 2
+    assert len(pack("addon", -32)) == 2
+    assert len(pack("addon", 31)) == 2
+    assert len(pack("addon", 32)) == 3
+
+
+def test_short_data_is_packed_inline(registry):
+    data = encode_callback("addon", 42, "cat")
+    assert data.startswith(PACKED_PREFIX)
+    assert len(data.encode("utf-8")) <= CALLBACK_DATA_LIMIT
+    assert len(registry) == 0
+    assert decode_callback(data) == ("addon", [42, "cat"])
+
+
+def test_long_data_falls_back_to_token(registry):
+    name = "Очень длинное название аддона " * 3
+    data = encode_callback("admin_edit_addon", name, -7)
+    assert data.startswith(TOKEN_PREFIX)
+    assert len(data.encode("utf-8")) <= CALLBACK_DATA_LIMIT
+    assert len(registry) == 1
+    assert decode_callback(data) == ("admin_edit_addon", [name, -7])
+
+
+def test_limit_boundary(registry):
+    # Подбираем строку, при которой закодированные данные ровно в лимите
+    for size in range(1, CALLBACK_DATA_LIMIT):
+        data = encode_callback("note", "x" * size)
+        if data.startswith(TOKEN_PREFIX):
+            break
+        assert len(data) <= CALLBACK_DATA_LIMIT
+        last_inline = data
+    assert len(last_inline) > CALLBACK_DATA_LIMIT - 4
+    assert decode_callback(data) == ("note", ["x" * size])
+
+
+def test_expired_token_is_stale(registry, monkeypatch):
+    data = encode_callback("note", "x" * 100)
+    now = callback_data.time.monotonic()
+    monkeypatch.setattr(callback_data.time, "monotonic", lambda: now + 61)
+    assert decode_callback(data) is None
+    # Просроченная запись удалена из реестра
+    assert len(registry) == 0
+
+
+def test_evicted_token_is_stale(registry):
+    first = encode_callback("note", "a" * 100)
+    others = [encode_callback("note", str(i) * 100) for i in range(3)]
+    assert len(registry) == 3
+    assert decode_callback(first) is None
+    for i, data in enumerate(others):
+        assert decode_callback(data) == ("note", [str(i) * 100])
+
+
+@pytest.mark.parametrize("data", [
+    TOKEN_PREFIX + "no-such-token",
+    TOKEN_PREFIX,
+    PACKED_PREFIX,
+    PACKED_PREFIX + "!!!",
+    "addon_5",
+    "",
+    # Неизвестный номер маршрута
+    PACKED_PREFIX + base64.urlsafe_b64encode(bytes([0x7F])).rstrip(b"=").decode(),
+    # Обрезанный varint и обрезанная строка
+    PACKED_PREFIX + base64.urlsafe_b64encode(bytes([5, 0x80])).rstrip(b"=").decode(),
+    PACKED_PREFIX + base64.urlsafe_b64encode(bytes([5, 0x09, 0xFF])).rstrip(b"=").decode(),
+])
+def test_malformed_data_is_stale(registry, data):
+    assert decode_callback(data) is None
@@ -0,0 +1,35 @@
+# file: tests/test_catalog_import.py
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code, cwd, db_file):
+    env = dict(os.environ, DB_FILE=str(db_file))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, check=True, capture_output=True)
+
+
+def test_import_does_not_touch_catalog_file(tmp_path):
+    # ADDONS_FILE задан относительно рабочей папки: ../addons_data.json
+    workdir = tmp_path / "work" / "bot"
+    workdir.mkdir(parents=True)
+    addons_file = tmp_path / "work" / "addons_data.json"
+    # init_catalog() перенёс бы его в пустую базу и переписал с id аддонов и ревизией
+    content = json.dumps({"_revision": 999, "Моделинг": [{"name": "Старый аддон"}]}, ensure_ascii=False)
+    addons_file.write_text(content, encoding="utf-8")
+    db_file = tmp_path / "bot.db"
+
+    run_python("import data.addons_data", workdir, db_file)
+    assert addons_file.read_text(encoding="utf-8") == content
+    assert sorted(os.listdir(tmp_path / "work")) == ["addons_data.json", "bot"]
+    assert os.listdir(workdir) == []
+
+    run_python("import data.addons_data as c; c.init_catalog(); c.close_data()", workdir, db_file)
+    data = json.loads(addons_file.read_text(encoding="utf-8"))
+    assert data["_revision"] != 999
+    assert [addon["name"] for addon in data["Моделинг"]] == ["Старый аддон"]
+    assert "id" in data["Моделинг"][0]
@@ -0,0 +1,63 @@
+# file: tests/test_notes_pages.py
+import asyncio
+
+import pytest
+
+pytest.importorskip("telegram")
+
+from database import Database, AsyncDatabase
+from handlers import callback
+
+USER_ID = 100
+
+
+@pytest.fixture
+def views(tmp_path, monkeypatch):
+    """Своя база для обработчика; вместо отправки в Telegram запоминаем экраны"""
+    database = Database(str(tmp_path / "notes.db"))
+    async_db = AsyncDatabase(database)
+    shown = []
+
+    async def edit_view(query, text, reply_markup=None, **kwargs):
+        shown.append((text, reply_markup))
+
+    monkeypatch.setattr(callback, "adb", async_db)
+    monkeypatch.setattr(callback, "edit_view", edit_view)
+    for i in range(25):
+        database.save_note(USER_ID, f"Заметка {i}", 1000 + i, USER_ID)
+    yield database, shown
+    async_db.shutdown()
+    database.close()
+
+
+def note_buttons(markup):
+    return [row[0].text for row in markup.inline_keyboard if row[0].text.startswith("📄")]
+
+
+def test_deleted_cursor_falls_back_to_first_page(views):
+    database, shown = views
+    _, _, next_cursor = database.get_user_notes_page(USER_ID)
+    assert next_cursor is not None
+
+    conn = database.pool.writer()
+    try:
+        conn.execute("DELETE FROM notes WHERE id = ?", (int(next_cursor),))
+        conn.commit()
+    finally:
+        conn.close()
+
+    asyncio.run(callback.handle_notes_list(None, USER_ID, ["n", next_cursor]))
+    text, markup = shown[-1]
+    assert "Ваши заметки" in text
+    buttons = note_buttons(markup)
+    assert len(buttons) == 20
+    assert buttons[0] == "📄 Заметка 24"
+
+
+@pytest.mark.parametrize("args", [["n", "abc"], ["p", ""], ["n", None], ["n"], []])
+def test_malformed_args_show_first_page(views, args):
+    database, shown = views
+    asyncio.run(callback.handle_notes_list(None, USER_ID, args))
+    text, markup = shown[-1]
+    assert "Ваши заметки" in text
+    assert len(note_buttons(markup)) == 20
@@ -0,0 +1,112 @@
+# file: tests/test_notes_search.py
+import pytest
+
+from database import Database
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = Database(str(tmp_path / "notes.db"))
+    yield database
+    database.close()
+
+
+def titles(notes):
+    return sorted(note[1] for note in notes)
+
+
+def execute(database, sql, params=()):
+    conn = database.pool.writer()
+    try:
+        conn.execute(sql, params)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def notes(database):
+    saved = {}
+    for user_id, title in (
+        (1, 'Geometry Nodes: scatter'),
+        (1, 'Рендер в Cycles'),
+        (1, 'Hard-surface моделирование'),
+        (1, 'Blender OR Maya'),
+        (1, 'Кривые "Bezier" и *модификаторы*'),
+        (2, 'Geometry Nodes: чужая заметка'),
+        (11, 'Geometry Nodes: тоже чужая'),
+    ):
+        saved[title] = database.save_note(user_id, title, 1, user_id)
+    return saved
+
+
+def test_words_and_prefixes(database, notes):
+    assert titles(database.search_notes(1, 'geometry')) == ['Geometry Nodes: scatter']
+    assert titles(database.search_notes(1, 'geo nod')) == ['Geometry Nodes: scatter']
+    assert titles(database.search_notes(1, 'рендер')) == ['Рендер в Cycles']
+    assert database.search_notes(1, 'geometry cycles') == []
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('"scatter', ['Geometry Nodes: scatter']),
+    ('"Bezier"', ['Кривые "Bezier" и *модификаторы*']),
+    ('hard-surface', ['Hard-surface моделирование']),
+    ('-surface', ['Hard-surface моделирование']),
+    ('модиф*', ['Кривые "Bezier" и *модификаторы*']),
+    ('*', []),
+    ('nodes:', ['Geometry Nodes: scatter']),
+    ('title:cycles', []),
+    ('user_id:2', []),
+    ('blender OR maya', ['Blender OR Maya']),
+    ('cycles OR scatter', []),
+    ('NEAR(geometry scatter)', []),
+    ('^geometry', ['Geometry Nodes: scatter']),
+    ('', []),
+    ('   ', []),
+])
+def test_fts_syntax_in_query_is_plain_text(database, notes, capsys, query, expected):
+    # Синтаксис FTS5 в запросе - обычные слова: никаких ошибок и чужих заметок.
+    # search_notes прячет ошибки SQLite за пустым списком, поэтому проверяем и вывод
+    capsys.readouterr()
+    assert titles(database.search_notes(1, query)) == expected
+    assert "❌" not in capsys.readouterr().out
+
+
+def test_other_users_notes_never_match(database, notes):
+    for query in ('geometry', 'nodes', 'чужая', '1', '2', '11'):
+        found = database.search_notes(1, query)
+        assert all(not title.endswith('чужая') for title in titles(found)), query
+    assert titles(database.search_notes(2, 'geometry')) == ['Geometry Nodes: чужая заметка']
+    assert database.search_notes(3, 'geometry') == []
+
+    other_hashtag = notes['Geometry Nodes: чужая заметка'][1]
+    assert database.search_notes(1, f'#{other_hashtag}') == []
+    assert database.search_notes(1, other_hashtag) == []
+
+
+def test_hashtag_only_queries(database, notes):
+    note_id, hashtag = notes['Рендер в Cycles']
+    for query in (f'#{hashtag}', hashtag, f'  #{hashtag}  ', f'#{hashtag[:6]}'):
+        found = database.search_notes(1, query)
+        assert [note[0] for note in found] == [note_id], query
+    assert database.search_notes(1, '#') == []
+    assert database.search_notes(1, '#tagffffffff') == []
+
+
+def test_index_follows_note_updates_and_deletes(database, notes):
+    note_id, _ = notes['Рендер в Cycles']
+    execute(database, 'UPDATE notes SET title = ? WHERE id = ?', ('Рендер в Eevee', note_id))
+    assert database.search_notes(1, 'cycles') == []
+    assert [note[0] for note in database.search_notes(1, 'eevee')] == [note_id]
+
+    execute(database, 'UPDATE notes SET user_id = ? WHERE id = ?', (2, note_id))
+    assert database.search_notes(1, 'eevee') == []
+    assert [note[0] for note in database.search_notes(2, 'eevee')] == [note_id]
+
+    execute(database, 'DELETE FROM notes WHERE id = ?', (note_id,))
+    assert database.search_notes(2, 'eevee') == []
+    assert database.search_notes(2, 'рендер') == []
+
+    database.rebuild_notes_index()
+    assert titles(database.search_notes(1, 'geometry')) == ['Geometry Nodes: scatter']
+    assert database.search_notes(2, 'eevee') == []
@@ -0,0 +1,82 @@
+# file: tests/test_outbound_scheduler.py
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("telegram")
+
+from telegram.error import BadRequest
+
+from outbound_scheduler import OutboundScheduler, TokenBucket, BULK, INTERACTIVE
+
+
+def edit_data(message_id=1):
+    return {'chat_id': 10, 'message_id': message_id}
+
+
+def test_failed_edit_does_not_leave_pending_record():
+    async def run():
+        scheduler = OutboundScheduler()
+
+        async def fail():
+            raise BadRequest("message to edit not found")
+
+        with pytest.raises(BadRequest):
+            await scheduler.process_request(fail, (), {}, 'editMessageText', edit_data(), None)
+        assert scheduler._edits == {}
+
+        # Отмена во время ожидания токена тоже не оставляет запись
+        scheduler._chat_bucket(10).tokens = 0
+        task = asyncio.ensure_future(
+            scheduler.process_request(fail, (), {}, 'editMessageText', edit_data(), None)
+        )
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert scheduler._edits == {}
+
+    asyncio.run(run())
+
+
+def test_bulk_is_not_starved_by_interactive_traffic():
+    async def run():
+        # Общий лимит занят интерактивными запросами целиком: кто-то из них всегда ждёт токен
+        scheduler = OutboundScheduler(global_rate=200, global_burst=1, chat_rate=1000, chat_burst=1000,
+                                      bulk_max_wait_s=0.05)
+        await scheduler.initialize()
+        stop = asyncio.Event()
+
+        async def send():
+            return True
+
+        async def interactive_flood():
+            while not stop.is_set():
+                await scheduler.process_request(send, (), {}, 'sendMessage', {'chat_id': 1},
+                                                {'lane': INTERACTIVE})
+
+        flood = [asyncio.ensure_future(interactive_flood()) for _ in range(8)]
+        await asyncio.sleep(0.01)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(
+                scheduler.process_request(send, (), {}, 'sendDocument', {'chat_id': 2}, {'lane': BULK}), 1
+            )
+        finally:
+            stop.set()
+            await asyncio.gather(*flood)
+        assert time.monotonic() - started < 0.5
+
+    asyncio.run(run())
+
+
+def test_paused_chat_bucket_is_not_evicted():
+    scheduler = OutboundScheduler(max_chats=2)
+    paused = scheduler._chat_bucket(1)
+    paused.pause(time.monotonic() + 60)
+    for chat_id in range(2, 10):
+        scheduler._chat_bucket(chat_id)
+    assert scheduler._chats.get(1) is paused
+    assert len(scheduler._chats) == 2
+    assert isinstance(scheduler._chats[9], TokenBucket)
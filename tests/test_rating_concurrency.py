@@ -0,0 +1,74 @@
+# file: tests/test_rating_concurrency.py
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from database import Database
+
+USERS = 200
+VOTES_PER_USER = 20
+THREADS = 16
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = Database(str(tmp_path / "ratings.db"))
+    yield database
+    database.close()
+
+
+def test_concurrent_votes_are_neither_lost_nor_duplicated(database):
+    """Много пользователей одновременно голосуют за одно видео.
+
+    Каждый пользователь голосует последовательно, поэтому его итоговая
+    оценка известна заранее: в таблице оценок должна остаться ровно одна
+    строка на пользователя с последним голосом, а счётчики видео -
+    совпадать с этими строками.
+    """
+    ok, video_id = database.add_video(1, 1, 'https://youtu.be/00000000000', 'Hot video')
+    assert ok
+
+    def voter(user_id):
+        rnd = random.Random(user_id)
+        last = None
+        for i in range(VOTES_PER_USER):
+            if i % 5 == 4:
+                votes = [(video_id, user_id, rnd.random() < 0.5) for _ in range(3)]
+                assert database.rate_videos(votes) == len(votes)
+                last = votes[-1][2]
+            else:
+                last = rnd.random() < 0.7
+                assert database.rate_video(video_id, user_id, last)[0]
+        return user_id, last
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        expected = dict(pool.map(voter, range(USERS)))
+
+    conn = database.pool.reader()
+    try:
+        rows = conn.execute(
+            'SELECT user_id, is_like FROM video_likes WHERE video_id = ?', (video_id,)
+        ).fetchall()
+        likes, dislikes = conn.execute(
+            'SELECT likes, dislikes FROM addon_videos WHERE id = ?', (video_id,)
+        ).fetchone()
+    finally:
+        conn.close()
+
+    assert len(rows) == USERS, "оценка пользователя записана несколько раз или потеряна"
+    assert {user_id: bool(is_like) for user_id, is_like in rows} == expected
+    expected_likes = sum(expected.values())
+    assert (likes, dislikes) == (expected_likes, USERS - expected_likes)
+
+
+def test_rating_unknown_video_changes_nothing(database):
+    ok, _ = database.rate_video(12345, 1, True)
+    assert not ok
+    assert database.rate_videos([(12345, 1, True), (12345, 2, False)]) == 0
+
+    conn = database.pool.reader()
+    try:
+        assert conn.execute('SELECT COUNT(*) FROM video_likes').fetchone()[0] == 0
+    finally:
+        conn.close()
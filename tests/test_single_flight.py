@@ -0,0 +1,109 @@
+# file: tests/test_single_flight.py
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from utils.youtube import SingleFlight
+
+
+class Backend:
+    """Функция для SingleFlight: считает запуски, ждёт разрешения и запоминает отмену"""
+
+    def __init__(self):
+        self.calls = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+
+    async def fetch(self, value):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return value * 2
+
+
+def test_concurrent_callers_run_once():
+    async def run():
+        flight, backend = SingleFlight(), Backend()
+        callers = [asyncio.create_task(flight.do("key", backend.fetch, 21)) for _ in range(10)]
+        await asyncio.sleep(0)
+        assert flight.in_flight() == 1
+        backend.release.set()
+        results = await asyncio.gather(*callers)
+        assert results == [42] * 10
+        assert backend.calls == 1
+        assert flight.started == 1 and flight.coalesced == 9
+        assert flight.in_flight() == 0
+
+        # После завершения тот же ключ запускается заново
+        assert await flight.do("key", backend.fetch, 1) == 2
+        assert backend.calls == 2
+
+    asyncio.run(run())
+
+
+def test_errors_reach_every_caller():
+    async def run():
+        flight = SingleFlight()
+        started = asyncio.Event()
+
+        async def fail():
+            started.set()
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        callers = [asyncio.create_task(flight.do("key", fail)) for _ in range(3)]
+        await started.wait()
+        results = await asyncio.gather(*callers, return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert flight.in_flight() == 0
+
+    asyncio.run(run())
+
+
+def test_cancelling_one_caller_keeps_others():
+    async def run():
+        flight, backend = SingleFlight(), Backend()
+        callers = [asyncio.create_task(flight.do("key", backend.fetch, 5)) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        callers[0].cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await callers[0]
+        assert not backend.cancelled
+        assert flight.in_flight() == 1
+
+        backend.release.set()
+        assert await asyncio.gather(*callers[1:]) == [10, 10]
+        assert backend.calls == 1
+        assert not backend.cancelled
+
+    asyncio.run(run())
+
+
+def test_last_waiter_cancel_cancels_task():
+    async def run():
+        flight, backend = SingleFlight(), Backend()
+        callers = [asyncio.create_task(flight.do("key", backend.fetch, 5)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        for caller in callers:
+            caller.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await caller
+        # Отмена доходит до задачи на следующем шаге цикла
+        await asyncio.sleep(0)
+        assert backend.cancelled
+        assert flight.in_flight() == 0
+
+        # Новый вызов не подхватывает отменённую задачу, а запускает свою
+        backend.release.set()
+        assert await flight.do("key", backend.fetch, 3) == 6
+        assert backend.calls == 2
+        assert flight.started == 2
+
+    asyncio.run(run())
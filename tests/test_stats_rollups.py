@@ -0,0 +1,83 @@
+# file: tests/test_stats_rollups.py
+import pytest
+
+from config import STATS_HOURLY_RETENTION_DAYS, STATS_DAILY_RETENTION_DAYS
+from database import Database
+
+# (пользователь, действие, возраст события в днях): пользователи 1 и 2 действуют
+# в нескольких интервалах, чтобы уникальные нельзя было получить сложением
+EVENTS = [
+    (1, 'view', 0.1), (2, 'view', 0.2), (1, 'view', 0.3),
+    (1, 'view', 3), (2, 'view', 3), (3, 'view', 3.5), (1, 'like', 3),
+    (1, 'view', 5), (2, 'view', 10), (2, 'view', 10.5),
+    (4, 'view', 40), (1, 'view', 40), (1, 'like', 40),
+    (5, 'view', 100), (1, 'view', 100),
+    (6, 'view', 200), (2, 'view', 200),
+    (7, 'view', 400), (1, 'view', 400),
+]
+WINDOWS = (1, 7, 30, 60, 120, STATS_DAILY_RETENTION_DAYS)
+
+
+def expected_stats(days):
+    stats = {}
+    for user_id, action, age in EVENTS:
+        if age < days:
+            entry = stats.setdefault(action, {'count': 0, 'users': set()})
+            entry['count'] += 1
+            entry['users'].add(user_id)
+    return {action: {'count': e['count'], 'unique_users': len(e['users'])} for action, e in stats.items()}
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = Database(str(tmp_path / "stats.db"))
+    yield database
+    database.close()
+
+
+def count_rows(database, table, where='', params=()):
+    conn = database.pool.reader()
+    try:
+        return conn.execute(f'SELECT COUNT(*) FROM {table} {where}', params).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_compaction_keeps_windowed_stats_and_bounds_rollups(database):
+    ok, video_id = database.add_video(1, 1, 'https://youtu.be/00000000000', 'Video')
+    assert ok
+    conn = database.pool.writer()
+    conn.executemany(
+        "INSERT INTO video_stats (video_id, user_id, action, created_at) "
+        "VALUES (?, ?, ?, datetime('now', ?))",
+        [(video_id, user_id, action, f'-{age * 24} hours') for user_id, action, age in EVENTS]
+    )
+    conn.commit()
+    conn.close()
+
+    assert database.compact_stats() == sum(1 for _, _, age in EVENTS if age >= 3)
+    rows = {
+        table: count_rows(database, table)
+        for table in ('video_stats', 'video_stats_hourly', 'video_stats_hourly_users',
+                      'video_stats_daily', 'video_stats_daily_users')
+    }
+
+    # Повторная свёртка ничего не добавляет и не удаляет
+    assert database.compact_stats() == 0
+    for table, count in rows.items():
+        assert count_rows(database, table) == count, table
+
+    assert rows['video_stats'] == 3
+    assert count_rows(database, 'video_stats_hourly', "WHERE bucket < date('now', ?)",
+                      (f'-{STATS_HOURLY_RETENTION_DAYS} days',)) == 0
+    assert count_rows(database, 'video_stats_hourly_users', "WHERE bucket < date('now', ?)",
+                      (f'-{STATS_HOURLY_RETENTION_DAYS} days',)) == 0
+    assert count_rows(database, 'video_stats_daily_users', "WHERE bucket < date('now', ?)",
+                      (f'-{STATS_DAILY_RETENTION_DAYS} days',)) == 0
+    # Посуточные счётчики хранятся и за пределами окна уникальных
+    assert count_rows(database, 'video_stats_daily', "WHERE bucket < date('now', ?)",
+                      (f'-{STATS_DAILY_RETENTION_DAYS} days',)) == 1
+
+    for days in WINDOWS:
+        assert database.get_video_stats(video_id, days) == {video_id: expected_stats(days)}, days
+        assert database.get_addon_video_stats(1, days)['recent_actions'] == expected_stats(days), days
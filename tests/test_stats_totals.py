@@ -0,0 +1,85 @@
+# file: tests/test_stats_totals.py
+import pytest
+
+from database import Database
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = Database(str(tmp_path / "totals.db"))
+    yield database
+    database.close()
+
+
+def aggregate_stats(database):
+    """get_overall_stats так, как он считался до итогов на триггерах: полными проходами по таблицам"""
+    conn = database.pool.reader()
+    try:
+        notes = conn.execute('SELECT COUNT(*), SUM(views) FROM notes').fetchone()
+        videos = conn.execute('SELECT COUNT(*), SUM(views), SUM(likes), SUM(dislikes) FROM addon_videos').fetchone()
+        addons = conn.execute('SELECT COUNT(*), SUM(views) FROM addon_stats').fetchone()
+        users = [
+            conn.execute(f'SELECT COUNT(DISTINCT user_id) FROM {table}').fetchone()[0] or 0
+            for table in ('notes', 'addon_videos', 'video_likes')
+        ]
+    finally:
+        conn.close()
+    return {
+        'notes': {'total': notes[0] or 0, 'total_views': notes[1] or 0},
+        'videos': {
+            'total': videos[0] or 0, 'total_views': videos[1] or 0,
+            'total_likes': videos[2] or 0, 'total_dislikes': videos[3] or 0
+        },
+        'addons': {'total': addons[0] or 0, 'total_views': addons[1] or 0},
+        'users': {'notes': users[0], 'videos': users[1], 'likes': users[2]},
+    }
+
+
+def execute(database, sql, params=()):
+    conn = database.pool.writer()
+    try:
+        conn.execute(sql, params)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def assert_totals_exact(database):
+    database.buffer.flush()
+    expected = aggregate_stats(database)
+    assert database.get_overall_stats() == expected
+    return expected
+
+
+def test_trigger_totals_match_aggregates_and_rebuild(database):
+    assert_totals_exact(database)
+
+    notes = [database.save_note(user_id, f"Заметка {i}", i, user_id)[0] for i, user_id in enumerate((1, 1, 2, 3))]
+    for note_id in notes:
+        for _ in range(note_id):
+            database.increment_note_views(note_id)
+    videos = [database.add_video(1, user_id, f'https://youtu.be/{i:011d}', f'Video {i}')[1]
+              for i, user_id in enumerate((1, 2, 2))]
+    for addon_id in (1, 1, 2):
+        database.increment_addon_views(addon_id)
+    assert_totals_exact(database)
+
+    # Оценки: новые, смена оценки, повтор той же оценки, пакет
+    for user_id in range(1, 6):
+        database.rate_video(videos[0], user_id, user_id % 2 == 0)
+    database.rate_video(videos[0], 1, True)
+    database.rate_video(videos[0], 2, True)
+    database.rate_video(videos[1], 4, False)
+    database.rate_videos([(videos[1], 6, True), (videos[2], 6, False), (videos[2], 6, True)])
+    execute(database, 'UPDATE addon_videos SET views = views + 5 WHERE id = ?', (videos[2],))
+    assert_totals_exact(database)
+
+    # Удаления: единственная заметка пользователя 3, видео с оценками, оценка единственного видео пользователя 4
+    execute(database, 'DELETE FROM notes WHERE id = ?', (notes[3],))
+    assert database.delete_video(videos[0], 1)
+    execute(database, 'DELETE FROM video_likes WHERE video_id = ? AND user_id = ?', (videos[1], 4))
+    expected = assert_totals_exact(database)
+    assert expected['users'] == {'notes': 2, 'videos': 1, 'likes': 1}
+
+    assert database.rebuild_stats_totals()
+    assert database.get_overall_stats() == expected
@@ -0,0 +1,109 @@
+# file: tests/test_write_buffer_reads.py
+import itertools
+import sys
+import threading
+
+import pytest
+
+from database import Database
+
+WRITERS = 4
+INCREMENTS = 1500
+READERS = 3
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = Database(str(tmp_path / "buffer.db"))
+    # Частое переключение потоков, чтобы чтения попадали между шагами записи буфера
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    yield database
+    sys.setswitchinterval(interval)
+    database.close()
+
+
+def hammer(database, failing_every=None):
+    """Инкременты, записи буфера и чтения одновременно.
+
+    Каждое чтение должно лежать между числом инкрементов, завершённых до
+    его начала, и числом начатых к его концу: меньше - просмотры потеряны,
+    больше - учтены дважды (в базе и ещё раз как неотправленные).
+    """
+    note_id, _ = database.save_note(1, "Заметка", 1, 1)
+    addon_id = 7
+
+    flush_func = database.buffer._flush_func
+    if failing_every:
+        # Каждая n-я запись падает до записи в базу - данные возвращаются в буфер (_restore)
+        calls = itertools.count(1)
+
+        def flaky_flush(counters, events):
+            if next(calls) % failing_every == 0:
+                raise RuntimeError("запись не удалась")
+            flush_func(counters, events)
+
+        database.buffer._flush_func = flaky_flush
+
+    lock = threading.Lock()
+    started = {'note': 0, 'addon': 0}
+    finished = {'note': 0, 'addon': 0}
+    done = threading.Event()
+    errors = []
+
+    def writer():
+        for i in range(INCREMENTS):
+            kind = 'note' if i % 2 == 0 else 'addon'
+            with lock:
+                started[kind] += 1
+            if kind == 'note':
+                database.increment_note_views(note_id)
+            else:
+                database.increment_addon_views(addon_id)
+            with lock:
+                finished[kind] += 1
+
+    def flusher():
+        while not done.is_set():
+            database.buffer.flush()
+
+    def reader():
+        reads = [
+            ('note', lambda: database.get_note_views(note_id)),
+            ('note', lambda: database.get_note(note_id)[6]),
+            ('addon', lambda: database.get_addon_views(addon_id)),
+        ]
+        while not done.is_set():
+            for kind, read in reads:
+                with lock:
+                    low = finished[kind]
+                value = read()
+                with lock:
+                    high = started[kind]
+                if not low <= value <= high:
+                    errors.append((kind, low, value, high))
+
+    writers = [threading.Thread(target=writer) for _ in range(WRITERS)]
+    others = [threading.Thread(target=flusher)] + [threading.Thread(target=reader) for _ in range(READERS)]
+    for thread in writers + others:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    done.set()
+    for thread in others:
+        thread.join()
+
+    assert errors == []
+    database.buffer._flush_func = flush_func
+    database.buffer.flush()
+    total = WRITERS * INCREMENTS // 2
+    assert database.get_note_views(note_id) == total
+    assert database.get_addon_views(addon_id) == total
+
+
+def test_reads_during_flush_are_exact(database):
+    hammer(database)
+
+
+def test_reads_during_failed_flush_are_exact(database):
+    hammer(database, failing_every=3)
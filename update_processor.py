@@ -0,0 +1,122 @@
+# file: update_processor.py
+import asyncio
+import time
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from config import UPDATE_CONCURRENCY, UPDATE_MAX_PENDING
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """Параллельная обработка обновлений с сохранением порядка для каждого пользователя.
+
+    Обновления разных пользователей обрабатываются одновременно (не больше
+    concurrency), обновления одного пользователя (или чата, если пользователя
+    нет) - строго по очереди. Поэтому пошаговые сценарии на context.user_data
+    (создание заметки, добавление аддона) не перемешиваются, а долгий запрос
+    одного пользователя не задерживает кнопки остальных.
+
+    Ограничение PTB (max_pending) задаёт, сколько обновлений может быть принято
+    в обработку вместе с ожидающими своей очереди.
+    """
+
+    def __init__(self, concurrency=UPDATE_CONCURRENCY, max_pending=UPDATE_MAX_PENDING):
+        super().__init__(max(concurrency, max_pending))
+        self.concurrency = concurrency
+        self._slots = None
+        # ключ пользователя -> [блокировка, число обновлений в работе и в очереди]
+        self._queues = {}
+
+        self.processed = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.running = 0
+        self.wait_s = 0.0
+        self.max_wait_s = 0.0
+
+    async def initialize(self):
+        self._slots = asyncio.Semaphore(self.concurrency)
+
+    async def shutdown(self):
+        pass
+
+    @staticmethod
+    def _key(update):
+        if isinstance(update, Update):
+            if update.effective_user is not None:
+                return ('user', update.effective_user.id)
+            if update.effective_chat is not None:
+                return ('chat', update.effective_chat.id)
+        return None
+
+    async def do_process_update(self, update, coroutine):
+        key = self._key(update)
+        entry = None
+        if key is not None:
+            entry = self._queues.get(key)
+            if entry is None:
+                entry = self._queues[key] = [asyncio.Lock(), 0]
+            entry[1] += 1
+
+        if self._slots is None:
+            await self.initialize()
+
+        entered = time.monotonic()
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        started = False
+        try:
+            # Сначала очередь пользователя, потом общий слот: ожидающие своей
+            # очереди обновления не занимают слоты других пользователей
+            if entry is not None:
+                await entry[0].acquire()
+            try:
+                async with self._slots:
+                    waited = time.monotonic() - entered
+                    self.waiting -= 1
+                    started = True
+                    self.wait_s += waited
+                    self.max_wait_s = max(self.max_wait_s, waited)
+                    self.running += 1
+                    try:
+                        await coroutine
+                    finally:
+                        self.running -= 1
+                        self.processed += 1
+            finally:
+                if entry is not None:
+                    entry[0].release()
+        finally:
+            if not started:
+                self.waiting -= 1
+                # Отменено до запуска (остановка бота)
+                coroutine.close()
+            if entry is not None:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._queues[key]
+
+    def export(self):
+        return {
+            "concurrency": self.concurrency,
+            "running": self.running,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "users_in_queue": len(self._queues),
+            "processed": self.processed,
+            "avg_wait_ms": round(self.wait_s * 1000 / self.processed, 2) if self.processed else 0.0,
+            "max_wait_ms": round(self.max_wait_s * 1000, 2),
+        }
+
+    def report(self):
+        data = self.export()
+        return (
+            f"обрабатывается {data['running']} из {data['concurrency']}, ждут {data['waiting']} "
+            f"(макс. {data['max_waiting']}), пользователей в очереди {data['users_in_queue']}, "
+            f"обработано {data['processed']}, ожидание ср. {data['avg_wait_ms']} мс, "
+            f"макс. {data['max_wait_ms']} мс"
+        )
+
+
+update_processor = PerUserUpdateProcessor()
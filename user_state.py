@@ -0,0 +1,282 @@
+# file: user_state.py
+import asyncio
+import json
+import sys
+import time
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+from config import (
+    USER_STATE_FLUSH_INTERVAL_S, USER_STATE_DEFAULT_TTL_S, USER_STATE_KEY_TTL_S, USER_STATE_IDLE_DROP_S
+)
+from database import adb
+
+
+def _dumps(value):
+    """Компактный JSON; одинаковые значения дают одинаковую строку"""
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+
+
+class SQLitePersistence(BasePersistence):
+    """Хранение context.user_data в SQLite (таблица user_state).
+
+    Сохраняется только user_data, по строке на ключ. PTB передаёт изменения
+    раз в update_interval секунд; в базу попадают только ключи, значение
+    которых изменилось, и всё это пишется одной транзакцией.
+
+    Срок жизни ключа отсчитывается от его последнего изменения: если
+    пользователь бросил сценарий на полпути, ключ удаляется через
+    USER_STATE_KEY_TTL_S[key] (или USER_STATE_DEFAULT_TTL_S) при очередном
+    вызове collect_garbage(), и из памяти, и из базы.
+    """
+
+    def __init__(self, update_interval=USER_STATE_FLUSH_INTERVAL_S, default_ttl_s=USER_STATE_DEFAULT_TTL_S,
+                 key_ttls=USER_STATE_KEY_TTL_S, idle_drop_s=USER_STATE_IDLE_DROP_S):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=False, user_data=True, callback_data=False),
+            update_interval=update_interval
+        )
+        self.default_ttl = default_ttl_s
+        self.key_ttls = dict(key_ttls)
+        self.idle_drop = idle_drop_s
+
+        # user_id -> {key: (хэш JSON, expires_at)} - то, что уже записано или ждёт записи
+        self._saved = {}
+        # user_id -> время последнего обновления от пользователя
+        self._seen = {}
+        # Ещё не записанные изменения
+        self._upserts = {}
+        self._deletes = set()
+        self._dropped = set()
+        self._writer = None
+        self._unserializable = set()
+
+        self.transactions = 0
+        self.rows_written = 0
+        self.rows_deleted = 0
+        self.unchanged = 0
+        self.expired = 0
+        self.unloaded = 0
+
+    def ttl(self, key):
+        return self.key_ttls.get(key, self.default_ttl)
+
+    # ---------- загрузка ----------
+    async def get_user_data(self):
+        rows = await adb.load_user_state(time.time())
+        user_data = {}
+        for user_id, key, raw, expires_at in rows:
+            user_data.setdefault(user_id, {})[key] = json.loads(raw)
+            self._saved.setdefault(user_id, {})[key] = (hash(raw), expires_at)
+        if rows:
+            print(f"✅ Загружено состояние {len(user_data)} пользователей ({len(rows)} ключей)")
+        return user_data
+
+    async def get_chat_data(self):
+        return {}
+
+    async def get_bot_data(self):
+        return {}
+
+    async def get_callback_data(self):
+        return None
+
+    async def get_conversations(self, name):
+        return {}
+
+    async def refresh_user_data(self, user_id, user_data):
+        # Вызывается перед обработчиком: запоминаем, что пользователь активен
+        self._seen[user_id] = time.monotonic()
+
+    async def refresh_chat_data(self, chat_id, chat_data):
+        pass
+
+    async def refresh_bot_data(self, bot_data):
+        pass
+
+    # ---------- изменения ----------
+    async def update_user_data(self, user_id, data):
+        saved = self._saved.get(user_id, {})
+        now = time.time()
+        current = {}
+        for key, value in data.items():
+            try:
+                raw = _dumps(value)
+            except (TypeError, ValueError):
+                if key not in self._unserializable:
+                    self._unserializable.add(key)
+                    print(f"⚠️ user_data['{key}'] не сохраняется: значение не переводится в JSON")
+                continue
+
+            digest = hash(raw)
+            previous = saved.get(key)
+            if previous is not None and previous[0] == digest:
+                current[key] = previous
+                self.unchanged += 1
+                continue
+
+            expires_at = now + self.ttl(key)
+            current[key] = (digest, expires_at)
+            self._upserts[(user_id, key)] = (raw, expires_at)
+            self._deletes.discard((user_id, key))
+
+        for key in saved.keys() - current.keys():
+            self._upserts.pop((user_id, key), None)
+            self._deletes.add((user_id, key))
+
+        if current:
+            self._saved[user_id] = current
+        else:
+            self._saved.pop(user_id, None)
+        self._schedule_write()
+
+    async def drop_user_data(self, user_id):
+        self._saved.pop(user_id, None)
+        self._upserts = {k: v for k, v in self._upserts.items() if k[0] != user_id}
+        self._deletes = {k for k in self._deletes if k[0] != user_id}
+        self._dropped.add(user_id)
+        self._schedule_write()
+
+    async def update_chat_data(self, chat_id, data):
+        pass
+
+    async def update_bot_data(self, data):
+        pass
+
+    async def update_callback_data(self, data):
+        pass
+
+    async def update_conversation(self, name, key, new_state):
+        pass
+
+    async def drop_chat_data(self, chat_id):
+        pass
+
+    # ---------- запись ----------
+    def _schedule_write(self):
+        """PTB вызывает update_user_data для всех пользователей сразу (gather);
+        запись запускается после них и забирает все изменения одной транзакцией"""
+        if not (self._upserts or self._deletes or self._dropped):
+            return
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write())
+
+    async def _write(self):
+        while self._upserts or self._deletes or self._dropped:
+            upserts, deletes, dropped = self._upserts, self._deletes, self._dropped
+            self._upserts, self._deletes, self._dropped = {}, set(), set()
+
+            ok = await adb.save_user_state(
+                [(user_id, key, raw, expires_at) for (user_id, key), (raw, expires_at) in upserts.items()],
+                list(deletes),
+                list(dropped)
+            )
+            if not ok:
+                # Вернём изменения; более новые, накопленные во время записи, важнее
+                for item, value in upserts.items():
+                    if item not in self._deletes:
+                        self._upserts.setdefault(item, value)
+                self._deletes |= {item for item in deletes if item not in self._upserts}
+                self._dropped |= dropped
+                return
+
+            self.transactions += 1
+            self.rows_written += len(upserts)
+            self.rows_deleted += len(deletes)
+
+    async def flush(self):
+        if self._writer is not None and not self._writer.done():
+            await self._writer
+        await self._write()
+        print(f"✅ Состояние пользователей сохранено ({len(self._saved)} пользователей)")
+
+    # ---------- уборка ----------
+    async def collect_garbage(self, application):
+        """Удаление брошенных ключей и выгрузка пустого состояния неактивных пользователей"""
+        now = time.time()
+        idle_before = time.monotonic() - self.idle_drop
+        expired = 0
+
+        for user_id, saved in list(self._saved.items()):
+            stale = [key for key, (_, expires_at) in saved.items() if expires_at <= now]
+            if not stale:
+                continue
+            user_data = application.user_data.get(user_id)
+            for key in stale:
+                del saved[key]
+                if user_data is not None:
+                    user_data.pop(key, None)
+                self._upserts.pop((user_id, key), None)
+                self._deletes.add((user_id, key))
+            expired += len(stale)
+            if not saved:
+                del self._saved[user_id]
+
+        # Пустые словари остаются в памяти у каждого, кто нажимал кнопки. Выгружаем
+        # только неактивных: у активного обработчик может держать ссылку на словарь
+        unloaded = 0
+        for user_id, user_data in list(application.user_data.items()):
+            if not user_data and self._seen.get(user_id, 0) < idle_before:
+                application.drop_user_data(user_id)
+                self._seen.pop(user_id, None)
+                unloaded += 1
+        for user_id, seen in list(self._seen.items()):
+            if seen < idle_before and user_id not in application.user_data:
+                del self._seen[user_id]
+
+        self.expired += expired
+        self.unloaded += unloaded
+        self._schedule_write()
+        # Ключи, истёкшие до перезапуска и не загруженные в память
+        await adb.delete_expired_user_state(now)
+        if expired or unloaded:
+            print(f"🧹 Состояние пользователей: удалено брошенных ключей {expired}, выгружено пустых {unloaded}")
+        return expired, unloaded
+
+    # ---------- отчёт ----------
+    def export(self, user_data):
+        """Размер состояния в памяти: user_data - application.user_data"""
+        keys = {}
+        payload = 0
+        overhead = sys.getsizeof(user_data)
+        for data in user_data.values():
+            overhead += sys.getsizeof(data)
+            for key, value in data.items():
+                keys[key] = keys.get(key, 0) + 1
+                try:
+                    payload += len(_dumps(value).encode('utf-8'))
+                except (TypeError, ValueError):
+                    pass
+        return {
+            "users_resident": len(user_data),
+            "users_with_state": sum(1 for data in user_data.values() if data),
+            "keys": keys,
+            "payload_bytes": payload,
+            "dict_bytes": overhead,
+            "tracked_bytes": sys.getsizeof(self._saved) + sys.getsizeof(self._seen),
+            "pending_writes": len(self._upserts) + len(self._deletes) + len(self._dropped),
+            "transactions": self.transactions,
+            "rows_written": self.rows_written,
+            "rows_deleted": self.rows_deleted,
+            "unchanged": self.unchanged,
+            "expired": self.expired,
+            "unloaded": self.unloaded,
+        }
+
+    def report(self, user_data):
+        data = self.export(user_data)
+        keys = ", ".join(
+            f"`{key}` {count}"
+            for key, count in sorted(data['keys'].items(), key=lambda item: -item[1])
+        ) or "нет"
+        return (
+            f"пользователей в памяти {data['users_resident']}, со сценарием {data['users_with_state']}; "
+            f"данные ~{data['payload_bytes'] / 1024:.1f} КБ, словари ~{data['dict_bytes'] / 1024:.1f} КБ\n"
+            f"ключи: {keys}\n"
+            f"записей в базу {data['transactions']} (строк {data['rows_written']}, удалено {data['rows_deleted']}, "
+            f"без изменений {data['unchanged']}), ждут записи {data['pending_writes']}; "
+            f"брошенных ключей удалено {data['expired']}, пустых выгружено {data['unloaded']}"
+        )
+
+
+persistence = SQLitePersistence()
@@ -1,4 +1,6 @@
-# file: utils/__init__.py
-from .youtube import extract_video_id, get_youtube_title
-
-__all__ = ['extract_video_id', 'get_youtube_title']
\ No newline at end of file
+# file: utils/__init__.py
+from .youtube import extract_video_id, get_youtube_title
+from .callback_data import encode_callback, decode_callback
+from .view_cache import edit_view
+
+__all__ = ['extract_video_id', 'get_youtube_title', 'encode_callback', 'decode_callback', 'edit_view']
\ No newline at end of file
@@ -0,0 +1,153 @@
+# file: utils/backend_health.py
+import time
+
+from config import (
+    BACKEND_EWMA_ALPHA, BACKEND_DEFAULT_LATENCY_S,
+    BACKEND_BREAKER_FAILURES, BACKEND_BREAKER_COOLDOWN_S
+)
+
+CLOSED = 'closed'        # источник работает, запросы идут
+OPEN = 'open'            # источник отключён до конца паузы
+HALF_OPEN = 'half_open'  # пауза прошла, идёт один пробный запрос
+
+STATE_ICONS = {CLOSED: "🟢", HALF_OPEN: "🟡", OPEN: "🔴"}
+
+
+class BackendHealth:
+    """Здоровье одного источника: скользящие средние (EWMA) задержки
+    и доли успехов, время последней ошибки и автомат отключения (circuit breaker).
+
+    После failures_to_open ошибок подряд источник отключается на cooldown_s.
+    Затем пропускается один пробный запрос: успех возвращает источник
+    в работу, ошибка отключает его снова.
+    """
+
+    def __init__(self, name, alpha=BACKEND_EWMA_ALPHA, failures_to_open=BACKEND_BREAKER_FAILURES,
+                 cooldown_s=BACKEND_BREAKER_COOLDOWN_S):
+        self.name = name
+        self.alpha = alpha
+        self.failures_to_open = failures_to_open
+        self.cooldown = cooldown_s
+
+        self.latency = None
+        self.success_rate = 1.0
+        self.requests = 0
+        self.failures = 0
+        self.failures_in_row = 0
+        self.last_failure = None
+        self.state = CLOSED
+        self.opened_at = None
+        self.probe_in_flight = False
+
+    def available(self, now):
+        """Примет ли источник запрос (без резервирования пробного запроса)"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and now - self.opened_at < self.cooldown:
+            return False
+        return not self.probe_in_flight
+
+    def allow(self, now):
+        """Разрешение на запрос прямо перед его отправкой; резервирует пробный запрос"""
+        if self.state == OPEN and now - self.opened_at >= self.cooldown:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self.probe_in_flight:
+                return False
+            self.probe_in_flight = True
+            return True
+        return self.state == CLOSED
+
+    def _update(self, latency_s, success):
+        self.requests += 1
+        if self.latency is None:
+            self.latency = latency_s
+        else:
+            self.latency += self.alpha * (latency_s - self.latency)
+        self.success_rate += self.alpha * ((1.0 if success else 0.0) - self.success_rate)
+        self.probe_in_flight = False
+
+    def record_success(self, latency_s):
+        self._update(latency_s, True)
+        self.failures_in_row = 0
+        self.state = CLOSED
+
+    def record_failure(self, latency_s):
+        # Быстрый отказ не должен делать источник "быстрым": ошибка стоит не меньше
+        # задержки по умолчанию
+        self._update(max(latency_s, BACKEND_DEFAULT_LATENCY_S), False)
+        self.failures += 1
+        self.failures_in_row += 1
+        self.last_failure = time.time()
+        if self.state == HALF_OPEN or self.failures_in_row >= self.failures_to_open:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """Запрос отменён без ответа (проиграл гонку) - здоровье не меняется"""
+        self.probe_in_flight = False
+
+    def score(self):
+        """Чем меньше, тем раньше источник получает запрос"""
+        latency = BACKEND_DEFAULT_LATENCY_S if self.latency is None else self.latency
+        return latency / max(self.success_rate, 0.05)
+
+    def export(self):
+        return {
+            "state": self.state,
+            "latency_ms": None if self.latency is None else round(self.latency * 1000, 1),
+            "success_rate": round(self.success_rate, 3),
+            "requests": self.requests,
+            "failures": self.failures,
+            "failures_in_row": self.failures_in_row,
+            "last_failure": self.last_failure,
+        }
+
+
+class BackendRegistry:
+    """Набор однотипных источников, упорядоченных по здоровью"""
+
+    def __init__(self, names=()):
+        self._backends = {}
+        self.set_names(names)
+
+    def set_names(self, names):
+        """Новый список источников; здоровье оставшихся в списке сохраняется"""
+        self._backends = {
+            name: self._backends.get(name) or BackendHealth(name)
+            for name in names
+        }
+
+    def names(self):
+        return list(self._backends)
+
+    def get(self, name):
+        return self._backends.get(name)
+
+    def pick(self, limit=None):
+        """Доступные источники, лучшие первыми (при равенстве - в порядке списка)"""
+        now = time.monotonic()
+        ranked = sorted(self._backends.values(), key=BackendHealth.score)
+        picked = [health.name for health in ranked if health.available(now)]
+        return picked if limit is None else picked[:limit]
+
+    def export(self):
+        return {name: health.export() for name, health in self._backends.items()}
+
+    def report(self):
+        """Текстовый отчёт для админ-панели"""
+        if not self._backends:
+            return "Список источников пуст."
+
+        lines = []
+        for health in sorted(self._backends.values(), key=BackendHealth.score):
+            latency = "нет данных" if health.latency is None else f"{health.latency * 1000:.0f} мс"
+            line = (
+                f"{STATE_ICONS[health.state]} `{health.name}`\n"
+                f"    задержка {latency}, успехов {health.success_rate:.0%}, запросов {health.requests}"
+            )
+            if health.last_failure is not None:
+                ago = int(time.time() - health.last_failure)
+                line += f", последняя ошибка {ago} сек. назад"
+            lines.append(line)
+        return "\n".join(lines)
@@ -0,0 +1,166 @@
+# file: utils/callback_data.py
+import base64
+import secrets
+import time
+from collections import OrderedDict
+
+from config import CALLBACK_REGISTRY_TTL_S, CALLBACK_REGISTRY_MAX_ITEMS
+
+# Маршруты кнопок: имя -> номер. В callback_data пишется только номер,
+# поэтому номера нельзя менять - иначе сломаются кнопки в уже отправленных сообщениях.
+ROUTES = {
+    "main": 1,
+    "admin": 2,
+    "cats": 3,
+    "cat": 4,
+    "addon": 5,
+    "videos": 6,
+    "view_video": 7,
+    "add_video": 8,
+    "like_video": 9,
+    "dislike_video": 10,
+    "note": 11,
+    "notes": 12,
+    "github": 13,
+    "youtube": 14,
+    "cancel_note": 20,
+    "cancel_search": 21,
+    "cancel_admin": 22,
+    "cancel_add_video": 23,
+    "admin_addons": 30,
+    "admin_stats": 31,
+    "admin_add_category": 32,
+    "admin_add_addon": 33,
+    "admin_addon_cat": 34,
+    "admin_edit_addon": 35,
+    "admin_delete_addon": 36,
+    "admin_delete_addon_confirm": 37,
+    "admin_do_delete": 38,
+    "admin_addon_stats": 39,
+    "admin_stats_cat": 40,
+    "admin_stats_addon": 41,
+    "admin_routes": 42,
+    "admin_routes_export": 43,
+    "admin_backends": 44,
+    "admin_backends_reload": 45,
+}
+ROUTE_NAMES = {route_id: name for name, route_id in ROUTES.items()}
+
+# Лимит Telegram на callback_data в байтах
+CALLBACK_DATA_LIMIT = 64
+# Префиксы: закодированные данные и токен из реестра (в старых кнопках их нет)
+PACKED_PREFIX = "!"
+TOKEN_PREFIX = "~"
+
+
+class CallbackRegistry:
+    """Хранилище данных кнопок, которые не помещаются в 64 байта.
+
+    В callback_data кладётся короткий токен, сами данные живут в памяти
+    ttl_s секунд. При переполнении вытесняются самые старые записи.
+    """
+
+    def __init__(self, ttl_s=CALLBACK_REGISTRY_TTL_S, max_items=CALLBACK_REGISTRY_MAX_ITEMS):
+        self.ttl = ttl_s
+        self.max_items = max_items
+        self._items = OrderedDict()
+
+    def put(self, payload):
+        token = secrets.token_urlsafe(12)
+        self._items[token] = (time.monotonic() + self.ttl, payload)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+        return token
+
+    def get(self, token):
+        item = self._items.get(token)
+        if item is None:
+            return None
+        expires_at, payload = item
+        if expires_at < time.monotonic():
+            del self._items[token]
+            return None
+        return payload
+
+    def __len__(self):
+        return len(self._items)
+
+
+registry = CallbackRegistry()
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(payload, pos):
+    value = shift = 0
+    while True:
+        byte = payload[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def pack(route, *args):
+    """Данные кнопки в байты: номер маршрута и аргументы (целые числа или строки)"""
+    out = bytearray()
+    _write_varint(out, ROUTES[route])
+    for arg in args:
+        if isinstance(arg, int):
+            # Младший бит 0 - число (zigzag, чтобы отрицательные тоже были короткими;
+            # без сдвига на 63 - целые в Python не ограничены 64 битами)
+            zigzag = arg << 1 if arg >= 0 else (-arg << 1) - 1
+            _write_varint(out, zigzag << 1)
+        else:
+            data = str(arg).encode('utf-8')
+            _write_varint(out, len(data) << 1 | 1)
+            out += data
+    return bytes(out)
+
+
+def unpack(payload):
+    """Обратное к pack: (имя маршрута, [аргументы])"""
+    route_id, pos = _read_varint(payload, 0)
+    args = []
+    while pos < len(payload):
+        header, pos = _read_varint(payload, pos)
+        if header & 1:
+            length = header >> 1
+            args.append(payload[pos:pos + length].decode('utf-8'))
+            pos += length
+        else:
+            value = header >> 1
+            args.append((value >> 1) ^ -(value & 1))
+    return ROUTE_NAMES[route_id], args
+
+
+def encode_callback(route, *args):
+    """callback_data для кнопки; длинные данные уходят в реестр"""
+    payload = pack(route, *args)
+    data = PACKED_PREFIX + base64.urlsafe_b64encode(payload).rstrip(b'=').decode('ascii')
+    if len(data) <= CALLBACK_DATA_LIMIT:
+        return data
+    return TOKEN_PREFIX + registry.put(payload)
+
+
+def decode_callback(data):
+    """Разбор callback_data: (имя маршрута, [аргументы]) или None для устаревших кнопок"""
+    try:
+        if data.startswith(PACKED_PREFIX):
+            encoded = data[len(PACKED_PREFIX):]
+            payload = base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4))
+        elif data.startswith(TOKEN_PREFIX):
+            payload = registry.get(data[len(TOKEN_PREFIX):])
+            if payload is None:
+                return None
+        else:
+            return None
+        return unpack(payload)
+    except (ValueError, KeyError, IndexError):
+        return None
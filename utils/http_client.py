@@ -0,0 +1,61 @@
+# file: utils/http_client.py
+import aiohttp
+
+from config import (
+    HTTP_POOL_LIMIT, HTTP_POOL_LIMIT_PER_HOST, HTTP_DNS_CACHE_TTL_S,
+    HTTP_KEEPALIVE_TIMEOUT_S, HTTP_CONNECT_TIMEOUT_S, HTTP_TOTAL_TIMEOUT_S
+)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+}
+
+
+class HttpClient:
+    """Общая HTTP-сессия бота с пулом соединений.
+
+    Соединения переиспользуются (keep-alive), число соединений на хост
+    ограничено, DNS кэшируется, поэтому запрос к уже знакомому серверу
+    не платит за DNS, TCP и TLS заново. Сессия создаётся при старте бота
+    и закрывается при остановке; если её ещё нет (запуск модулей из
+    консоли), она создаётся при первом запросе.
+    """
+
+    def __init__(self, limit=HTTP_POOL_LIMIT, limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+                 dns_ttl_s=HTTP_DNS_CACHE_TTL_S, keepalive_s=HTTP_KEEPALIVE_TIMEOUT_S,
+                 connect_timeout_s=HTTP_CONNECT_TIMEOUT_S, total_timeout_s=HTTP_TOTAL_TIMEOUT_S):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl_s
+        self.keepalive = keepalive_s
+        self.timeout = aiohttp.ClientTimeout(total=total_timeout_s, connect=connect_timeout_s)
+        self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_ttl,
+                keepalive_timeout=self.keepalive
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers=DEFAULT_HEADERS
+            )
+        return self._session
+
+    async def start(self):
+        """Создание сессии (вызывается при старте бота)"""
+        self.session
+
+    async def close(self):
+        """Закрытие сессии и всех соединений пула"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+http_client = HttpClient()
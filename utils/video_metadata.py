@@ -0,0 +1,92 @@
+# file: utils/video_metadata.py
+import time
+from collections import OrderedDict
+
+from config import VIDEO_METADATA_CACHE_SIZE, VIDEO_METADATA_TTL_S, VIDEO_METADATA_NEGATIVE_TTL_S
+from database import adb
+
+STATUS_OK = 'ok'
+STATUS_FAILED = 'failed'
+
+
+class VideoMetadata:
+    """Результат запроса названия видео: title is None, если видео недоступно"""
+
+    __slots__ = ('video_id', 'title', 'source', 'status', 'fetched_at')
+
+    def __init__(self, video_id, title, source, status, fetched_at):
+        self.video_id = video_id
+        self.title = title
+        self.source = source
+        self.status = status
+        self.fetched_at = fetched_at
+
+    @property
+    def ok(self):
+        return self.status == STATUS_OK
+
+    def expired(self, now, ttl_s, negative_ttl_s):
+        return now - self.fetched_at > (ttl_s if self.ok else negative_ttl_s)
+
+
+class VideoMetadataCache:
+    """Кэш названий видео по id YouTube: LRU в памяти поверх таблицы video_metadata.
+
+    Удачные ответы живут ttl_s, ответы "видео недоступно" - negative_ttl_s:
+    так приватное или удалённое видео не гоняет всю цепочку сетевых запросов
+    при каждой попытке. Временные сбои источников сюда не попадают (см.
+    lookup_title).
+    """
+
+    def __init__(self, max_items=VIDEO_METADATA_CACHE_SIZE, ttl_s=VIDEO_METADATA_TTL_S,
+                 negative_ttl_s=VIDEO_METADATA_NEGATIVE_TTL_S):
+        self.max_items = max_items
+        self.ttl = ttl_s
+        self.negative_ttl = negative_ttl_s
+        self._items = OrderedDict()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def _remember(self, entry):
+        self._items[entry.video_id] = entry
+        self._items.move_to_end(entry.video_id)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    async def get(self, video_id):
+        """Свежая запись из кэша или None (тогда название нужно запросить из сети)"""
+        now = time.time()
+        entry = self._items.get(video_id)
+        if entry is not None:
+            if not entry.expired(now, self.ttl, self.negative_ttl):
+                self._items.move_to_end(video_id)
+                self.memory_hits += 1
+                return entry
+            del self._items[video_id]
+
+        row = await adb.get_video_metadata(video_id)
+        if row is not None:
+            entry = VideoMetadata(video_id, *row)
+            if not entry.expired(now, self.ttl, self.negative_ttl):
+                self._remember(entry)
+                self.db_hits += 1
+                return entry
+
+        self.misses += 1
+        return None
+
+    async def put(self, video_id, title, source=None):
+        """Запоминает результат запроса (title=None - видео недоступно)"""
+        entry = VideoMetadata(
+            video_id, title, source, STATUS_OK if title else STATUS_FAILED, time.time()
+        )
+        self._remember(entry)
+        await adb.save_video_metadata(video_id, entry.title, entry.source, entry.status, entry.fetched_at)
+        return entry
+
+    def __len__(self):
+        return len(self._items)
+
+
+video_metadata = VideoMetadataCache()
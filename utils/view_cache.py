@@ -0,0 +1,116 @@
+# file: utils/view_cache.py
+import hashlib
+import itertools
+import json
+from collections import OrderedDict
+
+from telegram.error import BadRequest
+
+from config import VIEW_CACHE_MAX_ITEMS
+
+
+def view_fingerprint(text, parse_mode=None, reply_markup=None, **options):
+    """Отпечаток того, что увидит пользователь: текст, разметка, клавиатура и параметры показа"""
+    view = {
+        "text": text,
+        "parse_mode": parse_mode,
+        "reply_markup": reply_markup.to_dict() if reply_markup is not None else None,
+        "options": options,
+    }
+    raw = json.dumps(view, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).digest()
+
+
+class ViewCache:
+    """Последнее показанное содержимое сообщений с кнопками.
+
+    Для каждого (chat_id, message_id) хранится отпечаток последней правки.
+    Правка с тем же текстом, разметкой и клавиатурой не отправляется в
+    Telegram (он всё равно ответил бы ошибкой "message is not modified").
+    Кэш ограничен max_items, старые сообщения вытесняются первыми.
+
+    Правки одного сообщения могут завершаться не по порядку (планировщик
+    схлопывает ожидающие правки в последнюю), поэтому каждая правка получает
+    номер, и отпечаток запоминается, только если более новой правки не было.
+    Пока правка в пути, содержимое сообщения считается неизвестным.
+    """
+
+    def __init__(self, max_items=VIEW_CACHE_MAX_ITEMS):
+        self.max_items = max_items
+        # (chat_id, message_id) -> (номер правки, отпечаток или None, если правка в пути)
+        self._views = OrderedDict()
+        self._seq = itertools.count(1)
+
+        self.sent = 0
+        self.skipped = 0
+        self.not_modified = 0
+
+    @staticmethod
+    def _key(query):
+        if query.message is not None:
+            return (query.message.chat.id, query.message.message_id)
+        return ('inline', query.inline_message_id)
+
+    def _remember(self, key, seq, fingerprint):
+        current = self._views.get(key)
+        if current is not None and current[0] > seq:
+            # Уже началась более новая правка этого сообщения
+            return
+        self._views[key] = (seq, fingerprint)
+        self._views.move_to_end(key)
+        while len(self._views) > self.max_items:
+            self._views.popitem(last=False)
+
+    async def edit(self, query, text, reply_markup=None, parse_mode=None, **kwargs):
+        """Замена query.edit_message_text: одинаковые правки подряд не отправляются.
+
+        Возвращает результат Telegram или None, если правка не понадобилась.
+        """
+        key = self._key(query)
+        fingerprint = view_fingerprint(text, parse_mode, reply_markup, **kwargs)
+        current = self._views.get(key)
+        if current is not None and current[1] == fingerprint:
+            self._views.move_to_end(key)
+            self.skipped += 1
+            return None
+
+        seq = next(self._seq)
+        self._remember(key, seq, None)
+        try:
+            result = await query.edit_message_text(text, reply_markup=reply_markup, parse_mode=parse_mode, **kwargs)
+        except BadRequest as e:
+            if "not modified" not in str(e).lower():
+                self._remember(key, seq, None)
+                raise
+            # Сообщение уже выглядит так (например, показано до перезапуска бота)
+            self.not_modified += 1
+            self._remember(key, seq, fingerprint)
+            return None
+
+        self.sent += 1
+        self._remember(key, seq, fingerprint)
+        return result
+
+    def export(self):
+        return {
+            "cached": len(self._views),
+            "sent": self.sent,
+            "skipped": self.skipped,
+            "not_modified": self.not_modified,
+        }
+
+    def report(self):
+        data = self.export()
+        return (
+            f"отправлено {data['sent']}, пропущено одинаковых {data['skipped']} "
+            f"(сэкономлено запросов к API), ответов \"not modified\" {data['not_modified']}, "
+            f"сообщений в кэше {data['cached']}"
+        )
+
+
+views = ViewCache()
+
+
+async def edit_view(query, text, reply_markup=None, parse_mode=None, **kwargs):
+    """Показ экрана в сообщении с кнопками через общий кэш отпечатков"""
+    return await views.edit(query, text, reply_markup=reply_markup, parse_mode=parse_mode, **kwargs)
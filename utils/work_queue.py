@@ -0,0 +1,143 @@
+# file: utils/work_queue.py
+import asyncio
+import time
+
+
+class WorkQueue:
+    """Ограниченная очередь задач с пулом обработчиков.
+
+    Задачи принимаются сразу (submit не ждёт обработки), выполняются
+    workers обработчиками. Очередь ограничена max_size, у каждого
+    пользователя одновременно может быть не больше per_user задач
+    (в очереди и в работе). При остановке бота drain() дожидается
+    обработки уже принятых задач.
+    """
+
+    def __init__(self, name, handler, workers, max_size, per_user):
+        self.name = name
+        self._handler = handler
+        self.workers = workers
+        self.max_size = max_size
+        self.per_user = per_user
+
+        self._queue = None
+        self._tasks = []
+        self._per_user = {}
+        self.accepting = True
+
+        self.accepted = 0
+        self.rejected_full = 0
+        self.rejected_user = 0
+        self.processed = 0
+        self.failed = 0
+        self.in_progress = 0
+        self.max_depth = 0
+        self.wait_s = 0.0
+        self.work_s = 0.0
+
+    def start(self):
+        """Запуск обработчиков в текущем цикле событий (повторный вызов ничего не делает)"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"{self.name}-{i}")
+            for i in range(self.workers)
+        ]
+        self.accepting = True
+
+    def depth(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def submit(self, user_id, item):
+        """Постановка задачи. Возвращает номер в очереди или None, если задача не принята"""
+        if not self.accepting:
+            self.rejected_full += 1
+            return None
+        self.start()
+
+        if self._per_user.get(user_id, 0) >= self.per_user:
+            self.rejected_user += 1
+            return None
+        try:
+            self._queue.put_nowait((user_id, item, time.monotonic()))
+        except asyncio.QueueFull:
+            self.rejected_full += 1
+            return None
+
+        self._per_user[user_id] = self._per_user.get(user_id, 0) + 1
+        self.accepted += 1
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+        return self._queue.qsize()
+
+    def user_busy(self, user_id):
+        """Достиг ли пользователь лимита задач"""
+        return self._per_user.get(user_id, 0) >= self.per_user
+
+    async def _worker(self):
+        while True:
+            user_id, item, enqueued_at = await self._queue.get()
+            started = time.monotonic()
+            self.wait_s += started - enqueued_at
+            self.in_progress += 1
+            try:
+                await self._handler(item)
+                self.processed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                print(f"❌ Очередь {self.name}: ошибка обработки задачи: {type(e).__name__}: {e}")
+            finally:
+                self.in_progress -= 1
+                self.work_s += time.monotonic() - started
+                left = self._per_user.get(user_id, 1) - 1
+                if left > 0:
+                    self._per_user[user_id] = left
+                else:
+                    self._per_user.pop(user_id, None)
+                self._queue.task_done()
+
+    async def drain(self, timeout_s):
+        """Остановка: новые задачи не принимаются, принятые дообрабатываются (не дольше timeout_s)"""
+        self.accepting = False
+        if not self._tasks:
+            return True
+
+        drained = True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout_s)
+        except asyncio.TimeoutError:
+            drained = False
+            print(f"⚠️ Очередь {self.name}: за {timeout_s} сек. не обработано задач: {self.depth() + self.in_progress}")
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        print(f"✅ Очередь {self.name} остановлена, обработано задач: {self.processed}")
+        return drained
+
+    def export(self):
+        done = self.processed + self.failed
+        return {
+            "depth": self.depth(),
+            "max_depth": self.max_depth,
+            "in_progress": self.in_progress,
+            "accepted": self.accepted,
+            "rejected_full": self.rejected_full,
+            "rejected_user": self.rejected_user,
+            "processed": self.processed,
+            "failed": self.failed,
+            "avg_wait_ms": round(self.wait_s * 1000 / done, 1) if done else 0.0,
+            "avg_work_ms": round(self.work_s * 1000 / done, 1) if done else 0.0,
+        }
+
+    def report(self):
+        data = self.export()
+        return (
+            f"в очереди {data['depth']} (макс. {data['max_depth']}), в работе {data['in_progress']}, "
+            f"обработано {data['processed']}, ошибок {data['failed']}, "
+            f"отклонено: очередь полна {data['rejected_full']}, лимит пользователя {data['rejected_user']}; "
+            f"ожидание ср. {data['avg_wait_ms']} мс, обработка ср. {data['avg_work_ms']} мс"
+        )
@@ -1,256 +1,520 @@
-# file: utils/youtube.py
-import aiohttp
-import asyncio
-import re
-import json
-from typing import Optional, Tuple
-
-
-# ==================== ПОЛУЧЕНИЕ ID ВИДЕО ====================
-def get_video_id(youtube_url: str) -> Optional[str]:
-    """
-    Извлекает ID видео из ссылки YouTube.
-    Возвращает строку с ID или None.
-    """
-    patterns = [
-        r'(?:youtube\.com\/watch\?v=)([\w\-]{11})',
-        r'(?:youtu\.be\/)([\w\-]{11})',
-        r'(?:youtube\.com\/embed\/)([\w\-]{11})',
-        r'(?:youtube\.com\/shorts\/)([\w\-]{11})',
-        r'(?:youtube\.com\/v\/)([\w\-]{11})'  # NEW: ещё один возможный формат
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, youtube_url, re.IGNORECASE)  # FIXED: игнорируем регистр
-        if match:
-            video_id = match.group(1)
-            print(f"✅ Извлечён Video ID: {video_id}")
-            return video_id
-
-    print("❌ Не удалось извлечь Video ID из ссылки.")
-    return None
-
-
-# Создаём алиас для обратной совместимости
-extract_video_id = get_video_id
-
-
-# ==================== МЕТОД 1: Noembed API (с исправленным парсингом) ====================
-async def get_title_noembed(video_id: str) -> Optional[str]:
-    """
-    Пытается получить название через сервис Noembed.
-    Простой и часто работает. Теперь корректно обрабатывает text/javascript.
-    """
-    url = f"https://noembed.com/embed?url=https://www.youtube.com/watch?v={video_id}"
-
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        'Accept': 'application/json, text/javascript, */*'  # FIXED: принимаем и text/javascript
-    }
-
-    try:
-        # FIXED: увеличиваем таймаут и не проверяем строго MIME-тип
-        timeout = aiohttp.ClientTimeout(total=15)
-        connector = aiohttp.TCPConnector(ssl=False)  # Может помочь при проблемах с SSL
-
-        async with aiohttp.ClientSession(
-                connector=connector,
-                timeout=timeout,
-                headers=headers
-        ) as session:
-            async with session.get(url) as response:
-                response_text = await response.text()
-
-                # FIXED: пытаемся распарсить ответ, даже если MIME-тип не application/json
-                try:
-                    data = json.loads(response_text)
-                    title = data.get('title')
-                    if title:
-                        print(f"✅ Noembed вернул название: {title[:60]}...")
-                        return str(title).strip()
-                except json.JSONDecodeError as e:
-                    # Если это не JSON, ищем title в тексте ответа (на всякий случай)
-                    print(f"⚠️ Noembed вернул не JSON, а текст. Пытаемся найти заголовок вручную...")
-                    # Простая попытка найти "title" в тексте
-                    title_match = re.search(r'"title"\s*:\s*"([^"]+)"', response_text)
-                    if title_match:
-                        title = title_match.group(1)
-                        print(f"✅ Нашли заголовок вручную: {title[:60]}...")
-                        return title
-                    else:
-                        print(f"❌ Не удалось найти заголовок в ответе Noembed.")
-
-    except asyncio.TimeoutError:
-        print(f"❌ Noembed: таймаут запроса (15 сек).")
-    except Exception as e:
-        print(f"❌ Noembed не сработал: {type(e).__name__}: {e}")
-
-    return None
-
-
-# ==================== МЕТОД 2: Invidious API (ЗАПАСНОЙ, часто доступен) ====================
-async def get_title_invidious(video_id: str) -> Optional[str]:
-    """
-    NEW: Альтернативный метод через публичные инстансы Invidious.
-    Эти инстансы часто остаются доступными при блокировках.
-    """
-    # Список публичных инстансов (может меняться)
-    invidious_instances = [
-        "https://inv.riverside.rocks",
-        "https://invidious.snopyta.org",
-        "https://yewtu.be",
-        "https://invidious.xyz",
-        "https://invidiou.site"
-    ]
-
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        'Accept': 'application/json'
-    }
-
-    for instance in invidious_instances:
-        api_url = f"{instance}/api/v1/videos/{video_id}"
-        print(f"🔄 Invidious: пробуем инстанс {instance}...")
-
-        try:
-            async with aiohttp.ClientSession(headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as session:
-                async with session.get(api_url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        title = data.get('title')
-                        if title:
-                            print(f"✅ Invidious ({instance}) вернул название: {title[:60]}...")
-                            return str(title).strip()
-                    else:
-                        print(f"⚠️ Invidious ({instance}): статус {response.status}")
-        except Exception as e:
-            print(f"⚠️ Invidious ({instance}) не сработал: {type(e).__name__}")
-            continue  # Пробуем следующий инстанс
-
-    print("❌ Все инстансы Invidious недоступны.")
-    return None
-
-
-# ==================== ОСНОВНАЯ ФУНКЦИЯ (ОБНОВЛЁННАЯ) ====================
-async def get_youtube_title(youtube_url: str, check_blender: bool = True) -> Tuple[Optional[str], bool]:
-    """
-    Основная функция. Пытается получить название видео разными способами.
-
-    Возвращает:
-        tuple: (название_видео_или_None, прошло_ли_проверку_на_blender)
-    """
-    print(f"\n{'=' * 60}")
-    print(f"🔍 Анализ ссылки: {youtube_url}")
-
-    # 1. Извлекаем ID видео
-    video_id = get_video_id(youtube_url)
-    if not video_id:
-        return None, False
-
-    # 2. Пробуем получить название разными способами (NEW: порядок изменён)
-    title = None
-    methods = [
-        ("Noembed API", get_title_noembed),
-        ("Invidious API", get_title_invidious),  # NEW: добавляем этот метод
-    ]
-
-    for method_name, method_func in methods:
-        print(f"\n🔄 Пробую {method_name}...")
-        title = await method_func(video_id)
-        if title:
-            print(f"✅ Успех с методом: {method_name}")
-            break
-        print(f"❌ Метод {method_name} не сработал")
-
-    # 3. Если название не получено
-    if not title:
-        print("❌ Все методы не сработали. Не удалось получить название.")
-        return None, False
-
-    # 4. Проверка на слово "blender" или "блендер" (если нужно)
-    if check_blender:
-        title_lower = title.lower()
-        has_blender = 'blender' in title_lower or 'блендер' in title_lower
-
-        if has_blender:
-            print(f"✅ Проверка пройдена: название содержит 'blender' или 'блендер'")
-            return title, True
-        else:
-            print(f"❌ Проверка не пройдена: в названии нет слова 'blender' или 'блендер'")
-            print(f"   Полное название: {title}")
-            return title, False
-
-    # Если проверка не требуется
-    print(f"✅ Название получено (без проверки на Blender): {title[:80]}...")
-    return title, True
-
-
-# ==================== ФУНКЦИЯ ДЛЯ ОБРАБОТЧИКА СООБЩЕНИЙ ====================
-async def get_video_info(youtube_url: str) -> Tuple[bool, str]:
-    """
-    Упрощённая обёртка для обработчика сообщений.
-    Возвращает (успех, результат).
-    В случае ошибки результат — это строка для отправки пользователю.
-    """
-    print(f"\n🎬 Запрос информации о видео: {youtube_url}")
-    title, has_blender = await get_youtube_title(youtube_url, check_blender=True)
-
-    if not title:
-        error_msg = (
-            "❌ **Не удалось получить название видео.**\n\n"
-            "Возможные причины:\n"
-            "• Видео является приватным или было удалено\n"
-            "• Проблемы с доступом к YouTube из вашего региона\n"
-            "• Некорректная ссылка\n\n"
-            "**Попробуйте:**\n"
-            "1. Проверить, открывается ли видео в браузере\n"
-            "2. Использовать другую ссылку на это же видео\n"
-            "3. Добавить видео позже"
-        )
-        return False, error_msg
-
-    if not has_blender:
-        # FIXED: экранируем возможные Markdown-символы в названии для Telegram
-        safe_title = title.replace('*', '\\*').replace('_', '\\_').replace('`', '\\`')
-        error_msg = (
-            f"❌ **Видео не связано с Blender.**\n\n"
-            f"🎬 **Название:** {safe_title}\n\n"
-            f"Чтобы добавить видео, его **название должно содержать слово 'blender' или 'блендер'**.\n"
-            f"Если это действительно видео про Blender, переименуйте его на YouTube или выберите другое видео."
-        )
-        return False, error_msg
-
-    return True, title  # В случае успеха возвращаем просто строку с названием
-
-
-# ==================== ТЕСТОВЫЙ ЗАПУСК ====================
-async def test():
-    """Функция для тестирования работы модуля."""
-    test_urls = [
-        "https://www.youtube.com/watch?v=dQw4w9WgXcQ",  # Rick Astley
-        "https://youtu.be/dQw4w9WgXcQ",  # Короткая ссылка
-        "https://www.youtube.com/shorts/Y7bE9u0QP44",  # Короткое видео
-    ]
-
-    for url in test_urls:
-        print(f"\n{'=' * 60}")
-        print(f"🧪 ТЕСТ: {url}")
-        success, result = await get_video_info(url)
-        print(f"Успех: {success}")
-        print(f"Результат: {result}")
-        print(f"{'=' * 60}")
-
-
-if __name__ == "__main__":
-    import sys
-
-    if len(sys.argv) > 1:
-        url = sys.argv[1]
-        print("🧪 Запуск теста для одной ссылки...")
-        result = asyncio.run(get_video_info(url))
-        print(f"\n🎯 Результат: {result}")
-    else:
-        print("ℹ️  Для теста передайте ссылку как аргумент командной строки.")
-        print("Пример: python youtube.py https://youtu.be/Y7bE9u0QP44")
-        # Запускаем общий тест
-        asyncio.run(test())
\ No newline at end of file
+# file: utils/youtube.py
+import aiohttp
+import asyncio
+import re
+import json
+import os
+import sys
+import time
+from typing import Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import (
+    NOEMBED_TIMEOUT_S, INVIDIOUS_TIMEOUT_S, INVIDIOUS_INSTANCES, INVIDIOUS_INSTANCES_FILE,
+    TITLE_LOOKUP_DEADLINE_S, TITLE_HEDGE_DELAY_S, TITLE_HEDGE_INVIDIOUS
+)
+from utils.backend_health import BackendRegistry
+from utils.http_client import http_client
+from utils.video_metadata import video_metadata
+
+# Итог поиска названия
+TITLE_FOUND = 'found'              # название получено
+TITLE_MISSING = 'missing'          # источник ответил, что видео нет (удалено, приватное)
+TITLE_UNAVAILABLE = 'unavailable'  # источники не ответили - стоит повторить позже
+
+
+class VideoUnavailable(Exception):
+    """Источник точно знает, что видео недоступно: удалено, приватное или id неверный"""
+
+
+class TitleLookupFailed(Exception):
+    """Название не получено из-за источников (таймаут, все отключены, ошибки сети)"""
+
+
+# Так источники описывают видео, которого нет или которое закрыто
+UNAVAILABLE_MARKERS = ('404', 'not found', 'unavailable', 'private', 'removed', 'does not exist', 'deleted')
+
+
+def _unavailable_reason(data) -> Optional[str]:
+    """Текст ошибки из JSON-ответа, если он говорит о недоступности самого видео"""
+    error = data.get('error') if isinstance(data, dict) else None
+    if error and any(marker in str(error).lower() for marker in UNAVAILABLE_MARKERS):
+        return str(error)
+    return None
+
+
+# ==================== ПОЛУЧЕНИЕ ID ВИДЕО ====================
+def get_video_id(youtube_url: str) -> Optional[str]:
+    """
+    Извлекает ID видео из ссылки YouTube.
+    Возвращает строку с ID или None.
+    """
+    patterns = [
+        r'(?:youtube\.com\/watch\?v=)([\w\-]{11})',
+        r'(?:youtu\.be\/)([\w\-]{11})',
+        r'(?:youtube\.com\/embed\/)([\w\-]{11})',
+        r'(?:youtube\.com\/shorts\/)([\w\-]{11})',
+        r'(?:youtube\.com\/v\/)([\w\-]{11})'  # NEW: ещё один возможный формат
+    ]
+
+    for pattern in patterns:
+        match = re.search(pattern, youtube_url, re.IGNORECASE)  # FIXED: игнорируем регистр
+        if match:
+            video_id = match.group(1)
+            print(f"✅ Извлечён Video ID: {video_id}")
+            return video_id
+
+    print("❌ Не удалось извлечь Video ID из ссылки.")
+    return None
+
+
+# Создаём алиас для обратной совместимости
+extract_video_id = get_video_id
+
+
+# ==================== МЕТОД 1: Noembed API (с исправленным парсингом) ====================
+async def get_title_noembed(video_id: str) -> Optional[str]:
+    """
+    Пытается получить название через сервис Noembed.
+    Простой и часто работает. Теперь корректно обрабатывает text/javascript.
+    Если Noembed ответил, что видео нет, выбрасывает VideoUnavailable.
+    """
+    url = f"https://noembed.com/embed?url=https://www.youtube.com/watch?v={video_id}"
+
+    headers = {
+        'Accept': 'application/json, text/javascript, */*'  # FIXED: принимаем и text/javascript
+    }
+
+    reason = None
+    try:
+        # FIXED: увеличиваем таймаут и не проверяем строго MIME-тип
+        timeout = aiohttp.ClientTimeout(total=NOEMBED_TIMEOUT_S)
+
+        # Общая сессия бота: соединение с noembed.com переиспользуется между запросами.
+        # ssl=False может помочь при проблемах с SSL
+        async with http_client.session.get(url, headers=headers, timeout=timeout, ssl=False) as response:
+            response_text = await response.text()
+
+            # FIXED: пытаемся распарсить ответ, даже если MIME-тип не application/json
+            try:
+                data = json.loads(response_text)
+                title = data.get('title')
+                if title:
+                    print(f"✅ Noembed вернул название: {title[:60]}...")
+                    return str(title).strip()
+                reason = _unavailable_reason(data)
+            except json.JSONDecodeError as e:
+                # Если это не JSON, ищем title в тексте ответа (на всякий случай)
+                print(f"⚠️ Noembed вернул не JSON, а текст. Пытаемся найти заголовок вручную...")
+                # Простая попытка найти "title" в тексте
+                title_match = re.search(r'"title"\s*:\s*"([^"]+)"', response_text)
+                if title_match:
+                    title = title_match.group(1)
+                    print(f"✅ Нашли заголовок вручную: {title[:60]}...")
+                    return title
+                else:
+                    print(f"❌ Не удалось найти заголовок в ответе Noembed.")
+
+    except asyncio.TimeoutError:
+        print(f"❌ Noembed: таймаут запроса ({NOEMBED_TIMEOUT_S} сек).")
+    except Exception as e:
+        print(f"❌ Noembed не сработал: {type(e).__name__}: {e}")
+
+    if reason:
+        raise VideoUnavailable(f"Noembed: {reason}")
+    return None
+
+
+# ==================== МЕТОД 2: Invidious API (ЗАПАСНОЙ, часто доступен) ====================
+def load_invidious_instances():
+    """Список инстансов: из INVIDIOUS_INSTANCES_FILE (по адресу в строке), иначе из config"""
+    try:
+        with open(INVIDIOUS_INSTANCES_FILE, 'r', encoding='utf-8') as f:
+            instances = [
+                line.strip().rstrip('/') for line in f
+                if line.strip() and not line.lstrip().startswith('#')
+            ]
+    except OSError:
+        return list(INVIDIOUS_INSTANCES)
+    return list(dict.fromkeys(instances))
+
+
+# Инстансы с их здоровьем: запросы идут сначала к быстрым и надёжным,
+# отключённые после серии ошибок пропускаются до пробного запроса
+invidious_backends = BackendRegistry(load_invidious_instances())
+
+
+def reload_invidious_instances():
+    """Перечитывает список инстансов, статистика оставшихся сохраняется"""
+    invidious_backends.set_names(load_invidious_instances())
+    print(f"🔄 Список инстансов Invidious перезагружен: {len(invidious_backends.names())} шт.")
+    return invidious_backends.names()
+
+
+async def get_title_invidious_instance(instance: str, video_id: str) -> Optional[str]:
+    """Запрос названия у одного инстанса Invidious (с учётом его здоровья).
+
+    Если инстанс ответил, что видео нет, выбрасывает VideoUnavailable.
+    """
+    health = invidious_backends.get(instance)
+    if health is not None and not health.allow(time.monotonic()):
+        print(f"⏭️ Invidious ({instance}) временно отключён")
+        return None
+
+    api_url = f"{instance}/api/v1/videos/{video_id}"
+    headers = {
+        'Accept': 'application/json'
+    }
+    timeout = aiohttp.ClientTimeout(total=INVIDIOUS_TIMEOUT_S)
+    print(f"🔄 Invidious: пробуем инстанс {instance}...")
+
+    started = time.monotonic()
+    healthy = False
+    title = None
+    reason = None
+    try:
+        async with http_client.session.get(api_url, headers=headers, timeout=timeout) as response:
+            # 4xx (кроме 429) - ответ о самом видео, инстанс при этом работает
+            healthy = response.status < 500 and response.status != 429
+            if response.status == 200:
+                data = await response.json()
+                title = data.get('title')
+                if title:
+                    print(f"✅ Invidious ({instance}) вернул название: {title[:60]}...")
+                    title = str(title).strip()
+            else:
+                print(f"⚠️ Invidious ({instance}): статус {response.status}")
+                if response.status != 429:
+                    # Invidious сообщает о недоступном видео и статусом 500 - с текстом ошибки
+                    try:
+                        reason = _unavailable_reason(await response.json(content_type=None))
+                    except ValueError:
+                        reason = None
+                    if reason:
+                        healthy = True
+    except asyncio.CancelledError:
+        # Проиграл гонку - на здоровье инстанса это не влияет
+        if health is not None:
+            health.release()
+        raise
+    except Exception as e:
+        healthy = False
+        print(f"⚠️ Invidious ({instance}) не сработал: {type(e).__name__}")
+
+    if health is not None:
+        if healthy:
+            health.record_success(time.monotonic() - started)
+        else:
+            health.record_failure(time.monotonic() - started)
+    if reason:
+        raise VideoUnavailable(f"Invidious ({instance}): {reason}")
+    return title or None
+
+
+async def get_title_invidious(video_id: str) -> Optional[str]:
+    """
+    NEW: Альтернативный метод через публичные инстансы Invidious.
+    Эти инстансы часто остаются доступными при блокировках.
+    """
+    for instance in invidious_backends.pick():
+        title = await get_title_invidious_instance(instance, video_id)
+        if title:
+            return title
+
+    print("❌ Все инстансы Invidious недоступны.")
+    return None
+
+
+# ==================== ПАРАЛЛЕЛЬНЫЙ ЗАПРОС (HEDGING) ====================
+def title_backends():
+    """Источники названия в порядке запуска: (имя источника, функция(video_id)).
+    Из Invidious берутся лучшие по здоровью инстансы."""
+    backends = [("noembed", get_title_noembed)]
+    for instance in invidious_backends.pick(TITLE_HEDGE_INVIDIOUS):
+        backends.append((
+            f"invidious:{instance}",
+            lambda video_id, instance=instance: get_title_invidious_instance(instance, video_id)
+        ))
+    return backends
+
+
+async def resolve_title(video_id: str, backends=None, hedge_delay_s: float = TITLE_HEDGE_DELAY_S,
+                        deadline_s: float = TITLE_LOOKUP_DEADLINE_S) -> Tuple[Optional[str], Optional[str], str]:
+    """
+    Запрашивает название у нескольких источников с подстраховкой (hedging).
+
+    Источники запускаются по очереди: следующий стартует, если предыдущие
+    не ответили за hedge_delay_s или уже ответили неудачей. Первое
+    полученное название побеждает, остальные запросы отменяются. Весь поиск
+    ограничен deadline_s, поэтому ожидание определяется самым быстрым
+    рабочим источником, а не суммой таймаутов всех.
+
+    Источник, который точно знает, что видео нет, выбрасывает VideoUnavailable:
+    такой ответ тоже завершает поиск.
+
+    Возвращает (название или None, имя источника или None, итог): итог
+    TITLE_FOUND, TITLE_MISSING или TITLE_UNAVAILABLE - если никто не ответил
+    до дедлайна или рабочих источников не осталось.
+    """
+    if backends is None:
+        backends = title_backends()
+    waiting = list(backends)
+    running = {}
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + deadline_s
+    next_launch = loop.time()
+
+    try:
+        while True:
+            now = loop.time()
+            if now >= deadline:
+                print(f"⌛ Название не получено за {deadline_s} сек.")
+                break
+
+            # Запуск следующего источника: по таймеру или если работающих не осталось
+            if waiting and (now >= next_launch or not running):
+                source, fetch = waiting.pop(0)
+                running[asyncio.ensure_future(fetch(video_id))] = source
+                next_launch = now + hedge_delay_s
+                continue
+
+            if not running:
+                break
+
+            wake_at = min(deadline, next_launch) if waiting else deadline
+            done, _ = await asyncio.wait(
+                running, timeout=max(0.0, wake_at - now), return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                source = running.pop(task)
+                if task.cancelled():
+                    continue
+                if isinstance(task.exception(), VideoUnavailable):
+                    print(f"🚫 {source}: видео недоступно ({task.exception()})")
+                    return None, source, TITLE_MISSING
+                if task.exception() is None and task.result():
+                    return task.result(), source, TITLE_FOUND
+    finally:
+        # Проигравшие запросы больше не нужны
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+    return None, None, TITLE_UNAVAILABLE
+
+
+# ==================== ОБЪЕДИНЕНИЕ ОДИНАКОВЫХ ЗАПРОСОВ ====================
+class _Flight:
+    __slots__ = ('task', 'waiters')
+
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Объединение одновременных запросов с одинаковым ключом (single-flight).
+
+    Первый вызов запускает задачу, остальные ждут её же результата.
+    Отмена одного ожидающего не отменяет общую задачу: она отменяется,
+    только когда её перестали ждать все.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def _forget(self, key, flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def do(self, key, func, *args):
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = _Flight(asyncio.ensure_future(func(*args)))
+            flight.task.add_done_callback(lambda task: self._forget(key, flight))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Результат больше никому не нужен; новые вызовы начнут заново
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def in_flight(self):
+        return len(self._flights)
+
+    def report(self):
+        total = self.started + self.coalesced
+        return (
+            f"Запросов названий: {total}, из них объединено с уже идущими: {self.coalesced}, "
+            f"выполняется сейчас: {self.in_flight()}"
+        )
+
+
+# Одно видео, присланное несколькими пользователями одновременно, запрашивается один раз
+title_lookups = SingleFlight()
+
+
+async def lookup_title(video_id: str) -> Optional[str]:
+    """Название видео по id: из кэша или из сети.
+
+    Кэшируются название и точный ответ "видео недоступно" (тогда None).
+    Если источники не ответили, выбрасывается TitleLookupFailed и в кэш
+    ничего не пишется: временный сбой не должен отклонять рабочие видео.
+    """
+    cached = await video_metadata.get(video_id)
+    if cached is not None:
+        print(f"📦 Название из кэша ({cached.source or 'недоступно'}): {cached.title}")
+        return cached.title
+
+    # Параллельный запрос к Noembed и лучшим инстансам Invidious
+    title, source, status = await resolve_title(video_id)
+    if status == TITLE_UNAVAILABLE:
+        raise TitleLookupFailed(f"название видео {video_id} не получено: источники не ответили")
+    if title:
+        print(f"✅ Название получено, источник: {source}")
+
+    await video_metadata.put(video_id, title, source)
+    return title
+
+
+# ==================== ОСНОВНАЯ ФУНКЦИЯ (ОБНОВЛЁННАЯ) ====================
+async def get_youtube_title(youtube_url: str, check_blender: bool = True) -> Tuple[Optional[str], bool]:
+    """
+    Основная функция. Пытается получить название видео разными способами.
+
+    Возвращает:
+        tuple: (название_видео_или_None, прошло_ли_проверку_на_blender)
+    Если источники названий не ответили, выбрасывает TitleLookupFailed.
+    """
+    print(f"\n{'=' * 60}")
+    print(f"🔍 Анализ ссылки: {youtube_url}")
+
+    # 1. Извлекаем ID видео
+    video_id = get_video_id(youtube_url)
+    if not video_id:
+        return None, False
+
+    # 2. Кэш, затем сеть; одновременные запросы одного видео объединяются
+    title = await title_lookups.do(video_id, lookup_title, video_id)
+
+    # 3. Если название не получено
+    if not title:
+        print("❌ Все методы не сработали. Не удалось получить название.")
+        return None, False
+
+    # 4. Проверка на слово "blender" или "блендер" (если нужно)
+    if check_blender:
+        title_lower = title.lower()
+        has_blender = 'blender' in title_lower or 'блендер' in title_lower
+
+        if has_blender:
+            print(f"✅ Проверка пройдена: название содержит 'blender' или 'блендер'")
+            return title, True
+        else:
+            print(f"❌ Проверка не пройдена: в названии нет слова 'blender' или 'блендер'")
+            print(f"   Полное название: {title}")
+            return title, False
+
+    # Если проверка не требуется
+    print(f"✅ Название получено (без проверки на Blender): {title[:80]}...")
+    return title, True
+
+
+# ==================== ФУНКЦИЯ ДЛЯ ОБРАБОТЧИКА СООБЩЕНИЙ ====================
+async def get_video_info(youtube_url: str) -> Tuple[bool, str]:
+    """
+    Упрощённая обёртка для обработчика сообщений.
+    Возвращает (успех, результат).
+    В случае ошибки результат — это строка для отправки пользователю.
+    """
+    print(f"\n🎬 Запрос информации о видео: {youtube_url}")
+    try:
+        title, has_blender = await get_youtube_title(youtube_url, check_blender=True)
+    except TitleLookupFailed as e:
+        print(f"⌛ {e}")
+        return False, (
+            "⌛ **Сервисы YouTube сейчас не отвечают.**\n\n"
+            "Ссылка может быть рабочей - проверить её не удалось.\n"
+            "Пожалуйста, отправьте её ещё раз через несколько минут."
+        )
+
+    if not title:
+        error_msg = (
+            "❌ **Не удалось получить название видео.**\n\n"
+            "Возможные причины:\n"
+            "• Видео является приватным или было удалено\n"
+            "• Проблемы с доступом к YouTube из вашего региона\n"
+            "• Некорректная ссылка\n\n"
+            "**Попробуйте:**\n"
+            "1. Проверить, открывается ли видео в браузере\n"
+            "2. Использовать другую ссылку на это же видео\n"
+            "3. Добавить видео позже"
+        )
+        return False, error_msg
+
+    if not has_blender:
+        # FIXED: экранируем возможные Markdown-символы в названии для Telegram
+        safe_title = title.replace('*', '\\*').replace('_', '\\_').replace('`', '\\`')
+        error_msg = (
+            f"❌ **Видео не связано с Blender.**\n\n"
+            f"🎬 **Название:** {safe_title}\n\n"
+            f"Чтобы добавить видео, его **название должно содержать слово 'blender' или 'блендер'**.\n"
+            f"Если это действительно видео про Blender, переименуйте его на YouTube или выберите другое видео."
+        )
+        return False, error_msg
+
+    return True, title  # В случае успеха возвращаем просто строку с названием
+
+
+# ==================== ТЕСТОВЫЙ ЗАПУСК ====================
+async def test():
+    """Функция для тестирования работы модуля."""
+    test_urls = [
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ",  # Rick Astley
+        "https://youtu.be/dQw4w9WgXcQ",  # Короткая ссылка
+        "https://www.youtube.com/shorts/Y7bE9u0QP44",  # Короткое видео
+    ]
+
+    for url in test_urls:
+        print(f"\n{'=' * 60}")
+        print(f"🧪 ТЕСТ: {url}")
+        success, result = await get_video_info(url)
+        print(f"Успех: {success}")
+        print(f"Результат: {result}")
+        print(f"{'=' * 60}")
+
+
+async def run_and_close(coro):
+    """Запуск из консоли: общая HTTP-сессия закрывается после теста"""
+    try:
+        return await coro
+    finally:
+        await http_client.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        url = sys.argv[1]
+        print("🧪 Запуск теста для одной ссылки...")
+        result = asyncio.run(run_and_close(get_video_info(url)))
+        print(f"\n🎯 Результат: {result}")
+    else:
+        print("ℹ️  Для теста передайте ссылку как аргумент командной строки.")
+        print("Пример: python youtube.py https://youtu.be/Y7bE9u0QP44")
+        # Запускаем общий тест
+        asyncio.run(run_and_close(test()))
\ No newline at end of file
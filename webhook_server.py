@@ -0,0 +1,108 @@
+# file: webhook_server.py
+import asyncio
+import hmac
+import json
+import secrets
+import signal
+
+from aiohttp import web
+from telegram import Update
+from telegram.ext import Application
+
+from config import (
+    WEBHOOK_URL, WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_PATH, WEBHOOK_SECRET_TOKEN,
+    WEBHOOK_MAX_CONNECTIONS, WEBHOOK_SET_ON_START
+)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def create_webhook_app(application: Application, secret_token: str, path: str = WEBHOOK_PATH) -> web.Application:
+    """aiohttp-приложение, которое принимает обновления от Telegram.
+
+    Запрос без правильного секретного токена отклоняется (403). Обновление
+    сразу кладётся в очередь Application и Telegram получает ответ 200,
+    не дожидаясь обработчиков.
+    """
+    expected = secret_token.encode('utf-8')
+
+    async def receive_update(request: web.Request) -> web.Response:
+        token = request.headers.get(SECRET_HEADER, "").encode('utf-8')
+        if not hmac.compare_digest(token, expected):
+            return web.Response(status=403)
+
+        try:
+            data = await request.json(loads=json.loads)
+            update = Update.de_json(data, application.bot)
+        except (ValueError, TypeError, KeyError) as e:
+            print(f"⚠️ Webhook: некорректное обновление: {e}")
+            return web.Response(status=400)
+
+        await application.update_queue.put(update)
+        return web.Response()
+
+    app = web.Application()
+    app.router.add_post(path, receive_update)
+    return app
+
+
+async def serve_webhook(application: Application, url: str = WEBHOOK_URL, listen: str = WEBHOOK_LISTEN,
+                        port: int = WEBHOOK_PORT, path: str = WEBHOOK_PATH,
+                        secret_token: str = WEBHOOK_SECRET_TOKEN, set_webhook: bool = WEBHOOK_SET_ON_START):
+    """Работа бота через webhook вместо run_polling.
+
+    Жизненный цикл тот же, что у run_polling: post_init, старт, остановка
+    по сигналу, post_stop, shutdown, post_shutdown. Если бот работает
+    несколькими экземплярами за балансировщиком, у всех должен быть один
+    WEBHOOK_SECRET_TOKEN, а set_webhook достаточно включить у одного.
+
+    Без set_webhook адрес регистрирует другой экземпляр, поэтому токен
+    обязателен: случайный не совпадёт с зарегистрированным.
+    """
+    if set_webhook and not url:
+        # set_webhook(url="") снял бы webhook, и обновления перестали бы приходить
+        raise ValueError("WEBHOOK_URL не задан, а WEBHOOK_SET_ON_START включён")
+    if not secret_token:
+        if not set_webhook:
+            raise ValueError("WEBHOOK_SECRET_TOKEN обязателен, если WEBHOOK_SET_ON_START выключен")
+        # Случайный токен годится только для одного экземпляра
+        secret_token = secrets.token_urlsafe(32)
+        print("⚠️ WEBHOOK_SECRET_TOKEN не задан, используется случайный токен")
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            # Windows: остановка по Ctrl+C через KeyboardInterrupt
+            pass
+
+    runner = web.AppRunner(create_webhook_app(application, secret_token, path))
+    await application.initialize()
+    try:
+        if application.post_init:
+            await application.post_init(application)
+        await application.start()
+
+        await runner.setup()
+        await web.TCPSite(runner, listen, port).start()
+        if set_webhook:
+            await application.bot.set_webhook(
+                url=url,
+                secret_token=secret_token,
+                allowed_updates=Update.ALL_TYPES,
+                max_connections=WEBHOOK_MAX_CONNECTIONS
+            )
+        print(f"🌐 Webhook: слушаю {listen}:{port}{path}, адрес для Telegram: {url}")
+
+        await stop_event.wait()
+    finally:
+        await runner.cleanup()
+        if application.running:
+            await application.stop()
+            if application.post_stop:
+                await application.post_stop(application)
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
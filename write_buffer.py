@@ -0,0 +1,122 @@
+# file: write_buffer.py
+import threading
+from config import WRITE_BUFFER_FLUSH_MS, WRITE_BUFFER_MAX_EVENTS
+
+
+class WriteBehindBuffer:
+    """Буфер отложенной записи для счётчиков и событий статистики.
+
+    Инкременты счётчиков складываются по ключу, события копятся списком.
+    Всё накопленное записывается одной транзакцией через flush_func
+    каждые flush_interval_ms миллисекунд или как только набралось
+    max_events операций. При остановке буфер сбрасывается, поэтому
+    при аварийном завершении теряется не больше одного окна.
+
+    flush_interval_ms = 0 отключает буферизацию: каждая операция
+    записывается сразу.
+    """
+
+    def __init__(self, flush_func, flush_interval_ms=WRITE_BUFFER_FLUSH_MS, max_events=WRITE_BUFFER_MAX_EVENTS):
+        self._flush_func = flush_func
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_events = max_events
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # Держится на время записи в базу и снятия _inflight; читатели берут её,
+        # чтобы видеть данные либо ещё в буфере, либо уже в базе, но не дважды
+        self._commit_lock = threading.Lock()
+        self._counters = {}
+        # Счётчики, которые сейчас записываются в базу
+        self._inflight = {}
+        self._events = {}
+        self._pending_ops = 0
+
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        if self.flush_interval > 0:
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+
+    def add_counter(self, kind, key, delta=1):
+        """Инкремент счётчика kind/key"""
+        with self._lock:
+            counters = self._counters.setdefault(kind, {})
+            counters[key] = counters.get(key, 0) + delta
+            self._pending_ops += 1
+        self._after_add()
+
+    def add_event(self, kind, row):
+        """Добавление строки события kind"""
+        with self._lock:
+            self._events.setdefault(kind, []).append(row)
+            self._pending_ops += 1
+        self._after_add()
+
+    def pending_counter(self, kind, key):
+        """Ещё не записанная в базу часть счётчика (вместе с записываемой прямо сейчас).
+
+        Чтение "значение в базе + pending_counter" нужно делать внутри
+        reading(), иначе запись, завершившаяся между двумя чтениями,
+        посчитается дважды.
+        """
+        with self._lock:
+            return self._counters.get(kind, {}).get(key, 0) + self._inflight.get(kind, {}).get(key, 0)
+
+    def reading(self):
+        """Контекст для чтения "база + буфер": пока он открыт, запись буфера не завершается"""
+        return self._commit_lock
+
+    def _after_add(self):
+        if self._thread is None:
+            self.flush()
+        elif self._pending_ops >= self.max_events:
+            self._wakeup.set()
+
+    def flush(self):
+        """Запись накопленных данных одной транзакцией"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending_ops:
+                    return 0
+                counters, events, ops = self._counters, self._events, self._pending_ops
+                self._counters, self._events, self._pending_ops = {}, {}, 0
+                self._inflight = counters
+
+            with self._commit_lock:
+                try:
+                    self._flush_func(counters, events)
+                except Exception as e:
+                    print(f"❌ Ошибка при записи буфера статистики: {e}")
+                    self._restore(counters, events, ops)
+                    return 0
+                with self._lock:
+                    self._inflight = {}
+                return ops
+
+    def _restore(self, counters, events, ops):
+        """Возврат несохранённых данных в буфер для следующей попытки"""
+        with self._lock:
+            self._inflight = {}
+            for kind, values in counters.items():
+                target = self._counters.setdefault(kind, {})
+                for key, delta in values.items():
+                    target[key] = target.get(key, 0) + delta
+            for kind, rows in events.items():
+                self._events[kind] = rows + self._events.get(kind, [])
+            self._pending_ops += ops
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def close(self):
+        """Остановка фонового потока и финальный сброс буфера"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()